@@ -0,0 +1,28 @@
+# api/gunicorn_conf.py
+# Configuração do modo de produção: gunicorn com vários workers uvicorn.
+# Ex: gunicorn -c api/gunicorn_conf.py api.main:app
+import multiprocessing
+import os
+
+# Padrão (usado pelo Dockerfile): cada worker importa o app sem bloquear e carrega o modelo e a feature
+# store em background, no lifespan; o /ready responde 503 até as cargas terminarem e o balanceador só
+# envia tráfego depois disso. A feature store é aberta com memory-map a partir do mesmo arquivo em cache,
+# então as páginas são compartilhadas entre os workers.
+# MODEL_PRELOAD=1 (opcional): o app, o modelo e a feature store são carregados uma única vez no processo
+# mestre, antes do fork, e os workers compartilham essa memória (copy-on-write). A carga passa a ser
+# síncrona na inicialização do mestre e nenhum worker sobe antes dela terminar.
+preload_app = os.getenv("MODEL_PRELOAD", "0") == "1"
+
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+# Repassado para a API dimensionar o executor de inferência (núcleos / workers)
+os.environ.setdefault("WEB_CONCURRENCY", str(workers))
+
+# Com vários workers, agrupa as previsões individuais simultâneas em uma única chamada ao modelo
+# (janela em ms; na API o padrão é 0, desativado)
+os.environ.setdefault("MICRO_BATCH_WINDOW_MS", "2")
+
+worker_class = "uvicorn_worker.UvicornWorker"
+bind = os.getenv("BIND", "0.0.0.0:80")
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
@@ -1,49 +1,206 @@
 # Importando as bibliotecas necessárias
-from fastapi import FastAPI
-from pydantic import BaseModel
-import joblib
-import pandas as pd
-import boto3
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
+from pydantic import BaseModel, model_validator
+import numpy as np
 import os
+import asyncio
 import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from api.metrics import REQUISICOES, TAMANHO_LOTE, AmostradorPerfis, exportar_metricas, medir
+from api.micro_batcher import MicroBatcher
+from api.model_manager import ModelManager
+from api.readiness import PRONTO, EstadoCarga, status_geral
+from ml_jobs.season_simulator import confrontos_restantes, resumir_simulacao, simular_temporadas, tabela_atual
+from shared.feature_store import FEATURE_COLS, FeatureStore, ler_partidas_csv, partidas_de_registros
+from shared.storage import ArmazenamentoLocal, ArmazenamentoS3
 
 # Carregar as variáveis de ambiente do arquivo .env
 load_dotenv()
 
-# --- LÓGICA DE CARREGAMENTO DO MODELO DO S3 (BLOCO ATUALIZADO) ---
+# --- LÓGICA DE CARREGAMENTO DO MODELO (CACHE LOCAL + RECARGA A QUENTE) ---
 
 # Ler as configurações a partir das variáveis de ambiente
 BUCKET_NAME = os.getenv("S3_BUCKET_NAME")
 MODEL_FILE_KEY = "models/modelo_final.joblib"
+# Manifesto do artefato nativo gerado pelo model_trainer.py (carregado sem joblib/scikit-learn)
+MODEL_MANIFEST_KEY = "models/modelo_final.manifest.json"
+# Diretório local com a mesma estrutura do bucket, para rodar a API sem S3 (ex: testes).
+# STORAGE_LOCAL_DIR é a variável usada também pelo frontend (ver shared/storage.py).
+MODEL_LOCAL_DIR = os.getenv("MODEL_LOCAL_DIR") or os.getenv("STORAGE_LOCAL_DIR")
+# Endpoint alternativo compatível com S3 (ex: MinIO local)
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
+# Intervalo (segundos) para verificar se há um novo modelo no bucket. 0 desativa.
+MODEL_RELOAD_INTERVAL = int(os.getenv("MODEL_RELOAD_INTERVAL", "0"))
 
 temp_dir = tempfile.gettempdir()
-LOCAL_MODEL_PATH = os.path.join(temp_dir, "modelo_final.joblib")
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", os.path.join(temp_dir, "predictor_model_cache"))
 
-print("Iniciando a API... Baixando o modelo mais recente do S3...")
+# --- CONFIGURAÇÃO DA INFERÊNCIA ---
+# Workers do gunicorn (ver api/gunicorn_conf.py). Os núcleos são divididos entre eles.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+# Threads do executor de inferência de cada worker (padrão: núcleos / workers)
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", str(max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY))))
+# Threads do XGBoost por previsão: o paralelismo vem dos workers e do executor
+XGB_NTHREAD = int(os.getenv("XGB_NTHREAD", "1"))
+# Janela (ms) do micro-batching de previsões individuais. 0 (padrão) desativa: com um único worker a janela
+# só acrescenta latência; o gunicorn_conf.py a ativa no modo com vários workers.
+MICRO_BATCH_WINDOW_MS = float(os.getenv("MICRO_BATCH_WINDOW_MS", "0"))
+MICRO_BATCH_MAX_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", "64"))
+# Carregar o modelo na importação do app (opcional: gunicorn com preload_app, antes do fork dos workers).
+# Por padrão a carga roda em background no lifespan de cada worker e o /ready indica quando termina.
+MODEL_PRELOAD = os.getenv("MODEL_PRELOAD", "0") == "1"
 
-# Validação para garantir que a variável de ambiente foi configurada
-if not BUCKET_NAME:
-    print("ERRO CRÍTICO: A variável de ambiente S3_BUCKET_NAME não está configurada.")
-    model = None
+# Profiling opcional: grava um perfil do cProfile a cada N requisições (e N chamadas ao modelo). 0 desativa.
+PROFILE_EVERY_N = int(os.getenv("PROFILE_EVERY_N", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(temp_dir, "predictor_profiles"))
+amostrador_perfis = AmostradorPerfis(PROFILE_EVERY_N, PROFILE_DIR)
+
+# Ordem fixa das features, igual à usada no treinamento (data_processor.py)
+FEATURE_ORDER = FEATURE_COLS
+
+
+# Validação para garantir que a origem do modelo foi configurada.
+# O mesmo armazenamento (bucket ou diretório local) fornece o modelo e o histórico de partidas.
+if MODEL_LOCAL_DIR:
+    armazenamento = ArmazenamentoLocal(MODEL_LOCAL_DIR)
+elif BUCKET_NAME:
+    armazenamento = ArmazenamentoS3(BUCKET_NAME, endpoint_url=S3_ENDPOINT_URL)
 else:
-    try:
-        s3_client = boto3.client('s3')
-        s3_client.download_file(BUCKET_NAME, MODEL_FILE_KEY, LOCAL_MODEL_PATH)
-        print(f"Modelo baixado com sucesso de s3://{BUCKET_NAME}/{MODEL_FILE_KEY}")
+    print("ERRO CRÍTICO: A variável de ambiente S3_BUCKET_NAME não está configurada.")
+    armazenamento = None
 
-        model = joblib.load(LOCAL_MODEL_PATH)
-        print("Modelo carregado com sucesso. API pronta para receber requisições.")
+if armazenamento is not None:
+    model_manager = ModelManager(armazenamento, MODEL_FILE_KEY, MODEL_CACHE_DIR, chave_manifesto=MODEL_MANIFEST_KEY,
+                                 features_esperadas=FEATURE_ORDER, n_threads=XGB_NTHREAD)
+    estado_modelo = model_manager.carga
+else:
+    model_manager = None
+    estado_modelo = EstadoCarga("modelo")
+    estado_modelo.concluir("Origem do modelo não configurada (S3_BUCKET_NAME ou MODEL_LOCAL_DIR).")
 
-    except Exception as e:
-        print(f"ERRO CRÍTICO: Não foi possível carregar o modelo. {e}")
-        model = None
+if MODEL_PRELOAD and model_manager is not None:
+    print("Pré-carregando o modelo no processo mestre (compartilhado pelos workers)...")
+    model_manager.atualizar()
 
 # --- FIM DO BLOCO ATUALIZADO ---
 
+# --- FEATURE STORE: FORMA E CONTEXTO DOS TIMES ---
+# Com a feature store a API calcula as features de um confronto a partir apenas dos nomes dos times,
+# com os mesmos valores usados no treinamento (ver shared/feature_store.py).
+# A feature store gerada pelo data_processor.py fica ao lado da tabela de features; sem ela, é
+# materializada a partir do CSV de histórico.
+FEATURE_STORE_KEY = os.getenv("FEATURE_STORE_KEY", "processed/features.parquet/_feature_store.arrow")
+HISTORICO_FILE_KEY = os.getenv("HISTORICO_FILE_KEY", "raw/dados_producao_inicial.csv")
+HISTORICO_LOCAL_PATH = os.getenv("HISTORICO_LOCAL_PATH")
+
+
+def carregar_feature_store():
+    """
+    Baixa a feature store para o cache local (um arquivo por versão) e a abre com memory-map:
+    os workers do gunicorn compartilham as mesmas páginas do arquivo.
+    """
+    if HISTORICO_LOCAL_PATH:
+        return FeatureStore.de_partidas(ler_partidas_csv(HISTORICO_LOCAL_PATH))
+    if not armazenamento.existe(FEATURE_STORE_KEY):
+        print(f"Feature store não encontrada em {armazenamento.descricao(FEATURE_STORE_KEY)}. Usando o CSV de histórico.")
+        # O CSV é lido direto do fluxo do armazenamento, sem arquivo temporário
+        with armazenamento.abrir_leitura(HISTORICO_FILE_KEY) as fluxo:
+            return FeatureStore.de_partidas(ler_partidas_csv(fluxo))
+
+    os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+    caminho = os.path.join(MODEL_CACHE_DIR, f"feature_store_{armazenamento.versao(FEATURE_STORE_KEY)}.arrow")
+    if not os.path.exists(caminho):
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        armazenamento.baixar(FEATURE_STORE_KEY, temporario)
+        os.replace(temporario, caminho)
+    return FeatureStore.abrir(caminho)
+
+
+def carregar_e_publicar_feature_store():
+    global feature_store
+    with medir("carga_feature_store"):
+        carregada = carregar_feature_store()
+    with lock_feature_store:
+        feature_store = carregada
+    print(f"Feature store carregada com {feature_store.n_jogos} jogos e {len(feature_store)} times.")
+
+
+feature_store = FeatureStore.vazia()
+# Serializa as atualizações (/historico/partidas); as leituras usam a referência atual, que nunca é alterada
+lock_feature_store = threading.Lock()
+# A feature store é carregada em background, no lifespan (ou no processo mestre, com MODEL_PRELOAD)
+estado_feature_store = EstadoCarga("feature_store")
+HISTORICO_CONFIGURADO = bool(HISTORICO_LOCAL_PATH) or armazenamento is not None
+if not HISTORICO_CONFIGURADO:
+    print("AVISO: Histórico de partidas não configurado. O endpoint /predict/match ficará indisponível.")
+
+# Componentes reportados pelo /ready
+COMPONENTES_PRONTIDAO = {"modelo": estado_modelo}
+if HISTORICO_CONFIGURADO:
+    COMPONENTES_PRONTIDAO["feature_store"] = estado_feature_store
+
+if MODEL_PRELOAD and HISTORICO_CONFIGURADO:
+    # Os workers herdam a feature store (o memory-map é compartilhado entre eles)
+    estado_feature_store.executar(carregar_e_publicar_feature_store)
+
+# Tamanho máximo de um lote no endpoint /predict/batch (uma temporada completa tem 380 jogos)
+MAX_BATCH_SIZE = int(os.getenv("PREDICT_MAX_BATCH_SIZE", "500"))
+
+# Limite de simulações por chamada do /simulate/season e processos usados pela simulação
+MAX_SIMULACOES = int(os.getenv("SIMULATE_MAX_SIMULATIONS", "50000"))
+SIMULATE_PROCESSES = int(os.getenv("SIMULATE_PROCESSES", "1"))
+
+RESULTADO_MAP = {0: "Vitória do Mandante", 1: "Empate", 2: "Vitória do Visitante"}
+PROBABILIDADE_MAP = {0: "vitoria_mandante", 1: "empate", 2: "vitoria_visitante"}
+
+
+# Executor limitado para a inferência (CPU) e micro-batcher; criados por worker, dentro do lifespan
+executor_inferencia = None
+micro_batcher = None
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global executor_inferencia, micro_batcher
+    # O modelo e a feature store são carregados em background: o app existe e o health check
+    # responde imediatamente; o /ready informa quando as cargas terminam.
+    # Se já foi pré-carregado antes do fork, aqui só é verificada a versão (e a recarga periódica).
+    if model_manager is not None:
+        print("Iniciando a API... Carregando o modelo mais recente em background...")
+        model_manager.iniciar_em_background(MODEL_RELOAD_INTERVAL)
+    if HISTORICO_CONFIGURADO and estado_feature_store.status != PRONTO:
+        estado_feature_store.em_background(carregar_e_publicar_feature_store)
+
+    executor_inferencia = ThreadPoolExecutor(max_workers=INFERENCE_THREADS, thread_name_prefix="inferencia")
+    if MICRO_BATCH_WINDOW_MS > 0:
+        micro_batcher = MicroBatcher(
+            lambda matriz: prever_com_metricas(modelo_atual(), matriz, "micro_batch"), executor_inferencia,
+            janela=MICRO_BATCH_WINDOW_MS / 1000, tamanho_maximo=MICRO_BATCH_MAX_SIZE,
+        )
+        micro_batcher.iniciar()
+    yield
+    if micro_batcher is not None:
+        await micro_batcher.parar()
+    executor_inferencia.shutdown(wait=False)
+
 
 # Criar a instância da aplicação FastAPI
-app = FastAPI(title="Futebol BR Predictor API", description="API para prever resultados de jogos do Brasileirão")
+app = FastAPI(title="Futebol BR Predictor API", description="API para prever resultados de jogos do Brasileirão", lifespan=lifespan)
+
+
+@app.middleware("http")
+async def medir_requisicao(request: Request, call_next):
+    inicio = time.perf_counter()
+    with amostrador_perfis.perfilar(request.url.path):
+        response = await call_next(request)
+    # Rótulo pelo caminho da rota (ex: /predict/match), não pela URL com parâmetros
+    rota = request.scope.get("route")
+    REQUISICOES.observar(rota.path if rota is not None else "nao_encontrado", time.perf_counter() - inicio)
+    return response
 
 
 # Definir o formato dos dados de entrada usando Pydantic
@@ -65,22 +222,255 @@ class MatchFeatures(BaseModel):
     diff_mid: int
     diff_att: int
 
+    @model_validator(mode="wrap")
+    @classmethod
+    def _medir_validacao(cls, dados, handler):
+        with medir("validacao_pydantic"):
+            return handler(dados)
+
+
+# Formato de uma partida já disputada, igual às colunas do CSV de dados brutos
+class Partida(BaseModel):
+    id: int | None = None
+    data: str  # dd/mm/aaaa, como no CSV
+    mandante: str
+    visitante: str
+    formacao_mandante: str | None = None
+    formacao_visitante: str | None = None
+    vencedor: str
+    mandante_placar: int
+    visitante_placar: int
+    mandante_estado: str
+    visitante_estado: str
+
+
+def montar_matriz_features(lista_features):
+    """
+    Empacota uma lista de MatchFeatures em uma única matriz NumPy contígua
+    (uma linha por partida), respeitando a ordem fixa das features.
+    """
+    matriz = np.empty((len(lista_features), len(FEATURE_ORDER)), dtype=np.float32)
+    for i, features in enumerate(lista_features):
+        matriz[i] = [getattr(features, coluna) for coluna in FEATURE_ORDER]
+    return matriz
+
+
+def montar_vetor_features(features):
+    """Vetor float32 com as features de uma partida (uma linha da matriz enviada ao modelo)."""
+    return np.array([getattr(features, coluna) for coluna in FEATURE_ORDER], dtype=np.float32)
+
+
+def modelo_atual():
+    return model_manager.atual if model_manager is not None else None
+
+
+def prever_com_metricas(modelo, matriz, origem):
+    """Chamada ao modelo com o tempo da previsão e o tamanho do lote registrados nas métricas."""
+    TAMANHO_LOTE.observar(origem, len(matriz))
+    with amostrador_perfis.perfilar("previsao"), medir("previsao"):
+        return modelo.prever_probabilidades(matriz)
+
+
+async def prever_partida(modelo, features):
+    """
+    Probabilidades de uma partida, calculadas fora do event loop: pelo micro-batcher
+    (agrupando requisições simultâneas) ou diretamente no executor de inferência.
+    """
+    with medir("montagem_features"):
+        vetor = montar_vetor_features(features)
+    if micro_batcher is not None:
+        return await micro_batcher.prever(vetor)
+    loop = asyncio.get_running_loop()
+    return (await loop.run_in_executor(executor_inferencia, prever_com_metricas, modelo, vetor[None, :], "individual"))[0]
+
+
+def formatar_previsao(probabilidades, incluir_probabilidades=False):
+    prediction_numeric = int(np.argmax(probabilidades))
+    resposta = {
+        "prediction_numeric": prediction_numeric,
+        "prediction_text": RESULTADO_MAP.get(prediction_numeric, "Resultado Desconhecido")
+    }
+    if incluir_probabilidades:
+        resposta["probabilities"] = {
+            PROBABILIDADE_MAP[classe]: float(p) for classe, p in enumerate(probabilidades)
+        }
+    return resposta
+
+
 # Criar o endpoint de previsão
 @app.post("/predict", tags=["Predictions"])
-def predict(features: MatchFeatures):
-    if model is None:
+async def predict(features: MatchFeatures):
+    modelo = modelo_atual()
+    if modelo is None:
+        return {"error": "Modelo não está carregado. Verifique os logs da API ou o arquivo .env."}
+
+    probabilidades = await prever_partida(modelo, features)
+    return formatar_previsao(probabilidades)
+
+
+# Endpoint de previsão com as probabilidades de cada resultado (usado para precificação)
+@app.post("/predict_proba", tags=["Predictions"])
+async def predict_proba(features: MatchFeatures):
+    modelo = modelo_atual()
+    if modelo is None:
+        return {"error": "Modelo não está carregado. Verifique os logs da API ou o arquivo .env."}
+
+    probabilidades = await prever_partida(modelo, features)
+    return formatar_previsao(probabilidades, incluir_probabilidades=True)
+
+
+# Endpoint de previsão em lote: uma rodada (10 jogos) ou temporada inteira em uma só chamada
+@app.post("/predict/batch", tags=["Predictions"])
+async def predict_batch(lista_features: list[MatchFeatures], probabilities: bool = False):
+    modelo = modelo_atual()
+    if modelo is None:
+        return {"error": "Modelo não está carregado. Verifique os logs da API ou o arquivo .env."}
+    if len(lista_features) > MAX_BATCH_SIZE:
+        return {"error": f"Lote com {len(lista_features)} partidas excede o máximo de {MAX_BATCH_SIZE}."}
+    if not lista_features:
+        return {"total": 0, "previsoes": []}
+
+    # Uma única chamada vetorizada ao modelo para o lote inteiro
+    with medir("montagem_features"):
+        matriz = montar_matriz_features(lista_features)
+    loop = asyncio.get_running_loop()
+    matriz_probabilidades = await loop.run_in_executor(executor_inferencia, prever_com_metricas, modelo, matriz, "lote")
+    return {
+        "total": len(lista_features),
+        "previsoes": [formatar_previsao(p, probabilities) for p in matriz_probabilidades]
+    }
+
+# Endpoint de previsão a partir dos nomes dos times: as features vêm da feature store
+@app.get("/predict/match", tags=["Predictions"])
+async def predict_match(mandante: str, visitante: str, probabilities: bool = False):
+    modelo = modelo_atual()
+    if modelo is None:
+        return {"error": "Modelo não está carregado. Verifique os logs da API ou o arquivo .env."}
+    store = feature_store
+    if len(store) == 0:
+        return {"error": "Histórico de partidas não está carregado. Verifique os logs da API ou o arquivo .env."}
+
+    try:
+        features_payload = store.features_confronto(mandante, visitante)
+    except KeyError as e:
+        return {"error": str(e.args[0])}
+
+    probabilidades = await prever_partida(modelo, MatchFeatures(**features_payload))
+    resposta = formatar_previsao(probabilidades, probabilities)
+    resposta["features"] = features_payload
+    return resposta
+
+
+# Confronto ainda não disputado, usado para informar os jogos restantes da temporada
+class Confronto(BaseModel):
+    mandante: str
+    visitante: str
+
+
+# Endpoint de simulação de Monte Carlo do restante da temporada (título, G4 e rebaixamento)
+def _simular_temporada(modelo, store, times, partidas_jogadas, restantes, n_simulacoes, seed):
+    """Previsão dos confrontos restantes e simulação Monte Carlo (CPU); roda no executor de inferência."""
+    # Features de todos os confrontos restantes em uma consulta vetorizada e uma única chamada ao modelo
+    matriz = store.matriz_features([m for m, _ in restantes], [v for _, v in restantes]).astype(np.float32)
+    probabilidades = prever_com_metricas(modelo, matriz, "simulacao") if restantes else np.empty((0, 3))
+
+    posicao = {nome_time: i for i, nome_time in enumerate(times)}
+    pontos, vitorias, saldo = tabela_atual(times, partidas_jogadas)
+    contagem_posicoes, pontos_medios = simular_temporadas(
+        probabilidades, [posicao[m] for m, _ in restantes], [posicao[v] for _, v in restantes],
+        pontos, vitorias, saldo, n_simulacoes=n_simulacoes, seed=seed, n_processos=SIMULATE_PROCESSES,
+    )
+    return resumir_simulacao(times, pontos, contagem_posicoes, pontos_medios)
+
+
+@app.post("/simulate/season", tags=["Simulations"])
+async def simulate_season(confrontos: list[Confronto] | None = None, n_simulacoes: int = 10000, seed: int | None = None):
+    modelo = modelo_atual()
+    if modelo is None:
         return {"error": "Modelo não está carregado. Verifique os logs da API ou o arquivo .env."}
-        
-    input_df = pd.DataFrame([features.dict()])
-    prediction_numeric = model.predict(input_df)[0]
-    resultado_map = {0: "Vitória do Mandante", 1: "Empate", 2: "Vitória do Visitante"}
-    prediction_text = resultado_map.get(int(prediction_numeric), "Resultado Desconhecido")
+    store = feature_store
+    if len(store) == 0:
+        return {"error": "Histórico de partidas não está carregado. Verifique os logs da API ou o arquivo .env."}
+    if not 0 < n_simulacoes <= MAX_SIMULACOES:
+        return {"error": f"O número de simulações deve estar entre 1 e {MAX_SIMULACOES}."}
+
+    temporada, partidas_jogadas = store.partidas_da_temporada()
+    times = sorted({m for m, _, _, _ in partidas_jogadas} | {v for _, v, _, _ in partidas_jogadas})
+    # Sem a lista de confrontos, simula todos os jogos de turno e returno ainda não disputados
+    if confrontos is None:
+        restantes = confrontos_restantes(times, partidas_jogadas)
+    else:
+        restantes = [(c.mandante, c.visitante) for c in confrontos]
+    desconhecidos = sorted({t for confronto in restantes for t in confronto} - set(times))
+    if desconhecidos:
+        return {"error": f"Times fora da temporada {temporada}: {', '.join(desconhecidos)}"}
+
+    # A previsão e a simulação ocupam a CPU: rodam no executor limitado, fora do event loop
+    loop = asyncio.get_running_loop()
+    resumo = await loop.run_in_executor(
+        executor_inferencia, _simular_temporada, modelo, store, times, partidas_jogadas, restantes, n_simulacoes, seed,
+    )
     return {
-        "prediction_numeric": int(prediction_numeric),
-        "prediction_text": prediction_text
+        "temporada": temporada,
+        "n_simulacoes": n_simulacoes,
+        "partidas_restantes": len(restantes),
+        "times": resumo,
     }
 
-# Endpoint de health check para verificar se a API está online
+
+# Endpoint para incluir novas rodadas na feature store (as requisições em andamento seguem com a versão anterior)
+@app.post("/historico/partidas", tags=["Historico"])
+def adicionar_partidas(partidas: list[Partida]):
+    global feature_store
+    if estado_feature_store.status != PRONTO:
+        return {"error": "A feature store ainda não foi carregada. Consulte o /ready."}
+    if not partidas:
+        return {"partidas_adicionadas": 0, "total_times": len(feature_store)}
+    novas = partidas_de_registros([p.model_dump() for p in partidas])
+    with lock_feature_store:
+        feature_store, adicionadas = feature_store.com_partidas(novas)
+    return {"partidas_adicionadas": adicionadas, "total_times": len(feature_store)}
+
+
+# Endpoints de gerenciamento do modelo
+@app.get("/model", tags=["Model"])
+def model_info():
+    modelo = modelo_atual()
+    return {
+        "version": modelo.versao if modelo is not None else None,
+        "format": modelo.formato if modelo is not None else None,
+        "loaded_at": modelo.carregado_em if modelo is not None else None,
+        "last_error": model_manager.ultimo_erro if model_manager is not None else None,
+    }
+
+
+@app.post("/model/reload", tags=["Model"])
+def model_reload():
+    if model_manager is None:
+        return {"error": "Origem do modelo não configurada. Verifique o arquivo .env."}
+    trocou = model_manager.atualizar()
+    return {"reloaded": trocou, "version": model_manager.atual.versao if model_manager.atual else None}
+
+
+# Métricas no formato do Prometheus (histogramas de duração por estágio e por endpoint)
+@app.get("/metrics", tags=["Health Check"], include_in_schema=False)
+def metrics():
+    return Response(exportar_metricas(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# Endpoint de health check (liveness) para verificar se a API está online; não depende do modelo
 @app.get("/", tags=["Health Check"])
 def read_root():
-    return {"status": "API está online e funcionando!"}
\ No newline at end of file
+    return {"status": "API está online e funcionando!"}
+
+
+# Prontidão (readiness): 200 quando o modelo e a feature store estão carregados, 503 enquanto carregam ou se falharam
+@app.get("/ready", tags=["Health Check"])
+def ready(response: Response):
+    status = status_geral(COMPONENTES_PRONTIDAO.values())
+    if status != PRONTO:
+        response.status_code = 503
+    return {
+        "status": status,
+        "componentes": {nome: estado.relatorio() for nome, estado in COMPONENTES_PRONTIDAO.items()},
+    }
\ No newline at end of file
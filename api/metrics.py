@@ -0,0 +1,116 @@
+# api/metrics.py
+import cProfile
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Limites dos buckets (segundos): de 100 µs a 10 s, cobrindo da validação de um payload ao download do modelo
+BUCKETS_SEGUNDOS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS_TAMANHO_LOTE = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+
+class Histograma:
+    """Histograma cumulativo no formato do Prometheus, uma série por combinação de rótulos."""
+
+    def __init__(self, nome, descricao, rotulo, buckets=BUCKETS_SEGUNDOS):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulo = rotulo
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor_rotulo, valor):
+        with self._lock:
+            serie = self._series.get(valor_rotulo)
+            if serie is None:
+                # [contagem por bucket..., contagem acima do último bucket, soma]
+                serie = self._series[valor_rotulo] = [0] * (len(self.buckets) + 1) + [0.0]
+            serie[bisect_left(self.buckets, valor)] += 1
+            serie[-1] += valor
+
+    def exportar(self):
+        linhas = [f"# HELP {self.nome} {self.descricao}", f"# TYPE {self.nome} histogram"]
+        with self._lock:
+            series = {rotulo: list(serie) for rotulo, serie in self._series.items()}
+        for valor_rotulo, serie in sorted(series.items()):
+            rotulo = f'{self.rotulo}="{valor_rotulo}"'
+            acumulado = 0
+            for limite, contagem in zip(self.buckets, serie):
+                acumulado += contagem
+                linhas.append(f'{self.nome}_bucket{{{rotulo},le="{limite}"}} {acumulado}')
+            acumulado += serie[len(self.buckets)]
+            linhas.append(f'{self.nome}_bucket{{{rotulo},le="+Inf"}} {acumulado}')
+            linhas.append(f'{self.nome}_sum{{{rotulo}}} {serie[-1]}')
+            linhas.append(f'{self.nome}_count{{{rotulo}}} {acumulado}')
+        return "\n".join(linhas)
+
+
+# Métricas da API. Cada worker do gunicorn tem as suas (o /metrics mostra as do worker que respondeu).
+ESTAGIOS = Histograma(
+    "predictor_estagio_segundos",
+    "Duração de cada estágio do caminho de previsão (download e carga do modelo, validação, montagem das features, previsão).",
+    "estagio",
+)
+REQUISICOES = Histograma("predictor_requisicao_segundos", "Duração total das requisições por endpoint.", "endpoint")
+TAMANHO_LOTE = Histograma(
+    "predictor_tamanho_lote", "Partidas por chamada ao modelo (micro-batching e /predict/batch).", "origem",
+    buckets=BUCKETS_TAMANHO_LOTE,
+)
+
+
+@contextmanager
+def medir(estagio, histograma=ESTAGIOS):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        histograma.observar(estagio, time.perf_counter() - inicio)
+
+
+def exportar_metricas():
+    """Texto no formato de exposição do Prometheus com todos os histogramas."""
+    return "\n".join(h.exportar() for h in (ESTAGIOS, REQUISICOES, TAMANHO_LOTE)) + "\n"
+
+
+class AmostradorPerfis:
+    """
+    Hook opcional de profiling: a cada `a_cada_n` execuções de um mesmo trecho (por nome),
+    roda o trecho sob o cProfile e grava o perfil (.prof, para pstats/snakeviz) em `diretorio`.
+    Só um perfil é coletado por vez; execuções concorrentes seguem sem profiling.
+    """
+
+    def __init__(self, a_cada_n=0, diretorio=None):
+        self.a_cada_n = a_cada_n
+        self.diretorio = diretorio
+        self._contadores = {}
+        self._lock_contadores = threading.Lock()
+        self._lock_perfil = threading.Lock()
+        if a_cada_n and diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+    def _amostrar(self, nome):
+        if not self.a_cada_n:
+            return False
+        with self._lock_contadores:
+            self._contadores[nome] = self._contadores.get(nome, 0) + 1
+            return self._contadores[nome] % self.a_cada_n == 0
+
+    @contextmanager
+    def perfilar(self, nome):
+        if not self._amostrar(nome) or not self._lock_perfil.acquire(blocking=False):
+            yield
+            return
+        perfil = cProfile.Profile()
+        try:
+            perfil.enable()
+            try:
+                yield
+            finally:
+                perfil.disable()
+            nome_arquivo = f"{nome.strip('/').replace('/', '_') or 'raiz'}_{os.getpid()}_{time.time_ns()}.prof"
+            perfil.dump_stats(os.path.join(self.diretorio, nome_arquivo))
+        finally:
+            self._lock_perfil.release()
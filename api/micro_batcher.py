@@ -0,0 +1,69 @@
+# api/micro_batcher.py
+import asyncio
+
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    Agrupa previsões individuais que chegam ao mesmo tempo em uma única chamada vetorizada
+    ao modelo. A primeira requisição de um lote espera até `janela` segundos (ou até o lote
+    atingir `tamanho_maximo`) e o lote inteiro é previsto no executor de inferência, sem
+    bloquear o event loop. Cada requisição recebe apenas a sua linha de probabilidades.
+    """
+
+    def __init__(self, prever_lote, executor, janela=0.002, tamanho_maximo=64):
+        self.prever_lote = prever_lote
+        self.executor = executor
+        self.janela = janela
+        self.tamanho_maximo = tamanho_maximo
+        self._fila = None
+        self._tarefa = None
+        self._lotes_em_execucao = set()
+
+    def iniciar(self):
+        """Deve ser chamado dentro do event loop (no lifespan da aplicação)."""
+        self._fila = asyncio.Queue()
+        self._tarefa = asyncio.create_task(self._coletar())
+
+    async def parar(self):
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+        if self._lotes_em_execucao:
+            await asyncio.gather(*self._lotes_em_execucao, return_exceptions=True)
+
+    async def prever(self, vetor_features):
+        """Retorna as probabilidades (vetor de 3 posições) de uma partida."""
+        futuro = asyncio.get_running_loop().create_future()
+        await self._fila.put((vetor_features, futuro))
+        return await futuro
+
+    async def _coletar(self):
+        while True:
+            lote = [await self._fila.get()]
+            if self.janela > 0:
+                await asyncio.sleep(self.janela)
+            while len(lote) < self.tamanho_maximo and not self._fila.empty():
+                lote.append(self._fila.get_nowait())
+            # O lote roda em paralelo enquanto o próximo é coletado (o executor limita a concorrência)
+            tarefa = asyncio.create_task(self._executar(lote))
+            self._lotes_em_execucao.add(tarefa)
+            tarefa.add_done_callback(self._lotes_em_execucao.discard)
+
+    async def _executar(self, lote):
+        matriz = np.stack([vetor for vetor, _ in lote])
+        try:
+            probabilidades = await asyncio.get_running_loop().run_in_executor(self.executor, self.prever_lote, matriz)
+        # A falha do modelo, qualquer que seja, é repassada a cada requisição do lote
+        except Exception as e:  # noqa: BLE001
+            for _, futuro in lote:
+                if not futuro.done():
+                    futuro.set_exception(e)
+            return
+        for (_, futuro), linha in zip(lote, probabilidades):
+            if not futuro.done():
+                futuro.set_result(linha)
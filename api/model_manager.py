@@ -0,0 +1,235 @@
+# api/model_manager.py
+import hashlib
+import json
+import os
+import posixpath
+import re
+import threading
+import time
+
+import numpy as np
+
+from api.metrics import medir
+from api.readiness import EstadoCarga
+
+# Formatos nativos descritos pelo manifesto gerado pelo model_trainer.py
+FORMATO_XGBOOST = "xgboost-ubj"
+FORMATO_LINEAR = "linear-json"
+
+
+def calcular_sha256(caminho):
+    sha256 = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b''):
+            sha256.update(bloco)
+    return sha256.hexdigest()
+
+
+class ModeloLinear:
+    """
+    Regressão logística multinomial exportada em JSON (coeficientes e interceptos).
+    Calcula as probabilidades com NumPy puro, sem importar o scikit-learn.
+    """
+
+    def __init__(self, coeficientes, interceptos):
+        self.coeficientes = np.asarray(coeficientes, dtype=np.float64)
+        self.interceptos = np.asarray(interceptos, dtype=np.float64)
+
+    @classmethod
+    def carregar(cls, caminho):
+        with open(caminho, encoding='utf-8') as f:
+            dados = json.load(f)
+        return cls(dados['coef'], dados['intercept'])
+
+    def predict_proba(self, matriz):
+        logits = matriz @ self.coeficientes.T + self.interceptos
+        logits -= logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+class ModeloCarregado:
+    """Uma versão do modelo já carregada em memória. Nunca é alterada depois de criada."""
+
+    def __init__(self, versao, modelo, formato="joblib", manifesto=None):
+        self.versao = versao
+        self.modelo = modelo
+        self.formato = formato
+        self.manifesto = manifesto
+        # Para modelos XGBoost usamos o Booster diretamente (inplace_predict),
+        # evitando a conversão para DataFrame/DMatrix a cada requisição.
+        if formato == FORMATO_XGBOOST:
+            self.booster = modelo
+        else:
+            self.booster = modelo.get_booster() if hasattr(modelo, 'get_booster') else None
+        self.carregado_em = time.time()
+
+    def prever_probabilidades(self, matriz):
+        """
+        Retorna a matriz (n_partidas x 3) de probabilidades de vitória do mandante,
+        empate e vitória do visitante.
+        """
+        if self.booster is not None:
+            return self.booster.inplace_predict(matriz)
+        return self.modelo.predict_proba(matriz)
+
+
+class ModelManager:
+    """
+    Gerencia o modelo servido pela API, lido de um armazenamento do shared/storage.py
+    (S3 ou diretório local):
+      - mantém um cache local dos artefatos, indexado pela versão (ETag/checksum),
+        e só baixa o artefato quando ele mudou;
+      - prefere o artefato nativo descrito pelo manifesto (Booster XGBoost em UBJ ou modelo
+        linear em JSON) e usa o joblib apenas quando não há manifesto;
+      - carrega o modelo em uma thread de background, sem bloquear a inicialização;
+      - troca para uma nova versão de forma atômica, sem derrubar requisições em andamento.
+    """
+
+    def __init__(self, fonte, chave_modelo, cache_dir, chave_manifesto=None, features_esperadas=None,
+                 versoes_em_cache=2, n_threads=None):
+        self.fonte = fonte
+        self.chave_modelo = chave_modelo
+        # Quando o manifesto existe na fonte, o artefato nativo (Booster/JSON) tem preferência sobre o joblib
+        self.chave_manifesto = chave_manifesto
+        self.features_esperadas = list(features_esperadas) if features_esperadas is not None else None
+        self.cache_dir = cache_dir
+        self.versoes_em_cache = versoes_em_cache
+        # Threads do XGBoost por previsão. Com vários workers/threads de inferência, 1 evita disputar os núcleos.
+        self.n_threads = n_threads
+        self.ultimo_erro = None
+        # Estado da primeira carga (e das novas tentativas enquanto nenhum modelo foi carregado), para o /ready
+        self.carga = EstadoCarga("modelo")
+        self._atual = None
+        self._lock_atualizacao = threading.Lock()
+        self._thread = None
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @property
+    def atual(self):
+        """Versão carregada no momento (ou None). Quem usa deve guardar a referência durante a requisição."""
+        return self._atual
+
+    def _caminho_cache(self, versao, extensao=".joblib"):
+        nome_seguro = re.sub(r'[^A-Za-z0-9_-]', '_', versao)
+        return os.path.join(self.cache_dir, f"modelo_{nome_seguro}{extensao}")
+
+    def _baixar_para_cache(self, chave, versao, caminho):
+        if os.path.exists(caminho):
+            print(f"Modelo {versao} encontrado no cache local: {caminho}")
+            return
+        print(f"Baixando o modelo {versao} de {self.fonte.descricao(chave)}...")
+        caminho_temp = f"{caminho}.{os.getpid()}.tmp"
+        with medir("download_modelo"):
+            self.fonte.baixar(chave, caminho_temp)
+        os.replace(caminho_temp, caminho)
+
+    def _carregar_nativo(self):
+        """
+        Lê o manifesto e carrega o artefato nativo descrito nele. A versão é o checksum
+        do artefato, conferido depois do download. Retorna (versao, caminho, loader).
+        """
+        manifesto = json.loads(self.fonte.ler(self.chave_manifesto))
+        if self.features_esperadas is not None and manifesto['features'] != self.features_esperadas:
+            raise ValueError(f"Features do manifesto diferem das esperadas pela API: {manifesto['features']}")
+        if manifesto['formato'] not in (FORMATO_XGBOOST, FORMATO_LINEAR):
+            raise ValueError(f"Formato de modelo desconhecido no manifesto: {manifesto['formato']}")
+
+        versao = manifesto['sha256']
+        if self._atual is not None and self._atual.versao == versao:
+            return versao, None, None
+
+        chave = posixpath.join(posixpath.dirname(self.chave_manifesto), manifesto['artefato'])
+        caminho = self._caminho_cache(versao, os.path.splitext(manifesto['artefato'])[1])
+        self._baixar_para_cache(chave, versao, caminho)
+        if calcular_sha256(caminho) != versao:
+            os.remove(caminho)
+            raise ValueError(f"Checksum do artefato {chave} não confere com o manifesto.")
+
+        def carregar():
+            if manifesto['formato'] == FORMATO_XGBOOST:
+                import xgboost
+                modelo = xgboost.Booster(model_file=caminho)
+            else:
+                modelo = ModeloLinear.carregar(caminho)
+            return ModeloCarregado(versao, modelo, manifesto['formato'], manifesto)
+
+        return versao, caminho, carregar
+
+    def _carregar_joblib(self):
+        versao = self.fonte.versao(self.chave_modelo)
+        if self._atual is not None and self._atual.versao == versao:
+            return versao, None, None
+
+        caminho = self._caminho_cache(versao)
+        self._baixar_para_cache(self.chave_modelo, versao, caminho)
+
+        def carregar():
+            # Importado só aqui: o formato nativo dispensa o joblib/scikit-learn na inicialização
+            import joblib
+            return ModeloCarregado(versao, joblib.load(caminho))
+
+        return versao, caminho, carregar
+
+    def atualizar(self):
+        """
+        Verifica a versão do artefato na fonte e, se mudou, baixa (quando não está em cache),
+        carrega e publica o novo modelo. Retorna True se houve troca de versão.
+        """
+        with self._lock_atualizacao:
+            sem_modelo = self._atual is None
+            if sem_modelo:
+                self.carga.iniciar()
+            try:
+                if self.chave_manifesto and self.fonte.existe(self.chave_manifesto):
+                    versao, caminho, carregar = self._carregar_nativo()
+                else:
+                    versao, caminho, carregar = self._carregar_joblib()
+                if carregar is None:
+                    return False
+
+                with medir("carga_modelo"):
+                    novo = carregar()
+                if novo.booster is not None and self.n_threads:
+                    novo.booster.set_param({'nthread': self.n_threads})
+                # A troca é uma única atribuição: requisições em andamento continuam com a versão antiga
+                self._atual = novo
+                self.ultimo_erro = None
+                if sem_modelo:
+                    self.carga.concluir()
+                print(f"Modelo {versao} ({novo.formato}) carregado com sucesso. API pronta para receber requisições.")
+                self._limpar_cache(manter=caminho)
+                return True
+            # Qualquer falha (rede, artefato corrompido, formato inválido) mantém o modelo atual em serviço
+            except Exception as e:  # noqa: BLE001
+                self.ultimo_erro = str(e)
+                if sem_modelo:
+                    self.carga.concluir(e)
+                print(f"ERRO CRÍTICO: Não foi possível carregar o modelo. {e}")
+                return False
+
+    def _limpar_cache(self, manter):
+        artefatos = sorted(
+            (os.path.join(self.cache_dir, nome) for nome in os.listdir(self.cache_dir)
+             if nome.startswith('modelo_') and not nome.endswith('.tmp')),
+            key=os.path.getmtime,
+            reverse=True,
+        )
+        for caminho in artefatos[self.versoes_em_cache:]:
+            if caminho != manter:
+                os.remove(caminho)
+
+    def iniciar_em_background(self, intervalo_recarga=None):
+        """
+        Carrega o modelo em uma thread daemon. Se `intervalo_recarga` (segundos) for informado,
+        continua verificando periodicamente se há uma nova versão para trocar a quente.
+        """
+        def executar():
+            self.atualizar()
+            while intervalo_recarga:
+                time.sleep(intervalo_recarga)
+                self.atualizar()
+
+        self._thread = threading.Thread(target=executar, name="model-manager", daemon=True)
+        self._thread.start()
+        return self._thread
@@ -0,0 +1,76 @@
+# api/readiness.py
+import threading
+import time
+
+# Estados da carga de um componente, reportados pelo /ready
+CARREGANDO = "loading"
+PRONTO = "ready"
+FALHOU = "failed"
+
+
+class EstadoCarga:
+    """
+    Estado da carga de um componente da API (modelo, feature store): loading, ready ou failed,
+    com o início e a duração da última tentativa e o erro, se houver. A carga roda em background;
+    o /ready lê este estado sem bloquear (o / continua respondendo só que o processo está vivo).
+    """
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.status = CARREGANDO
+        self.iniciado_em = None
+        self.duracao_s = None
+        self.erro = None
+        self._inicio = None
+        self._lock = threading.Lock()
+
+    def iniciar(self):
+        with self._lock:
+            self.iniciado_em = time.time()
+            self._inicio = time.perf_counter()
+            self.duracao_s = None
+
+    def concluir(self, erro=None):
+        with self._lock:
+            if self._inicio is not None:
+                self.duracao_s = round(time.perf_counter() - self._inicio, 4)
+            self.status = FALHOU if erro is not None else PRONTO
+            self.erro = str(erro) if erro is not None else None
+
+    def executar(self, funcao):
+        """Executa a carga registrando o estado. Exceções viram `failed` (com a mensagem) e não são propagadas."""
+        self.iniciar()
+        try:
+            resultado = funcao()
+        # Qualquer falha da carga precisa aparecer no /ready, e não derrubar a thread em silêncio
+        except Exception as e:  # noqa: BLE001
+            print(f"ERRO: Falha ao carregar {self.nome}. {e}")
+            self.concluir(e)
+            return None
+        self.concluir()
+        return resultado
+
+    def em_background(self, funcao):
+        """Executa a carga em uma thread daemon e retorna a thread."""
+        thread = threading.Thread(target=self.executar, args=(funcao,), name=f"carga-{self.nome}", daemon=True)
+        thread.start()
+        return thread
+
+    def relatorio(self):
+        with self._lock:
+            return {
+                "status": self.status,
+                "iniciado_em": self.iniciado_em,
+                "duracao_s": self.duracao_s,
+                "erro": self.erro,
+            }
+
+
+def status_geral(estados):
+    """ready se todos os componentes estão prontos, failed se algum falhou, loading nos demais casos."""
+    status = [estado.status for estado in estados]
+    if all(s == PRONTO for s in status):
+        return PRONTO
+    if any(s == FALHOU for s in status):
+        return FALHOU
+    return CARREGANDO
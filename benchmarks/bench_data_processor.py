@@ -0,0 +1,81 @@
+"""
+Desempenho das etapas vetorizadas do data_processor.py (criação do target e extração
+das formações) contra as implementações originais linha a linha, em escala 1x, 10x e
+100x (dados sintéticos).
+
+A equivalência entre as duas versões é verificada em tests/test_data_processor.py.
+
+Uso:
+    python benchmarks/bench_data_processor.py [escalas...]
+"""
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.append(str(RAIZ / "ml_jobs"))
+sys.path.append(str(RAIZ / "benchmarks"))
+sys.path.append(str(RAIZ))
+
+from dados_sinteticos import gerar_partidas
+from data_processor import criar_target, extrair_formacoes
+
+
+# --- Implementações originais (referência de tempo) ---
+def criar_target_original(df):
+    def criar_target(row):
+        if row['vencedor'] == row['mandante']:
+            return 0  # Vitória do Mandante
+        elif row['vencedor'] == '-':
+            return 1  # Empate
+        else:
+            return 2  # Vitória do Visitante
+    return df.apply(criar_target, axis=1)
+
+
+def extrair_formacoes_original(formacoes):
+    def extrair_partes_formacao(formacao):
+        if pd.isna(formacao) or '-' not in str(formacao):
+            return [4, 4, 2]
+        parts = str(formacao).split('-')
+        try:
+            if len(parts) == 3:
+                return [int(p) for p in parts]
+            if len(parts) == 4:
+                return [int(parts[0]), sum(int(p) for p in parts[1:-1]), int(parts[-1])]
+            return [4, 4, 2]
+        except (ValueError, TypeError):
+            return [4, 4, 2]
+    return pd.DataFrame(formacoes.apply(extrair_partes_formacao).tolist(), index=formacoes.index)
+
+
+def preparar(df):
+    df = df.copy()
+    df.columns = df.columns.str.lower()
+    return df
+
+
+def cronometrar(funcao, *args):
+    inicio = time.perf_counter()
+    funcao(*args)
+    return time.perf_counter() - inicio
+
+
+def main():
+    escalas = [float(e) for e in sys.argv[1:]] or [1, 10, 100]
+    print(f"{'escala':>7} {'partidas':>9} | {'target orig':>11} {'target vet':>10} | {'form. orig':>10} {'form. vet':>9}")
+    for escala in escalas:
+        df = preparar(gerar_partidas(escala))
+        tempos = [
+            cronometrar(criar_target_original, df),
+            cronometrar(criar_target, df),
+            cronometrar(extrair_formacoes_original, df['formacao_mandante']),
+            cronometrar(extrair_formacoes, df['formacao_mandante']),
+        ]
+        print(f"{escala:>6g}x {len(df):>9} | {tempos[0]:>10.3f}s {tempos[1]:>9.3f}s | {tempos[2]:>9.3f}s {tempos[3]:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Tempo e pico de memória da engenharia de "Forma" do data_processor.py.
+
+Compara a implementação original (unpivot com pd.concat de duas cópias renomeadas,
+groupby().rolling().mean().shift(1) global e dois merges em ['index', time]) com a
+implementação atual (materialização da feature store com somas acumuladas e consulta
+as-of vetorizada na data de cada partida, sem merges). Os times e estados entram na feature
+store pelos códigos inteiros das colunas categóricas, sem arrays object de uma linha por jogo,
+e as médias são calculadas uma coluna por vez.
+
+Também verifica que a implementação atual bate exatamente com o rolling do pandas
+feito corretamente dentro de cada time (o shift global da versão original vazava
+o último valor de um time para o primeiro jogo do time seguinte). Jogos do mesmo time
+na mesma data recebem todos a forma de antes daquela data (consulta as-of estrita).
+
+Uso:
+    python benchmarks/bench_forma.py [escalas...]
+"""
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.append(str(RAIZ / "ml_jobs"))
+sys.path.append(str(RAIZ / "benchmarks"))
+sys.path.append(str(RAIZ))
+
+from dados_sinteticos import gerar_partidas
+from data_ingestion import concatenar_partidas, normalizar_partidas
+from data_processor import criar_target, limpar_partidas
+
+from shared.feature_store import STATS_FORMA, FeatureStore
+
+
+def preparar(escala):
+    df = limpar_partidas(concatenar_partidas([normalizar_partidas(gerar_partidas(escala))]))
+    df['target'] = criar_target(df)
+    df['pontos_mandante'] = np.where(df['target'] == 0, 3, np.where(df['target'] == 1, 1, 0))
+    df['pontos_visitante'] = np.where(df['target'] == 2, 3, np.where(df['target'] == 1, 1, 0))
+    return df
+
+
+def forma_original(df):
+    """Cópia da implementação original (com o shift global)."""
+    df_unpivot = df.reset_index()
+    df_team_stats = pd.concat([
+        df_unpivot.rename(columns={'mandante': 'time', 'visitante': 'oponente', 'mandante_placar': 'gols_feitos', 'visitante_placar': 'gols_sofridos', 'pontos_mandante': 'pontos'}),
+        df_unpivot.rename(columns={'visitante': 'time', 'mandante': 'oponente', 'visitante_placar': 'gols_feitos', 'mandante_placar': 'gols_sofridos', 'pontos_visitante': 'pontos'})
+    ]).sort_values(by=['time', 'data'])
+
+    rolling_stats = df_team_stats.groupby('time')[STATS_FORMA].rolling(window=5, min_periods=1).mean().shift(1)
+    rolling_stats.rename(columns=lambda x: f'form_{x}', inplace=True)
+
+    df_team_stats.reset_index(drop=True, inplace=True)
+    df_form = pd.concat([df_team_stats[['index', 'time']], rolling_stats.reset_index(drop=True)], axis=1)
+
+    df_final = df_unpivot.merge(df_form, left_on=['index', 'mandante'], right_on=['index', 'time'], suffixes=('', '_mandante'))
+    df_final = df_final.merge(df_form, left_on=['index', 'visitante'], right_on=['index', 'time'], suffixes=('_mandante', '_visitante'))
+    df_final.drop(columns=['time_mandante', 'time_visitante'], inplace=True)
+    return df_final
+
+
+def forma_atual(df):
+    df_final = df.copy(deep=False)
+    feature_store = FeatureStore.de_partidas(df)
+    for lado in ['mandante', 'visitante']:
+        forma = feature_store.forma_em(df[lado], df['data'])
+        for i, stat in enumerate(STATS_FORMA):
+            df_final[f'form_{stat}_{lado}'] = forma[:, i]
+    return df_final
+
+
+def por_time(df):
+    """Duas linhas por partida (mandantes e depois visitantes, na ordem de `df`)."""
+    def duas_vezes(mandante, visitante):
+        return np.concatenate([df[mandante].to_numpy(), df[visitante].to_numpy()])
+
+    return pd.DataFrame({
+        'id': duas_vezes('id', 'id'),
+        'data': duas_vezes('data', 'data'),
+        'time': duas_vezes('mandante', 'visitante'),
+        'gols_feitos': duas_vezes('mandante_placar', 'visitante_placar'),
+        'gols_sofridos': duas_vezes('visitante_placar', 'mandante_placar'),
+        'pontos': duas_vezes('pontos_mandante', 'pontos_visitante'),
+    })
+
+
+def forma_referencia_por_time(df):
+    """
+    Rolling do pandas com o shift feito dentro de cada time (resultado esperado). Jogos do
+    mesmo time na mesma data ficam com a forma do primeiro deles, a de antes daquela data.
+    """
+    df_team_stats = por_time(df)
+    # Mesma ordem da feature store dentro de cada data: pelo ID da partida
+    ordenado = df_team_stats.sort_values(by=['time', 'data', 'id'], kind='stable')
+    rolling_stats = ordenado.groupby('time', sort=False)[STATS_FORMA].rolling(window=5, min_periods=1).mean()
+    rolling_stats = rolling_stats.groupby(level='time', sort=False).shift(1).droplevel('time')
+    rolling_stats = rolling_stats.groupby([ordenado['time'], ordenado['data']]).transform('first', skipna=False)
+    return rolling_stats.sort_index().to_numpy()
+
+
+def forma_atual_por_time(df):
+    """Forma da implementação atual no mesmo layout da referência (mandantes e depois visitantes)."""
+    df_final = forma_atual(df)
+    return np.concatenate([
+        df_final[[f'form_{stat}_{lado}' for stat in STATS_FORMA]].to_numpy()
+        for lado in ['mandante', 'visitante']
+    ])
+
+
+def medir(funcao, df):
+    # Tempo e memória em execuções separadas: o tracemalloc deixa as alocações bem mais lentas
+    inicio = time.perf_counter()
+    funcao(df)
+    duracao = time.perf_counter() - inicio
+
+    tracemalloc.start()
+    funcao(df)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duracao, pico / 1024 ** 2
+
+
+def main():
+    escalas = [float(e) for e in sys.argv[1:]] or [1, 10, 100]
+
+    df = preparar(1)
+    np.testing.assert_allclose(forma_atual_por_time(df), forma_referencia_por_time(df), rtol=1e-12)
+    print("Forma atual idêntica ao rolling do pandas feito dentro de cada time.")
+
+    print(f"{'escala':>7} {'partidas':>9} | {'orig. tempo':>11} {'orig. pico':>11} | {'atual tempo':>11} {'atual pico':>11}")
+    for escala in escalas:
+        df = preparar(escala)
+        tempo_orig, pico_orig = medir(forma_original, df)
+        tempo_atual, pico_atual = medir(forma_atual, df)
+        print(f"{escala:>6g}x {len(df):>9} | {tempo_orig:>10.3f}s {pico_orig:>8.1f} MB | {tempo_atual:>10.3f}s {pico_atual:>8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
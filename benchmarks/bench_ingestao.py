@@ -0,0 +1,90 @@
+"""
+Pico de memória (RSS) e tempo da carga dos CSVs de partidas.
+
+Compara, em um processo novo para cada medição:
+  - original: pd.read_csv com tipos inferidos + concat + to_datetime(dayfirst) + filtro + cópias
+  - schema: data_ingestion.ler_partidas com o schema explícito (categorias, int8/int16)
+  - schema_blocos: o mesmo, lendo em blocos e descartando partidas antigas bloco a bloco
+  - cache: leitura do cache em parquet gerado por data_ingestion.carregar_partidas
+
+Os dados são sintéticos (benchmarks/dados_sinteticos.py) em escala 1x, 10x e 100x.
+
+Uso:
+    python benchmarks/bench_ingestao.py [escalas...]
+"""
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.append(str(RAIZ / "benchmarks"))
+
+from dados_sinteticos import gerar_partidas
+
+CHUNKSIZE = 50_000
+
+# Código executado em um processo separado; mede o RSS antes e depois da carga
+CODIGO_MEDICAO = """
+import json, sys, time
+sys.path.append({ml_jobs!r})
+sys.path.append({raiz!r})
+import pandas as pd
+from data_ingestion import carregar_partidas, ler_partidas
+
+def pico_rss_mb():
+    # VmHWM é o pico de RSS do processo atual (o ru_maxrss herdaria o pico do processo pai)
+    with open('/proc/self/status') as f:
+        for linha in f:
+            if linha.startswith('VmHWM:'):
+                return int(linha.split()[1]) / 1024
+
+modo, caminho, cache_dir = sys.argv[1], sys.argv[2], sys.argv[3]
+rss_inicial = pico_rss_mb()
+inicio = time.perf_counter()
+if modo == 'original':
+    df = pd.concat([pd.read_csv(caminho)], ignore_index=True)
+    df['data'] = pd.to_datetime(df['data'], dayfirst=True)
+    df = df[df['data'].dt.year >= 2014].copy()
+    df.sort_values(by='data', inplace=True)
+    df.columns = df.columns.str.lower()
+elif modo == 'schema':
+    df = ler_partidas(caminho)
+elif modo == 'schema_blocos':
+    df = ler_partidas(caminho, chunksize={chunksize})
+elif modo == 'cache':
+    df = carregar_partidas(caminho, cache_dir=cache_dir)
+duracao = time.perf_counter() - inicio
+rss_final = pico_rss_mb()
+print(json.dumps({{"segundos": duracao, "pico_rss_mb": rss_final, "delta_rss_mb": rss_final - rss_inicial,
+                  "memoria_df_mb": df.memory_usage(deep=True).sum() / 1024 ** 2}}))
+""".format(ml_jobs=str(RAIZ / "ml_jobs"), raiz=str(RAIZ), chunksize=CHUNKSIZE)
+
+
+def medir(modo, caminho_csv, cache_dir):
+    saida = subprocess.run(
+        [sys.executable, "-c", CODIGO_MEDICAO, modo, caminho_csv, cache_dir],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def main():
+    escalas = [float(e) for e in sys.argv[1:]] or [1, 10, 100]
+    print(f"{'escala':>7} {'modo':>14} | {'tempo':>8} {'pico RSS':>10} {'delta RSS':>10} {'DataFrame':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for escala in escalas:
+            caminho_csv = str(Path(tmp) / f"partidas_{escala:g}x.csv")
+            gerar_partidas(escala).to_csv(caminho_csv, index=False)
+            cache_dir = str(Path(tmp) / "cache")
+            # Aquece o cache em parquet antes da medição do modo 'cache'
+            medir('cache', caminho_csv, cache_dir)
+            for modo in ['original', 'schema', 'schema_blocos', 'cache']:
+                r = medir(modo, caminho_csv, cache_dir)
+                print(f"{escala:>6g}x {modo:>14} | {r['segundos']:>7.2f}s {r['pico_rss_mb']:>7.0f} MB "
+                      f"{r['delta_rss_mb']:>7.0f} MB {r['memoria_df_mb']:>7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
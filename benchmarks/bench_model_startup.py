@@ -0,0 +1,118 @@
+"""
+Inicialização a frio da API: tempo e memória (RSS) para carregar o modelo em cada formato.
+
+Compara, em um processo novo para cada medição:
+  - joblib: objeto XGBClassifier/LogisticRegression completo (joblib + scikit-learn + xgboost)
+  - nativo: artefato descrito pelo manifesto (Booster em UBJ ou modelo linear em JSON)
+
+O tempo inclui a importação de api.model_manager, a carga do modelo e a primeira previsão.
+Os artefatos são gerados com o model_trainer.exportar_artefatos a partir da tabela de features.
+
+Uso:
+    python benchmarks/bench_model_startup.py <features_path> [repeticoes]
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.append(str(RAIZ / "ml_jobs"))
+sys.path.append(str(RAIZ))
+
+from model_trainer import criar_modelo, exportar_artefatos
+
+from shared.storage import ArmazenamentoLocal
+
+MODELOS = [
+    ('XGBClassifier', {'max_depth': 3, 'learning_rate': 0.05, 'n_estimators': 100}),
+    ('LogisticRegression', {'C': 0.1}),
+]
+
+# Código executado em um processo separado; mede a inicialização como a API faz
+CODIGO_MEDICAO = f"""
+import json, sys, time
+inicio = time.perf_counter()
+sys.path.insert(0, {str(RAIZ)!r})
+import numpy as np
+from api.model_manager import ModelManager
+from shared.storage import ArmazenamentoLocal
+
+def status_mb(campo):
+    # VmHWM é o pico de RSS do processo atual (o ru_maxrss herdaria o pico do processo pai)
+    with open('/proc/self/status') as f:
+        for linha in f:
+            if linha.startswith(campo + ':'):
+                return int(linha.split()[1]) / 1024
+
+diretorio, cache_dir = sys.argv[1], sys.argv[2]
+manager = ModelManager(ArmazenamentoLocal(diretorio), 'models/modelo_final.joblib', cache_dir,
+                       chave_manifesto='models/modelo_final.manifest.json')
+manager.atualizar()
+probabilidades = manager.atual.prever_probabilidades(np.zeros((1, 16), dtype=np.float32))
+duracao = time.perf_counter() - inicio
+print(json.dumps({{"formato": manager.atual.formato, "segundos": duracao, "rss_mb": status_mb('VmRSS'),
+                  "pico_rss_mb": status_mb('VmHWM'), "modulos": len(sys.modules)}}))
+"""
+
+
+def medir(diretorio, cache_dir):
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    saida = subprocess.run(
+        [sys.executable, "-c", CODIGO_MEDICAO, diretorio, cache_dir],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Uso: python benchmarks/bench_model_startup.py <features_path> [repeticoes]")
+        sys.exit(1)
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    df = pd.read_parquet(sys.argv[1])
+    X = df.drop(columns=['target', 'temporada'], errors='ignore')
+    y = df['target'].to_numpy()
+    amostra = X.to_numpy(dtype=np.float32)[:200]
+
+    print(f"{'modelo':>18} {'formato':>12} | {'tempo p50':>9} {'RSS':>8} {'pico RSS':>9} {'módulos':>8} {'arquivo':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for nome_modelo, params in MODELOS:
+            modelo = criar_modelo(nome_modelo, params).fit(X, y)
+            dir_nativo = Path(tmp) / nome_modelo / "nativo"
+            dir_joblib = Path(tmp) / nome_modelo / "joblib"
+            (dir_nativo / "models").mkdir(parents=True)
+            (dir_joblib / "models").mkdir(parents=True)
+            arquivos = exportar_artefatos(modelo, X.columns, ArmazenamentoLocal(str(dir_nativo / "models")))
+            shutil.copy(dir_nativo / "models" / arquivos[0], dir_joblib / "models" / arquivos[0])
+
+            # Os dois formatos devem produzir as mesmas probabilidades
+            sys.path.insert(0, str(RAIZ))
+            from api.model_manager import ModelManager
+            probabilidades = {}
+            for nome, diretorio in [('joblib', dir_joblib), ('nativo', dir_nativo)]:
+                manager = ModelManager(ArmazenamentoLocal(str(diretorio)), 'models/modelo_final.joblib',
+                                       str(Path(tmp) / "cache_check"), chave_manifesto='models/modelo_final.manifest.json')
+                manager.atualizar()
+                probabilidades[nome] = manager.atual.prever_probabilidades(amostra)
+            diferenca = np.abs(probabilidades['joblib'] - probabilidades['nativo']).max()
+
+            for nome, diretorio, arquivo in [('joblib', dir_joblib, arquivos[0]), ('nativo', dir_nativo, arquivos[1])]:
+                resultados = [medir(str(diretorio), str(Path(tmp) / "cache")) for _ in range(repeticoes)]
+                tempo = np.median([r['segundos'] for r in resultados])
+                r = resultados[-1]
+                tamanho_kb = os.path.getsize(diretorio / "models" / arquivo) / 1024
+                print(f"{nome_modelo:>18} {r['formato']:>12} | {tempo:>8.3f}s {r['rss_mb']:>5.0f} MB "
+                      f"{r['pico_rss_mb']:>6.0f} MB {r['modulos']:>8} {tamanho_kb:>6.0f} KB")
+            print(f"{'':>18} diferença máxima entre as probabilidades: {diferenca:.2e}")
+
+
+if __name__ == "__main__":
+    main()
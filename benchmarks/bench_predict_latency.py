@@ -0,0 +1,88 @@
+"""
+Microbenchmark do caminho quente do /predict.
+
+Compara a latência (p50/p99) de uma previsão de uma única partida em dois caminhos:
+  1. Caminho antigo: pd.DataFrame([features]) + model.predict
+  2. Caminho novo: linha float32 pré-alocada + ModeloCarregado.prever_probabilidades, o mesmo
+     usado pela API (Booster.inplace_predict para XGBoost, predict_proba para modelos lineares)
+
+Uso:
+    python benchmarks/bench_predict_latency.py [caminho_modelo.joblib] [n_repeticoes]
+
+Sem um modelo informado, treina um XGBClassifier pequeno com dados sintéticos. O modelo informado
+pode ser qualquer um salvo pelo model_trainer.py (XGBoost ou LogisticRegression).
+"""
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from xgboost import XGBClassifier
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.append(str(RAIZ))
+
+from api.model_manager import ModeloCarregado
+from shared.feature_store import FEATURE_COLS as FEATURE_ORDER
+
+
+def treinar_modelo_sintetico(n_amostras=5000, seed=42):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.random((n_amostras, len(FEATURE_ORDER))) * 3, columns=FEATURE_ORDER)
+    y = rng.integers(0, 3, n_amostras)
+    modelo = XGBClassifier(eval_metric='mlogloss')
+    modelo.fit(X, y)
+    return modelo
+
+
+def medir(funcao, payloads, n_repeticoes):
+    # Aquecimento para não medir alocações iniciais do XGBoost
+    for payload in payloads[:50]:
+        funcao(payload)
+    tempos = np.empty(n_repeticoes)
+    for i in range(n_repeticoes):
+        payload = payloads[i % len(payloads)]
+        inicio = time.perf_counter()
+        funcao(payload)
+        tempos[i] = time.perf_counter() - inicio
+    return {
+        "p50_ms": float(np.percentile(tempos, 50) * 1000),
+        "p99_ms": float(np.percentile(tempos, 99) * 1000),
+        "media_ms": float(tempos.mean() * 1000),
+    }
+
+
+def main():
+    caminho_modelo = sys.argv[1] if len(sys.argv) > 1 else None
+    n_repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    modelo = joblib.load(caminho_modelo) if caminho_modelo else treinar_modelo_sintetico()
+    carregado = ModeloCarregado("benchmark", modelo)
+
+    rng = np.random.default_rng(0)
+    payloads = [dict(zip(FEATURE_ORDER, map(float, linha))) for linha in rng.random((200, len(FEATURE_ORDER))) * 3]
+
+    def caminho_dataframe(payload):
+        return modelo.predict(pd.DataFrame([payload]))[0]
+
+    linha = np.empty((1, len(FEATURE_ORDER)), dtype=np.float32)
+
+    def caminho_numpy(payload):
+        for j, coluna in enumerate(FEATURE_ORDER):
+            linha[0, j] = payload[coluna]
+        return carregado.prever_probabilidades(linha)[0]
+
+    resultados = {
+        "dataframe_predict": medir(caminho_dataframe, payloads, n_repeticoes),
+        "numpy_prever_probabilidades": medir(caminho_numpy, payloads, n_repeticoes),
+    }
+    for nome, r in resultados.items():
+        print(f"{nome:<30} p50={r['p50_ms']:.3f} ms  p99={r['p99_ms']:.3f} ms  média={r['media_ms']:.3f} ms")
+    ganho = resultados["dataframe_predict"]["p50_ms"] / resultados["numpy_prever_probabilidades"]["p50_ms"]
+    print(f"Ganho no p50: {ganho:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Gera partidas sintéticas no mesmo formato de data/raw/campeonato-brasileiro-full.csv,
+para medir o desempenho dos jobs em escalas maiores que o dataset real.
+
+Os times, estados, arenas, formações e a distribuição de placares são amostrados
+do próprio dataset real; cada temporada é um turno e returno entre 20 times.
+As temporadas cobrem os mesmos anos do dataset real (2003 a 2024). Em escalas
+maiores que 1x, várias "divisões" com nomes de times distintos jogam em paralelo
+em cada temporada, para manter as datas realistas.
+
+Uso:
+    python benchmarks/dados_sinteticos.py <escala> <caminho_saida.csv>
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+CAMINHO_DADOS_REAIS = RAIZ / "data" / "raw" / "campeonato-brasileiro-full.csv"
+TIMES_POR_TEMPORADA = 20
+PRIMEIRA_TEMPORADA = 2003
+ULTIMA_TEMPORADA = 2024
+
+
+def gerar_partidas(escala=1.0, seed=42, caminho_base=CAMINHO_DADOS_REAIS):
+    """Retorna um DataFrame com ~escala x o número de partidas do dataset real."""
+    base = pd.read_csv(caminho_base)
+    rng = np.random.default_rng(seed)
+    n_alvo = int(len(base) * escala)
+
+    estados = pd.concat([
+        base[['mandante', 'mandante_Estado']].set_axis(['time', 'estado'], axis=1),
+        base[['visitante', 'visitante_Estado']].set_axis(['time', 'estado'], axis=1),
+    ]).drop_duplicates('time').set_index('time')['estado']
+    arenas = base.groupby('mandante')['arena'].first()
+    times = estados.index.to_numpy()
+    formacoes = base['formacao_mandante'].to_numpy(dtype=object)
+    placares = base[['mandante_Placar', 'visitante_Placar']].to_numpy()
+
+    n_temporadas = ULTIMA_TEMPORADA - PRIMEIRA_TEMPORADA + 1
+    jogos_por_temporada = TIMES_POR_TEMPORADA * (TIMES_POR_TEMPORADA - 1)
+    n_divisoes = max(1, int(np.ceil(n_alvo / (n_temporadas * jogos_por_temporada))))
+
+    blocos = []
+    for temporada in range(PRIMEIRA_TEMPORADA, ULTIMA_TEMPORADA + 1):
+        for divisao in range(n_divisoes):
+            participantes = rng.choice(times, TIMES_POR_TEMPORADA, replace=False)
+            mandantes, visitantes = np.meshgrid(participantes, participantes)
+            mascara = mandantes != visitantes
+            confrontos = pd.DataFrame({'mandante': mandantes[mascara], 'visitante': visitantes[mascara]})
+            confrontos = confrontos.sample(frac=1, random_state=int(rng.integers(1 << 31))).reset_index(drop=True)
+            n = len(confrontos)
+            inicio = pd.Timestamp(temporada, 4, 1)
+            confrontos['data'] = inicio + pd.to_timedelta(np.arange(n) // (TIMES_POR_TEMPORADA // 2) * 3, unit='D')
+            confrontos['rodata'] = np.arange(n) // (TIMES_POR_TEMPORADA // 2) + 1
+            confrontos['divisao'] = divisao
+            blocos.append(confrontos)
+
+    # Amostra uniforme das partidas geradas, mantendo a ordem cronológica
+    df = pd.concat(blocos, ignore_index=True)
+    df = df.iloc[np.sort(rng.choice(len(df), min(n_alvo, len(df)), replace=False))].reset_index(drop=True)
+    n = len(df)
+    placar = placares[rng.integers(0, len(placares), n)]
+    df['mandante_Placar'] = placar[:, 0]
+    df['visitante_Placar'] = placar[:, 1]
+    df['vencedor'] = np.where(
+        df['mandante_Placar'] > df['visitante_Placar'], df['mandante'],
+        np.where(df['mandante_Placar'] < df['visitante_Placar'], df['visitante'], '-'),
+    )
+    df['formacao_mandante'] = formacoes[rng.integers(0, len(formacoes), n)]
+    df['formacao_visitante'] = formacoes[rng.integers(0, len(formacoes), n)]
+    df['tecnico_mandante'] = ''
+    df['tecnico_visitante'] = ''
+    df['arena'] = df['mandante'].map(arenas).fillna('Arena Sintética')
+    df['mandante_Estado'] = df['mandante'].map(estados)
+    df['visitante_Estado'] = df['visitante'].map(estados)
+    # Times das divisões extras ganham um sufixo para não se misturarem com os originais
+    for coluna in ['mandante', 'visitante', 'vencedor']:
+        sufixo = np.where((df['divisao'] > 0) & (df[coluna] != '-'), ' ' + df['divisao'].astype(str), '')
+        df[coluna] = df[coluna] + sufixo
+    df['hora'] = '16:00'
+    df['ID'] = np.arange(1, n + 1)
+    df['data'] = df['data'].dt.strftime('%d/%m/%Y')
+    return df[base.columns]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Uso: python benchmarks/dados_sinteticos.py <escala> <caminho_saida.csv>")
+        sys.exit(1)
+    gerar_partidas(float(sys.argv[1])).to_csv(sys.argv[2], index=False)
@@ -0,0 +1,170 @@
+"""
+Teste de carga do POST /predict: vazão (req/s), latência p50/p99 e memória total (PSS) do servidor.
+
+Compara, cada um com o servidor iniciado em um processo novo:
+  - atual: a API da revisão anterior ao modo assíncrono (uvicorn, 1 worker, endpoints síncronos)
+  - uvicorn: a API atual com 1 worker, executor de inferência e sem micro-batching
+  - gunicorn_sem_preload: N workers, cada um carregando a sua cópia do modelo (o modo do Dockerfile)
+  - gunicorn: N workers com o modelo pré-carregado antes do fork (MODEL_PRELOAD=1), sem micro-batching
+  - gunicorn_microbatch: o mesmo, com micro-batching das requisições simultâneas
+
+O diretório informado deve ter a estrutura do bucket (models/ e raw/dados_producao_inicial.csv),
+como o MODEL_LOCAL_DIR da API. Como o gerador de carga roda na mesma máquina, ele disputa CPU com
+o servidor: os números servem para comparar as configurações entre si.
+
+Uso:
+    python benchmarks/load_test_api.py <diretorio_modelo> [--concorrencia=64] [--duracao=10] [--workers=<n>]
+"""
+import asyncio
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+RAIZ = Path(__file__).resolve().parent.parent
+PORTA = 8790
+PAYLOAD = {
+    "form_gols_feitos_mandante": 1.6, "form_gols_sofridos_mandante": 0.8, "form_pontos_mandante": 2.0,
+    "form_gols_feitos_visitante": 1.0, "form_gols_sofridos_visitante": 1.2, "form_pontos_visitante": 1.4,
+    "eh_classico": 0, "mandante_def": 4, "mandante_mid": 3, "mandante_att": 3,
+    "visitante_def": 4, "visitante_mid": 5, "visitante_att": 1,
+    "diff_def": 0, "diff_mid": -2, "diff_att": 2,
+}
+
+
+def revisao_anterior():
+    """Última revisão antes do modo assíncrono (pai do commit que adicionou o micro-batcher)."""
+    commit = subprocess.run(
+        ["git", "log", "--diff-filter=A", "--format=%H", "--", "api/micro_batcher.py"],
+        cwd=RAIZ, capture_output=True, text=True, check=True,
+    ).stdout.split()
+    return f"{commit[-1]}^" if commit else "HEAD"
+
+
+def extrair_revisao(revisao, destino):
+    arquivo = subprocess.run(["git", "archive", revisao, "api", "ml_jobs"], cwd=RAIZ, capture_output=True, check=True).stdout
+    subprocess.run(["tar", "-x", "-C", str(destino)], input=arquivo, check=True)
+
+
+def pss_total_mb(pid):
+    """Soma do PSS do processo e de seus filhos (a memória compartilhada por copy-on-write é dividida entre eles)."""
+    total = 0
+    pendentes = [pid]
+    while pendentes:
+        atual = pendentes.pop()
+        try:
+            with open(f"/proc/{atual}/smaps_rollup") as f:
+                for linha in f:
+                    if linha.startswith("Pss:"):
+                        total += int(linha.split()[1])
+            with open(f"/proc/{atual}/task/{atual}/children") as f:
+                pendentes.extend(int(filho) for filho in f.read().split())
+        except FileNotFoundError:
+            continue
+    return total / 1024
+
+
+def iniciar_servidor(comando, cwd, env):
+    processo = subprocess.Popen(comando, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                start_new_session=True)
+    limite = time.time() + 120
+    while time.time() < limite:
+        try:
+            if httpx.get(f"http://127.0.0.1:{PORTA}/model", timeout=1).json().get("version"):
+                return processo
+        except (httpx.HTTPError, json.JSONDecodeError):
+            pass
+        time.sleep(0.5)
+    parar_servidor(processo)
+    raise RuntimeError(f"O servidor não ficou pronto: {' '.join(comando)}")
+
+
+def parar_servidor(processo):
+    os.killpg(processo.pid, signal.SIGTERM)
+    try:
+        processo.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        os.killpg(processo.pid, signal.SIGKILL)
+
+
+async def gerar_carga(concorrencia, duracao):
+    latencias = []
+    erros = 0
+    limites = httpx.Limits(max_connections=concorrencia, max_keepalive_connections=concorrencia)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORTA}", limits=limites, timeout=30) as cliente:
+        fim = time.perf_counter() + duracao
+
+        async def usuario():
+            nonlocal erros
+            while time.perf_counter() < fim:
+                inicio = time.perf_counter()
+                resposta = await cliente.post("/predict", json=PAYLOAD)
+                if resposta.status_code == 200 and "prediction_numeric" in resposta.json():
+                    latencias.append(time.perf_counter() - inicio)
+                else:
+                    erros += 1
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(usuario() for _ in range(concorrencia)))
+        tempo_total = time.perf_counter() - inicio
+    return np.array(latencias), erros, tempo_total
+
+
+def main():
+    opcoes = dict(a[2:].split('=', 1) for a in sys.argv[1:] if a.startswith('--') and '=' in a)
+    argumentos = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if len(argumentos) != 1:
+        print("Uso: python benchmarks/load_test_api.py <diretorio_modelo> [--concorrencia=64] [--duracao=10] [--workers=<n>]")
+        sys.exit(1)
+    diretorio_modelo = str(Path(argumentos[0]).resolve())
+    concorrencia = int(opcoes.get('concorrencia', 64))
+    duracao = float(opcoes.get('duracao', 10))
+    workers = int(opcoes.get('workers', os.cpu_count() or 1))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        revisao = revisao_anterior()
+        dir_atual = Path(tmp) / "atual"
+        dir_atual.mkdir()
+        extrair_revisao(revisao, dir_atual)
+
+        env_base = dict(os.environ, MODEL_LOCAL_DIR=diretorio_modelo, MODEL_RELOAD_INTERVAL="0")
+        historico = Path(diretorio_modelo) / "raw" / "dados_producao_inicial.csv"
+        if historico.exists():
+            env_base["HISTORICO_LOCAL_PATH"] = str(historico)
+        uvicorn = [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(PORTA), "--log-level", "warning"]
+        gunicorn = [sys.executable, "-m", "gunicorn", "-c", "api/gunicorn_conf.py", "api.main:app"]
+        env_gunicorn = dict(env_base, WEB_CONCURRENCY=str(workers), BIND=f"127.0.0.1:{PORTA}")
+        configuracoes = [
+            (f"atual ({revisao[:8]})", uvicorn, dir_atual, env_base),
+            ("uvicorn", uvicorn, RAIZ, dict(env_base, MICRO_BATCH_WINDOW_MS="0")),
+            (f"gunicorn_sem_preload x{workers}", gunicorn, RAIZ, dict(env_gunicorn, MICRO_BATCH_WINDOW_MS="0")),
+            (f"gunicorn x{workers}", gunicorn, RAIZ, dict(env_gunicorn, MICRO_BATCH_WINDOW_MS="0", MODEL_PRELOAD="1")),
+            (f"gunicorn_microbatch x{workers}", gunicorn, RAIZ, dict(env_gunicorn, MODEL_PRELOAD="1")),
+        ]
+
+        print(f"Concorrência: {concorrencia} | duração: {duracao:g}s | núcleos: {os.cpu_count()}")
+        print(f"{'configuração':>28} | {'req/s':>8} {'p50':>8} {'p99':>8} {'erros':>6} {'PSS':>8}")
+        for nome, comando, cwd, env in configuracoes:
+            cache_dir = Path(tmp) / f"cache_{len(nome)}"
+            processo = iniciar_servidor(comando, cwd, dict(env, MODEL_CACHE_DIR=str(cache_dir)))
+            try:
+                asyncio.run(gerar_carga(concorrencia, 1))  # aquecimento
+                latencias, erros, tempo_total = asyncio.run(gerar_carga(concorrencia, duracao))
+                memoria = pss_total_mb(processo.pid)
+            finally:
+                parar_servidor(processo)
+                shutil.rmtree(cache_dir, ignore_errors=True)
+            print(f"{nome:>28} | {len(latencias) / tempo_total:>8.0f} {1000 * np.percentile(latencias, 50):>6.1f}ms "
+                  f"{1000 * np.percentile(latencias, 99):>6.1f}ms {erros:>6} {memoria:>5.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
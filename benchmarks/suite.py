@@ -0,0 +1,310 @@
+"""
+Suíte de benchmarks reproduzível dos três caminhos do projeto: processamento, treino e API.
+
+Para cada escala (múltiplo do tamanho de data/raw/campeonato-brasileiro-full.csv) a suíte
+gera partidas sintéticas (benchmarks/dados_sinteticos.py, seed fixa) e mede:
+  - processamento: tempo total, pico de memória e tempo de cada etapa do data_processor.py
+  - treino: tempo total e de cada etapa do model_trainer.py, com o modelo salvo em disco (sem S3)
+  - API: latência (p50/p99) e vazão do POST /predict, do POST /predict/batch (380 partidas) e
+    do GET /predict/match, em processo com o TestClient do FastAPI e o modelo treinado na menor escala
+
+Cada job roda em um processo novo, para que o pico de memória e o tempo de import sejam
+os de uma execução real. O resultado é um JSON com as métricas e os metadados da execução
+(revisão do git, Python, núcleos); o `comparar` aponta as métricas que pioraram além da
+tolerância em relação a um baseline salvo e termina com código 1 se houver regressões.
+
+Uso:
+    python benchmarks/suite.py executar [--escalas=1,10,100] [--escalas-treino=1,10] [--saida=<resultado.json>] [--baseline]
+    python benchmarks/suite.py comparar [<resultado.json>] [--baseline=<baseline.json>] [--tolerancia=0.10]
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+import numpy as np
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.append(str(RAIZ / "benchmarks"))
+
+from dados_sinteticos import gerar_partidas
+
+DIRETORIO_RESULTADOS = RAIZ / "benchmarks" / "resultados"
+CAMINHO_BASELINE = DIRETORIO_RESULTADOS / "baseline.json"
+CAMINHO_ULTIMO = DIRETORIO_RESULTADOS / "ultimo.json"
+HISTORICO_API = RAIZ / "data" / "dados_producao_inicial.csv"
+SEED = 42
+# Partidas do arquivo de "novas partidas" do processamento (uma temporada)
+PARTIDAS_NOVAS = 380
+REQUISICOES_API = 2000
+LOTES_API = 50
+
+# Diferença absoluta mínima para uma piora contar como regressão, pela unidade da métrica
+# (evita falsos alarmes em métricas muito pequenas, onde o ruído relativo é grande)
+PISOS_ABSOLUTOS = {"segundos": 0.05, "ms": 0.2, "mb": 5.0, "req_s": 0.0}
+
+PAYLOAD = {
+    "form_gols_feitos_mandante": 1.6, "form_gols_sofridos_mandante": 0.8, "form_pontos_mandante": 2.0,
+    "form_gols_feitos_visitante": 1.0, "form_gols_sofridos_visitante": 1.2, "form_pontos_visitante": 1.4,
+    "eh_classico": 0, "mandante_def": 4, "mandante_mid": 3, "mandante_att": 3,
+    "visitante_def": 4, "visitante_mid": 5, "visitante_att": 1,
+    "diff_def": 0, "diff_mid": -2, "diff_att": 2,
+}
+
+
+def executar_processo(comando, cwd, env=None):
+    # Os scripts importam o pacote shared/ a partir da raiz do repositório
+    env = dict(env or os.environ, PYTHONPATH=str(RAIZ))
+    inicio = time.perf_counter()
+    resultado = subprocess.run(comando, cwd=cwd, env=env, capture_output=True, text=True, check=False)
+    duracao = time.perf_counter() - inicio
+    if resultado.returncode != 0:
+        raise RuntimeError(f"Falha em {' '.join(map(str, comando))}:\n{resultado.stdout[-2000:]}\n{resultado.stderr[-2000:]}")
+    return resultado.stdout, duracao
+
+
+def metricas_do_cronometro(prefixo, caminho_tempos):
+    """Converte o relatório do CronometroJob (ml_jobs/job_timing.py) em métricas planas."""
+    with open(caminho_tempos, encoding="utf-8") as f:
+        relatorio = json.load(f)
+    metricas = {f"{prefixo}.segundos": relatorio["segundos_total"]}
+    if relatorio.get("pico_memoria_mb") is not None:
+        metricas[f"{prefixo}.pico_memoria_mb"] = round(relatorio["pico_memoria_mb"], 1)
+    for etapa in relatorio["etapas"]:
+        metricas[f"{prefixo}.etapa.{etapa['etapa']}.segundos"] = etapa["segundos"]
+    return metricas
+
+
+def medir_processamento(escala, tmp):
+    """Roda o data_processor.py sobre o histórico sintético e uma temporada de partidas novas."""
+    df = gerar_partidas(escala, seed=SEED)
+    caminho_hist = tmp / f"hist_{escala:g}x.csv"
+    caminho_novas = tmp / f"novas_{escala:g}x.csv"
+    saida = tmp / f"features_{escala:g}x"
+    # As novas partidas repetem as últimas do histórico: o job precisa deduplicar pelo ID
+    df.to_csv(caminho_hist, index=False)
+    df.tail(PARTIDAS_NOVAS).to_csv(caminho_novas, index=False)
+
+    _, duracao = executar_processo(
+        [sys.executable, "data_processor.py", str(caminho_hist), str(caminho_novas), str(saida)], RAIZ / "ml_jobs",
+    )
+    prefixo = f"processamento.{escala:g}x"
+    metricas = metricas_do_cronometro(prefixo, saida / "_tempos.json")
+    metricas[f"{prefixo}.processo.segundos"] = round(duracao, 4)
+    print(f"  processamento {escala:g}x ({len(df)} partidas): {duracao:.2f}s, "
+          f"pico {metricas.get(f'{prefixo}.pico_memoria_mb', 0):.0f} MB")
+    return metricas, saida
+
+
+def medir_treino(escala, caminho_features, tmp):
+    """Treina com a saída do processamento, salvando o modelo em disco com a estrutura do bucket."""
+    diretorio_modelo = tmp / f"modelo_{escala:g}x"
+    caminho_modelo = diretorio_modelo / "models" / "modelo_final.joblib"
+    _, duracao = executar_processo(
+        [sys.executable, "model_trainer.py", str(caminho_features), str(caminho_modelo)], RAIZ / "ml_jobs",
+    )
+    prefixo = f"treino.{escala:g}x"
+    metricas = metricas_do_cronometro(prefixo, diretorio_modelo / "models" / "modelo_final.tempos.json")
+    metricas[f"{prefixo}.processo.segundos"] = round(duracao, 4)
+    print(f"  treino {escala:g}x: {duracao:.2f}s")
+    return metricas, diretorio_modelo
+
+
+def medir_api(diretorio_modelo, tmp):
+    """Roda as medições da API em um processo novo, com o modelo e o histórico locais."""
+    env = dict(
+        os.environ, MODEL_LOCAL_DIR=str(diretorio_modelo), MODEL_CACHE_DIR=str(tmp / "cache_api"),
+        MODEL_RELOAD_INTERVAL="0", HISTORICO_LOCAL_PATH=str(HISTORICO_API), PROFILE_EVERY_N="0",
+    )
+    saida, _ = executar_processo([sys.executable, str(Path(__file__).resolve()), "medir-api"], RAIZ, env)
+    # A última linha da saída é o JSON com as métricas (as anteriores são os logs da API)
+    metricas = json.loads(saida.strip().splitlines()[-1])
+    print(f"  API /predict: p50 {metricas['api.predict.p50_ms']:.2f}ms, {metricas['api.predict.req_s']:.0f} req/s")
+    return metricas
+
+
+def cronometrar_requisicoes(enviar, n):
+    latencias = np.empty(n)
+    inicio_total = time.perf_counter()
+    for i in range(n):
+        inicio = time.perf_counter()
+        resposta = enviar()
+        latencias[i] = time.perf_counter() - inicio
+        if resposta.status_code != 200 or "error" in resposta.json():
+            raise RuntimeError(f"Resposta inesperada da API: {resposta.status_code} {resposta.text[:200]}")
+    duracao = time.perf_counter() - inicio_total
+    return latencias, duracao
+
+
+def metricas_de_latencia(prefixo, latencias, duracao):
+    return {
+        f"{prefixo}.p50_ms": round(1000 * float(np.percentile(latencias, 50)), 4),
+        f"{prefixo}.p99_ms": round(1000 * float(np.percentile(latencias, 99)), 4),
+        f"{prefixo}.req_s": round(len(latencias) / duracao, 2),
+    }
+
+
+def medir_api_em_processo():
+    """Executado no subprocesso do `medir_api`: importa a API já com as variáveis de ambiente definidas."""
+    sys.path.insert(0, str(RAIZ))
+    from fastapi.testclient import TestClient
+
+    import api.main as api_main
+    from api.main import app
+
+    with TestClient(app) as cliente:
+        # O modelo e a feature store são carregados em background: espera o /ready
+        limite = time.time() + 120
+        prontidao = cliente.get("/ready").json()
+        while prontidao["status"] == "loading" and time.time() < limite:
+            time.sleep(0.1)
+            prontidao = cliente.get("/ready").json()
+        if prontidao["status"] != "ready":
+            raise RuntimeError(f"A API não ficou pronta: {prontidao}")
+        # Um confronto real da temporada mais recente do histórico
+        _, partidas = api_main.feature_store.partidas_da_temporada()
+        mandante, visitante = partidas[-1][:2]
+        lote = [PAYLOAD] * 380
+
+        def predict():
+            return cliente.post("/predict", json=PAYLOAD)
+
+        def predict_batch():
+            return cliente.post("/predict/batch", json=lote)
+
+        def predict_match():
+            return cliente.get("/predict/match", params={"mandante": mandante, "visitante": visitante})
+
+        metricas = {}
+        for nome, enviar, n in [("predict", predict, REQUISICOES_API), ("predict_batch", predict_batch, LOTES_API),
+                                ("predict_match", predict_match, REQUISICOES_API)]:
+            cronometrar_requisicoes(enviar, max(1, n // 20))  # aquecimento
+            metricas.update(metricas_de_latencia(f"api.{nome}", *cronometrar_requisicoes(enviar, n)))
+    print(json.dumps(metricas))
+
+
+def metadados(escalas, escalas_treino):
+    def git(*args):
+        resultado = subprocess.run(["git", *args], cwd=RAIZ, capture_output=True, text=True, check=False)
+        return resultado.stdout.strip() if resultado.returncode == 0 else None
+
+    return {
+        "executado_em": datetime.now(UTC).isoformat(),
+        "revisao": git("rev-parse", "--short", "HEAD"),
+        "alteracoes_locais": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "seed": SEED,
+        "escalas": escalas,
+        "escalas_treino": escalas_treino,
+    }
+
+
+def executar(opcoes):
+    escalas = [float(e) for e in opcoes.get("escalas", "1,10,100").split(",")]
+    escalas_treino = [float(e) for e in opcoes.get("escalas-treino", "1,10").split(",")]
+    if "baseline" in opcoes:
+        caminho_saida = CAMINHO_BASELINE
+    else:
+        caminho_saida = Path(opcoes.get("saida", CAMINHO_ULTIMO))
+
+    metricas = {}
+    modelos = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for escala in sorted(set(escalas) | set(escalas_treino)):
+            print(f"Escala {escala:g}x")
+            metricas_processamento, caminho_features = medir_processamento(escala, tmp)
+            if escala in escalas:
+                metricas.update(metricas_processamento)
+            if escala in escalas_treino:
+                metricas_treino, modelos[escala] = medir_treino(escala, caminho_features, tmp)
+                metricas.update(metricas_treino)
+        if modelos:
+            metricas.update(medir_api(modelos[min(modelos)], tmp))
+
+    resultado = {"metadados": metadados(escalas, escalas_treino), "metricas": metricas}
+    caminho_saida.parent.mkdir(parents=True, exist_ok=True)
+    with open(caminho_saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"Resultado salvo em: {caminho_saida}")
+
+
+def direcao_e_piso(nome):
+    """(maior_e_melhor, piso_absoluto) de uma métrica, pela unidade no fim do nome."""
+    unidade = nome.rsplit(".", 1)[-1].rsplit("_", 1)[-1]
+    if nome.endswith("req_s"):
+        return True, PISOS_ABSOLUTOS["req_s"]
+    return False, PISOS_ABSOLUTOS.get(unidade, 0.0)
+
+
+def comparar_resultados(baseline, atual, tolerancia):
+    """Lista de (métrica, valor_baseline, valor_atual, variação relativa, regressão?)."""
+    linhas = []
+    for nome in sorted(set(baseline) & set(atual)):
+        antes, depois = baseline[nome], atual[nome]
+        if not antes:
+            continue
+        variacao = (depois - antes) / antes
+        maior_e_melhor, piso = direcao_e_piso(nome)
+        piora = -variacao if maior_e_melhor else variacao
+        regressao = piora > tolerancia and abs(depois - antes) > piso
+        linhas.append((nome, antes, depois, variacao, regressao))
+    return linhas
+
+
+def comparar(argumentos, opcoes):
+    caminho_atual = Path(argumentos[0]) if argumentos else CAMINHO_ULTIMO
+    caminho_baseline = Path(opcoes.get("baseline", CAMINHO_BASELINE))
+    tolerancia = float(opcoes.get("tolerancia", 0.10))
+    with open(caminho_baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(caminho_atual, encoding="utf-8") as f:
+        atual = json.load(f)
+
+    print(f"Baseline: {caminho_baseline} (revisão {baseline['metadados'].get('revisao')}, "
+          f"{baseline['metadados'].get('cpus')} núcleos)")
+    print(f"Atual:    {caminho_atual} (revisão {atual['metadados'].get('revisao')}, "
+          f"{atual['metadados'].get('cpus')} núcleos)")
+    if baseline["metadados"].get("cpus") != atual["metadados"].get("cpus"):
+        print("AVISO: os resultados foram obtidos em máquinas com números de núcleos diferentes.")
+
+    linhas = comparar_resultados(baseline["metricas"], atual["metricas"], tolerancia)
+    print(f"{'métrica':<55} {'baseline':>12} {'atual':>12} {'variação':>9}")
+    for nome, antes, depois, variacao, regressao in linhas:
+        marca = "  REGRESSÃO" if regressao else ""
+        print(f"{nome:<55} {antes:>12.4g} {depois:>12.4g} {variacao:>+8.1%}{marca}")
+    so_baseline = sorted(set(baseline["metricas"]) - set(atual["metricas"]))
+    if so_baseline:
+        print(f"Métricas do baseline ausentes no resultado atual: {', '.join(so_baseline)}")
+
+    regressoes = [linha[0] for linha in linhas if linha[4]]
+    if regressoes:
+        print(f"\n{len(regressoes)} regressão(ões) acima de {tolerancia:.0%}: {', '.join(regressoes)}")
+        sys.exit(1)
+    print(f"\nNenhuma regressão acima de {tolerancia:.0%}.")
+
+
+def main():
+    opcoes = dict(a[2:].split("=", 1) if "=" in a else (a[2:], True) for a in sys.argv[1:] if a.startswith("--"))
+    argumentos = [a for a in sys.argv[1:] if not a.startswith("--")]
+    comando = argumentos[0] if argumentos else None
+    if comando == "executar":
+        executar(opcoes)
+    elif comando == "comparar":
+        comparar(argumentos[1:], opcoes)
+    elif comando == "medir-api":
+        medir_api_em_processo()
+    else:
+        print(__doc__)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
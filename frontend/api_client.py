@@ -0,0 +1,182 @@
+# frontend/api_client.py
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class CachePrevisoes:
+    """
+    Cache LRU com expiração (TTL) das respostas da API. Cada entrada guarda também a
+    latência da chamada que a gerou, para contabilizar o tempo economizado nos acertos.
+    """
+
+    def __init__(self, tamanho_maximo=1024, ttl=600):
+        self.tamanho_maximo = tamanho_maximo
+        self.ttl = ttl
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.latencia_economizada = 0.0
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def obter(self, chave):
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None or entrada[0] < time.monotonic():
+                if entrada is not None:
+                    del self._entradas[chave]
+                self.falhas += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            self.latencia_economizada += entrada[2]
+            return entrada[1]
+
+    def guardar(self, chave, resposta, latencia):
+        with self._lock:
+            self._entradas[chave] = (time.monotonic() + self.ttl, resposta, latencia)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.tamanho_maximo:
+                self._entradas.popitem(last=False)
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+
+
+class ClienteAPI:
+    """
+    Cliente HTTP do frontend para a API de previsão:
+      - uma única sessão com pool de conexões keep-alive, timeouts e novas tentativas limitadas;
+      - cache das previsões indexado pelo hash do payload de features e pela versão do modelo;
+      - o cache é descartado quando a versão do modelo informada pela API (GET /model) muda.
+    """
+
+    def __init__(self, url_base, timeout=(3.05, 15), tentativas=3, tamanho_pool=10,
+                 tamanho_cache=1024, ttl_cache=600, intervalo_versao=30):
+        self.url_base = url_base.rstrip('/')
+        self.timeout = timeout
+        self.intervalo_versao = intervalo_versao
+        self.cache = CachePrevisoes(tamanho_cache, ttl_cache)
+        self.invalidacoes = 0
+        self.latencia_total_chamadas = 0.0
+        self.chamadas = 0
+        # Protege os contadores: o cliente é compartilhado pelas sessões (threads) do Streamlit
+        self._lock = threading.Lock()
+
+        # As previsões não alteram estado na API, então também repetimos POSTs após falhas transitórias
+        retry = Retry(
+            total=tentativas, backoff_factor=0.3, status_forcelist=[502, 503, 504],
+            allowed_methods=frozenset(['GET', 'POST']), raise_on_status=False,
+        )
+        adaptador = HTTPAdapter(pool_connections=tamanho_pool, pool_maxsize=tamanho_pool, max_retries=retry)
+        self.sessao = requests.Session()
+        self.sessao.mount('http://', adaptador)
+        self.sessao.mount('https://', adaptador)
+
+        self._versao = None
+        self._versao_verificada_em = 0.0
+        self._lock_versao = threading.Lock()
+
+    def _chamar(self, metodo, caminho, **kwargs):
+        inicio = time.perf_counter()
+        response = self.sessao.request(metodo, f"{self.url_base}{caminho}", timeout=self.timeout, **kwargs)
+        latencia = time.perf_counter() - inicio
+        response.raise_for_status()
+        with self._lock:
+            self.chamadas += 1
+            self.latencia_total_chamadas += latencia
+        return response.json(), latencia
+
+    def versao_modelo(self):
+        """Versão do modelo servido pela API, consultada no máximo a cada `intervalo_versao` segundos."""
+        with self._lock_versao:
+            if time.monotonic() - self._versao_verificada_em < self.intervalo_versao:
+                return self._versao
+            try:
+                versao = self._chamar('GET', '/model')[0].get('version')
+            except requests.exceptions.RequestException:
+                # Sem a versão, não dá para garantir que o cache ainda vale
+                versao = None
+            if versao != self._versao:
+                if self._versao is not None:
+                    with self._lock:
+                        self.invalidacoes += 1
+                self.cache.limpar()
+                self._versao = versao
+            self._versao_verificada_em = time.monotonic()
+            return versao
+
+    @staticmethod
+    def _chave(tipo, payload, versao):
+        conteudo = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+        return f"{tipo}:{versao}:{hashlib.sha256(conteudo.encode('utf-8')).hexdigest()}"
+
+    def prever(self, features_payload):
+        """Previsão de um confronto (POST /predict), usando o cache quando possível."""
+        versao = self.versao_modelo()
+        chave = self._chave('predict', features_payload, versao)
+        resposta = self.cache.obter(chave) if versao is not None else None
+        if resposta is not None:
+            return resposta
+
+        resposta, latencia = self._chamar('POST', '/predict', json=features_payload)
+        if versao is not None and 'error' not in resposta:
+            self.cache.guardar(chave, resposta, latencia)
+        return resposta
+
+    def prever_lote(self, lista_payloads):
+        """
+        Previsões com probabilidades de vários confrontos. Só os payloads que não estão
+        no cache são enviados, em uma única chamada ao POST /predict/batch.
+        Retorna a resposta no mesmo formato do endpoint.
+        """
+        versao = self.versao_modelo()
+        chaves = [self._chave('batch_proba', payload, versao) for payload in lista_payloads]
+        previsoes = [self.cache.obter(chave) if versao is not None else None for chave in chaves]
+        faltantes = [i for i, previsao in enumerate(previsoes) if previsao is None]
+
+        if faltantes:
+            resposta, latencia = self._chamar(
+                'POST', '/predict/batch', params={"probabilities": True},
+                json=[lista_payloads[i] for i in faltantes],
+            )
+            if 'previsoes' not in resposta:
+                return resposta
+            # A latência do lote é dividida entre as previsões para estimar a economia nos acertos
+            latencia_por_item = latencia / len(faltantes)
+            for i, previsao in zip(faltantes, resposta['previsoes']):
+                previsoes[i] = previsao
+                if versao is not None:
+                    self.cache.guardar(chaves[i], previsao, latencia_por_item)
+
+        return {"total": len(previsoes), "previsoes": previsoes}
+
+    def metricas(self):
+        # Leituras consistentes: cada grupo de contadores é copiado sob o lock que o protege
+        with self.cache._lock:
+            acertos, falhas = self.cache.acertos, self.cache.falhas
+            latencia_economizada = self.cache.latencia_economizada
+            entradas = len(self.cache)
+        with self._lock:
+            chamadas, latencia_total, invalidacoes = self.chamadas, self.latencia_total_chamadas, self.invalidacoes
+        consultas = acertos + falhas
+        return {
+            "acertos": acertos,
+            "falhas": falhas,
+            "taxa_acerto": acertos / consultas if consultas else 0.0,
+            "latencia_economizada_s": latencia_economizada,
+            "latencia_media_chamada_ms": 1000 * latencia_total / chamadas if chamadas else 0.0,
+            "entradas_em_cache": entradas,
+            "invalidacoes": invalidacoes,
+            "versao_modelo": self._versao,
+        }
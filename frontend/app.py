@@ -1,115 +1,124 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import requests
-import boto3
 import os
-from io import StringIO
+import tempfile
 from dotenv import load_dotenv
+from api_client import ClienteAPI
+
+from shared.feature_store import FeatureStore, ler_partidas_csv
+from shared.storage import armazenamento_do_ambiente
 
 # Carregar as variáveis de ambiente do arquivo .env
 load_dotenv()
 
 # --- CONFIGURAÇÕES GERAIS (LIDAS DO AMBIENTE) ---
 # Ler as configurações do ambiente
-NOME_DO_BUCKET_S3 = os.getenv("S3_BUCKET_NAME")
 URL_DA_API_APPRUNNER = os.getenv("APP_RUNNER_SERVICE_URL")
 
 CAMINHO_DADOS_HISTORICOS = "raw/dados_producao_inicial.csv"
-
-
-# --- FUNÇÕES DE ENGENHARIA DE FEATURES (Adaptadas do data_processor.py) ---
-@st.cache_data(ttl=3600)
-def carregar_dados_s3():
-    print("Carregando dados do S3...")
-    if not NOME_DO_BUCKET_S3:
-        raise ValueError("A variável de ambiente S3_BUCKET_NAME não está configurada no arquivo .env")
-    
-    s3_client = boto3.client('s3')
-    obj = s3_client.get_object(Bucket=NOME_DO_BUCKET_S3, Key=CAMINHO_DADOS_HISTORICOS)
-    df = pd.read_csv(StringIO(obj['Body'].read().decode('utf-8')))
-    
-    df.columns = df.columns.str.lower()
-    if 'rodata' in df.columns:
-        df.rename(columns={'rodata': 'rodada'}, inplace=True)
-    df['data'] = pd.to_datetime(df['data'], dayfirst=True)
+# Feature store gerada pelo data_processor.py (a mesma lida pela API). Sem ela, é materializada a partir do CSV.
+CAMINHO_FEATURE_STORE = os.getenv("FEATURE_STORE_KEY", "processed/features.parquet/_feature_store.arrow")
+# Cópia local da feature store, aberta com memory-map
+DIRETORIO_CACHE = os.path.join(tempfile.gettempdir(), "predictor_frontend_cache")
+
+
+# Intervalo (segundos) entre as verificações de novos dados. A verificação é um GET condicional
+# pelo ETag: enquanto o arquivo não muda, nada é transferido e a feature store é reaproveitada.
+INTERVALO_VERIFICACAO_DADOS = 300
+
+
+@st.cache_resource
+def obter_armazenamento():
+    armazenamento = armazenamento_do_ambiente()
+    if armazenamento is None:
+        raise ValueError("A variável de ambiente S3_BUCKET_NAME (ou STORAGE_LOCAL_DIR) não está configurada no arquivo .env")
+    return armazenamento
+
+
+# --- CARGA DOS DADOS E DA FEATURE STORE (features calculadas em shared/feature_store.py) ---
+def carregar_dados_s3(etag=None):
+    """
+    Lê o histórico de partidas do armazenamento se ele mudou desde o `etag` informado.
+    Retorna (df, etag), com df None quando o arquivo não mudou.
+    """
+    armazenamento = obter_armazenamento()
+    with armazenamento.abrir_se_modificado(CAMINHO_DADOS_HISTORICOS, etag) as (fluxo, novo_etag):
+        if fluxo is None:
+            print("Dados do histórico não mudaram desde a última carga.")
+            return None, novo_etag
+        print(f"Carregando dados de {armazenamento.descricao(CAMINHO_DADOS_HISTORICOS)}...")
+        # O CSV é lido direto do fluxo, sem copiar o conteúdo para a memória antes do parsing,
+        # e filtrado a partir do mesmo ano usado no treino
+        df = ler_partidas_csv(fluxo)
     print("Dados carregados e pré-processados.")
-    return df
-
-def extrair_partes_formacao(formacao):
-    if pd.isna(formacao) or '-' not in str(formacao):
-        return [4, 4, 2]
-    parts = str(formacao).split('-')
-    try:
-        if len(parts) == 3:
-            return [int(p) for p in parts]
-        if len(parts) == 4:
-            return [int(parts[0]), sum(int(p) for p in parts[1:-1]), int(parts[-1])]
-        return [4, 4, 2]
-    except (ValueError, TypeError):
-        return [4, 4, 2]
-
-def gerar_features_para_confronto(df_historico, time_mandante, time_visitante):
-    ultimos_jogos_mandante = df_historico[
-        (df_historico['mandante'] == time_mandante) | (df_historico['visitante'] == time_mandante)
-    ].sort_values(by='data', ascending=False).head(5)
-
-    ultimos_jogos_visitante = df_historico[
-        (df_historico['visitante'] == time_visitante) | (df_historico['mandante'] == time_visitante)
-    ].sort_values(by='data', ascending=False).head(5)
-
-    def calcular_forma(df_time, nome_time):
-        gols_feitos = []
-        gols_sofridos = []
-        pontos = []
-        for _, row in df_time.iterrows():
-            if row['mandante'] == nome_time:
-                gols_feitos.append(row['mandante_placar'])
-                gols_sofridos.append(row['visitante_placar'])
-                vencedor = row['vencedor']
-                if vencedor == nome_time:
-                    pontos.append(3)
-                elif vencedor == '-':
-                    pontos.append(1)
-                else:
-                    pontos.append(0)
-            else: # Time era visitante
-                gols_feitos.append(row['visitante_placar'])
-                gols_sofridos.append(row['mandante_placar'])
-                vencedor = row['vencedor']
-                if vencedor == nome_time:
-                    pontos.append(3)
-                elif vencedor == '-':
-                    pontos.append(1)
-                else:
-                    pontos.append(0)
-        
-        return np.mean(gols_feitos), np.mean(gols_sofridos), np.mean(pontos)
-
-    form_gols_feitos_m, form_gols_sofridos_m, form_pontos_m = calcular_forma(ultimos_jogos_mandante, time_mandante)
-    form_gols_feitos_v, form_gols_sofridos_v, form_pontos_v = calcular_forma(ultimos_jogos_visitante, time_visitante)
-
-    ultimo_jogo_mandante = ultimos_jogos_mandante.iloc[0]
-    ultimo_jogo_visitante = ultimos_jogos_visitante.iloc[0]
-
-    formacao_mandante = ultimo_jogo_mandante['formacao_mandante'] if ultimo_jogo_mandante['mandante'] == time_mandante else ultimo_jogo_mandante['formacao_visitante']
-    formacao_visitante = ultimo_jogo_visitante['formacao_visitante'] if ultimo_jogo_visitante['visitante'] == time_visitante else ultimo_jogo_visitante['formacao_mandante']
-
-    m_def, m_mid, m_att = extrair_partes_formacao(formacao_mandante)
-    v_def, v_mid, v_att = extrair_partes_formacao(formacao_visitante)
-
-    estado_mandante = ultimo_jogo_mandante['mandante_estado'] if ultimo_jogo_mandante['mandante'] == time_mandante else ultimo_jogo_mandante['visitante_estado']
-    estado_visitante = ultimo_jogo_visitante['visitante_estado'] if ultimo_jogo_visitante['visitante'] == time_visitante else ultimo_jogo_visitante['mandante_estado']
-    eh_classico = 1 if estado_mandante == estado_visitante else 0
-
-    payload = {
-        "form_gols_feitos_mandante": form_gols_feitos_m, "form_gols_sofridos_mandante": form_gols_sofridos_m, "form_pontos_mandante": form_pontos_m,
-        "form_gols_feitos_visitante": form_gols_feitos_v, "form_gols_sofridos_visitante": form_gols_sofridos_v, "form_pontos_visitante": form_pontos_v,
-        "eh_classico": eh_classico, "mandante_def": m_def, "mandante_mid": m_mid, "mandante_att": m_att,
-        "visitante_def": v_def, "visitante_mid": v_mid, "visitante_att": v_att,
-        "diff_def": m_def - v_def, "diff_mid": m_mid - v_mid, "diff_att": m_att - v_att
+    return df, novo_etag
+
+def baixar_feature_store(etag=None):
+    """
+    Baixa a feature store do armazenamento para o cache local se ela mudou desde o `etag`
+    informado e a abre com memory-map. Retorna (feature_store, etag, caminho), com
+    feature_store None quando o arquivo não mudou.
+    """
+    armazenamento = obter_armazenamento()
+    with armazenamento.abrir_se_modificado(CAMINHO_FEATURE_STORE, etag) as (fluxo, novo_etag):
+        if fluxo is None:
+            print("Feature store não mudou desde a última carga.")
+            return None, novo_etag, None
+        print(f"Carregando a feature store de {armazenamento.descricao(CAMINHO_FEATURE_STORE)}...")
+        os.makedirs(DIRETORIO_CACHE, exist_ok=True)
+        caminho = os.path.join(DIRETORIO_CACHE, f"feature_store_{novo_etag}.arrow")
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, 'wb') as f:
+            while bloco := fluxo.read(1024 * 1024):
+                f.write(bloco)
+    os.replace(temporario, caminho)
+    return FeatureStore.abrir(caminho), novo_etag, caminho
+
+
+@st.cache_resource
+def ultima_carga_indice():
+    # Última carga da feature store (origem, ETag, arquivo local e resultado), compartilhada por todas as sessões
+    return {'origem': None, 'etag': None, 'arquivo': None, 'resultado': None}
+
+
+@st.cache_resource(ttl=INTERVALO_VERIFICACAO_DADOS)
+def carregar_indice_times():
+    """
+    Feature store, lista de times e features pré-calculadas de todos os confrontos entre
+    os times da temporada mais recente (usadas na prévia da rodada). Recarregado só quando
+    a feature store (ou, na falta dela, o CSV do histórico) muda no armazenamento.
+    """
+    ultima_carga = ultima_carga_indice()
+    origem = CAMINHO_FEATURE_STORE if obter_armazenamento().existe(CAMINHO_FEATURE_STORE) else CAMINHO_DADOS_HISTORICOS
+    etag_anterior = ultima_carga['etag'] if ultima_carga['origem'] == origem else None
+    arquivo = None
+    if origem == CAMINHO_FEATURE_STORE:
+        feature_store, etag, arquivo = baixar_feature_store(etag_anterior)
+    else:
+        df_historico, etag = carregar_dados_s3(etag_anterior)
+        feature_store = FeatureStore.de_partidas(df_historico) if df_historico is not None else None
+    if feature_store is None:
+        return ultima_carga['resultado']
+
+    _, partidas_temporada = feature_store.partidas_da_temporada()
+    times_temporada = sorted({m for m, _, _, _ in partidas_temporada} | {v for _, v, _, _ in partidas_temporada})
+    features_confrontos = {
+        (mandante, visitante): feature_store.features_confronto(mandante, visitante)
+        for mandante in times_temporada for visitante in times_temporada if mandante != visitante
     }
-    return payload
+    print(f"Feature store com {len(feature_store)} times e {len(features_confrontos)} confrontos pré-calculados.")
+    resultado = (feature_store, feature_store.times, features_confrontos)
+
+    # A cópia local anterior não é mais usada (no Linux, o memory-map ainda aberto continua válido)
+    if ultima_carga['arquivo'] and ultima_carga['arquivo'] != arquivo:
+        try:
+            os.remove(ultima_carga['arquivo'])
+        except OSError:
+            pass
+    ultima_carga.update(origem=origem, etag=etag, arquivo=arquivo, resultado=resultado)
+    return resultado
+
 
 # --- INTERFACE DO STREAMLIT ---
 
@@ -117,10 +126,25 @@ st.set_page_config(page_title="Previsor do Brasileirão", layout="wide")
 st.title("🤖 Previsor de Partidas do Brasileirão")
 st.markdown("Selecione os times mandante e visitante para obter a previsão de resultado com base no modelo de Machine Learning.")
 
-try:
-    df_historico_completo = carregar_dados_s3()
-    lista_times = sorted(df_historico_completo['mandante'].unique())
-    
+@st.cache_resource
+def obter_cliente_api():
+    # Um único cliente (pool de conexões e cache de previsões) compartilhado por todas as sessões
+    return ClienteAPI(URL_DA_API_APPRUNNER)
+
+
+def mostrar_metricas_cache():
+    metricas = obter_cliente_api().metricas()
+    with st.sidebar.expander("Cache de previsões"):
+        st.metric("Taxa de acerto", f"{metricas['taxa_acerto']:.0%}")
+        st.metric("Latência economizada", f"{metricas['latencia_economizada_s']:.2f} s")
+        st.caption(
+            f"{metricas['acertos']} acertos, {metricas['falhas']} falhas, {metricas['entradas_em_cache']} previsões em cache. "
+            f"Latência média de uma chamada à API: {metricas['latencia_media_chamada_ms']:.0f} ms. "
+            f"Versão do modelo: {metricas['versao_modelo']}."
+        )
+
+
+def prever_confronto_unico(feature_store, lista_times):
     col1, col2 = st.columns(2)
 
     with col1:
@@ -135,13 +159,9 @@ try:
         else:
             with st.spinner(f"Analisando o confronto: {time_mandante} vs {time_visitante}..."):
                 try:
-                    features_payload = gerar_features_para_confronto(df_historico_completo, time_mandante, time_visitante)
-                    api_url = f"{URL_DA_API_APPRUNNER}/predict"
-                    response = requests.post(api_url, json=features_payload)
-                    response.raise_for_status()
-                    
-                    resultado = response.json()
-                    
+                    features_payload = feature_store.features_confronto(time_mandante, time_visitante)
+                    resultado = obter_cliente_api().prever(features_payload)
+
                     if 'prediction_text' in resultado:
                         st.success("Previsão gerada com sucesso!")
                         st.write(f"### O resultado mais provável é: **{resultado['prediction_text']}**")
@@ -158,6 +178,63 @@ try:
                 except Exception as e:
                     st.error(f"Ocorreu um erro inesperado durante a geração das features: {e}")
 
+
+def prever_rodada(features_confrontos):
+    st.markdown("Monte a rodada com os confrontos desejados (ou todos os confrontos entre os times da temporada atual). "
+                "Todas as previsões são feitas em uma única chamada à API.")
+    confrontos_disponiveis = list(features_confrontos)
+    todos = st.checkbox(f"Prever todos os {len(confrontos_disponiveis)} confrontos possíveis")
+    if todos:
+        confrontos = confrontos_disponiveis
+    else:
+        confrontos = st.multiselect(
+            "Confrontos da rodada", confrontos_disponiveis, max_selections=10,
+            format_func=lambda confronto: f"{confronto[0]} x {confronto[1]}",
+        )
+
+    if st.button("Prever Rodada", disabled=not confrontos):
+        if not URL_DA_API_APPRUNNER:
+            st.error("ERRO: A variável de ambiente APP_RUNNER_SERVICE_URL não foi configurada. Preencha o arquivo .env.")
+            return
+        with st.spinner(f"Prevendo {len(confrontos)} confrontos..."):
+            try:
+                payload = [features_confrontos[confronto] for confronto in confrontos]
+                resultado = obter_cliente_api().prever_lote(payload)
+            except requests.exceptions.RequestException as e:
+                st.error(f"Erro ao se comunicar com a API de previsão: {e}")
+                return
+
+        if 'previsoes' not in resultado:
+            st.error("A API retornou uma resposta inesperada.")
+            st.write("Resposta recebida da API:")
+            st.json(resultado)
+            return
+
+        st.dataframe(pd.DataFrame([
+            {
+                "Mandante": mandante,
+                "Visitante": visitante,
+                "Resultado mais provável": previsao['prediction_text'],
+                "Vitória do Mandante": previsao['probabilities']['vitoria_mandante'],
+                "Empate": previsao['probabilities']['empate'],
+                "Vitória do Visitante": previsao['probabilities']['vitoria_visitante'],
+            }
+            for (mandante, visitante), previsao in zip(confrontos, resultado['previsoes'])
+        ]), hide_index=True)
+
+
+try:
+    feature_store, lista_times, features_confrontos = carregar_indice_times()
+
+    modo = st.radio("Modo", ["Confronto único", "Prévia da rodada"], horizontal=True)
+    if modo == "Confronto único":
+        prever_confronto_unico(feature_store, lista_times)
+    else:
+        prever_rodada(features_confrontos)
+
+    if URL_DA_API_APPRUNNER:
+        mostrar_metricas_cache()
+
 except Exception as e:
     st.error(f"Erro fatal ao carregar os dados históricos do S3: {e}")
     st.info("Verifique se o nome do bucket S3 está correto no arquivo .env e se as credenciais da AWS estão configuradas.")
@@ -0,0 +1,112 @@
+# ml_jobs/data_ingestion.py
+import hashlib
+import os
+
+import fsspec
+import pandas as pd
+
+from shared.feature_store import ANO_MINIMO
+
+# Schema explícito do CSV bruto: evita a inferência de tipos e as colunas de texto
+# como object. Colunas com poucos valores distintos são lidas como categóricas.
+SCHEMA_CSV = {
+    'ID': 'int32',
+    'rodata': 'int16',
+    'data': 'str',
+    'hora': 'str',
+    'mandante': 'category',
+    'visitante': 'category',
+    'formacao_mandante': 'category',
+    'formacao_visitante': 'category',
+    'tecnico_mandante': 'category',
+    'tecnico_visitante': 'category',
+    'vencedor': 'category',
+    'arena': 'category',
+    'mandante_Placar': 'int8',
+    'visitante_Placar': 'int8',
+    'mandante_Estado': 'category',
+    'visitante_Estado': 'category',
+}
+FORMATO_DATA = '%d/%m/%Y'
+
+# Colunas que são comparadas entre si e por isso precisam compartilhar as mesmas categorias
+GRUPOS_CATEGORICOS = [
+    ['mandante', 'visitante', 'vencedor'],
+    ['mandante_estado', 'visitante_estado'],
+    ['formacao_mandante', 'formacao_visitante'],
+    ['tecnico_mandante', 'tecnico_visitante'],
+    ['arena'],
+]
+
+
+def normalizar_partidas(df, ano_minimo=ANO_MINIMO):
+    """Padroniza os nomes das colunas, converte a data (formato fixo) e filtra a partir de `ano_minimo`."""
+    df.columns = df.columns.str.lower()
+    # A coluna 'rodata' parece ser um typo de 'rodada', vamos padronizar
+    if 'rodata' in df.columns:
+        df = df.rename(columns={'rodata': 'rodada'})
+    if not pd.api.types.is_datetime64_any_dtype(df['data']):
+        df['data'] = pd.to_datetime(df['data'], format=FORMATO_DATA)
+    if ano_minimo is not None:
+        df = df[df['data'].dt.year >= ano_minimo]
+    return df
+
+
+def concatenar_partidas(dfs):
+    """
+    Concatena tabelas de partidas mantendo as colunas categóricas: as categorias de cada
+    grupo de colunas são unificadas antes (o pd.concat de categorias diferentes viraria texto).
+    """
+    dfs = [df for df in dfs if len(df.columns)]
+    for grupo in GRUPOS_CATEGORICOS:
+        grupo = [coluna for coluna in grupo if all(coluna in df.columns for df in dfs)]
+        if not grupo:
+            continue
+        categorias = set()
+        for df in dfs:
+            for coluna in grupo:
+                categorias.update(df[coluna].dropna().unique())
+        tipo = pd.CategoricalDtype(sorted(categorias))
+        dfs = [df.astype({coluna: tipo for coluna in grupo}) for df in dfs]
+    return pd.concat(dfs, ignore_index=True)
+
+
+def ler_partidas(caminho_csv, chunksize=None, ano_minimo=ANO_MINIMO):
+    """
+    Lê o CSV de partidas com o schema explícito. Com `chunksize`, o arquivo é lido em
+    blocos e as partidas anteriores a `ano_minimo` são descartadas bloco a bloco,
+    sem nunca manter o arquivo inteiro em memória.
+    """
+    leitura = pd.read_csv(caminho_csv, dtype=SCHEMA_CSV, chunksize=chunksize)
+    blocos = [leitura] if chunksize is None else leitura
+    return concatenar_partidas([normalizar_partidas(bloco, ano_minimo) for bloco in blocos])
+
+
+def _assinatura(caminho, ano_minimo):
+    """Identifica a versão do arquivo de origem (ETag no S3, tamanho + data de modificação localmente)."""
+    fs, caminho_fs = fsspec.core.url_to_fs(caminho)
+    info = fs.info(caminho_fs)
+    versao = info.get('ETag') or f"{info.get('size')}-{info.get('mtime') or info.get('LastModified')}"
+    return hashlib.sha1(f"{caminho}|{versao}|{ano_minimo}".encode()).hexdigest()[:16]
+
+
+def carregar_partidas(caminho_csv, cache_dir=None, chunksize=None, ano_minimo=ANO_MINIMO):
+    """
+    Carrega as partidas limpas, usando um cache em parquet quando `cache_dir` é informado:
+    se o CSV de origem não mudou desde a última execução, o parsing do CSV é pulado.
+    """
+    if cache_dir is None:
+        return ler_partidas(caminho_csv, chunksize, ano_minimo)
+
+    nome_base = os.path.splitext(os.path.basename(caminho_csv.rstrip('/')))[0]
+    caminho_cache = f"{cache_dir.rstrip('/')}/{nome_base}-{_assinatura(caminho_csv, ano_minimo)}.parquet"
+    fs, caminho_cache_fs = fsspec.core.url_to_fs(caminho_cache)
+    if fs.exists(caminho_cache_fs):
+        print(f"Usando cache em parquet: {caminho_cache}")
+        return pd.read_parquet(caminho_cache)
+
+    df = ler_partidas(caminho_csv, chunksize, ano_minimo)
+    fs.makedirs(caminho_cache_fs.rsplit('/', 1)[0], exist_ok=True)
+    df.to_parquet(caminho_cache, index=False)
+    print(f"Cache em parquet salvo em: {caminho_cache}")
+    return df
@@ -1,128 +1,199 @@
 import pandas as pd
 import numpy as np
+import fsspec
 import sys
+from data_ingestion import ANO_MINIMO, carregar_partidas, concatenar_partidas, ler_partidas
+from job_timing import CronometroJob
 
-def process_data(input_path_hist, input_path_new, output_path_features):
+from shared.feature_store import (
+    FEATURE_COLS,
+    STATS_FORMA,
+    FeatureStore,
+    extrair_formacoes,
+)
+
+
+def criar_target(df):
+    """
+    Cria a variável alvo de forma vetorizada:
+    0 = Vitória do Mandante, 1 = Empate, 2 = Vitória do Visitante.
+    """
+    return pd.Series(
+        np.select([df['vencedor'] == df['mandante'], df['vencedor'] == '-'], [0, 1], default=2),
+        index=df.index,
+    )
+
+
+TARGET_COL = 'target'
+# Coluna de partição da tabela de features (ano da partida)
+TEMPORADA_COL = 'temporada'
+
+# Feature store (shared/feature_store.py) com a forma e o contexto de cada time por data, salva
+# dentro do diretório da tabela de features. É lida pela API e pelo frontend e, no modo incremental,
+# pela próxima execução. Arquivos iniciados por "_" são ignorados na leitura do dataset particionado.
+NOME_ARQUIVO_FEATURE_STORE = '_feature_store.arrow'
+NOME_ARQUIVO_IDS = '_partidas_processadas.parquet'
+# Relatório com a duração de cada etapa da última execução
+NOME_ARQUIVO_TEMPOS = '_tempos.json'
+
+
+def limpar_partidas(df):
+    """Ordena as partidas por data (a conversão de tipos e o filtro de ano são feitos na ingestão)."""
+    return df.sort_values(by='data', kind='stable')
+
+
+def caminho_estado(output_path_features, nome_arquivo=NOME_ARQUIVO_FEATURE_STORE):
+    return f"{output_path_features.rstrip('/')}/{nome_arquivo}"
+
+
+def salvar_features(df_model, output_path_features, anexar=False):
+    """
+    Salva a tabela de features particionada por temporada. No modo completo o conteúdo
+    anterior é apagado; no modo incremental os novos arquivos são apenas adicionados.
+    """
+    fs, caminho = fsspec.core.url_to_fs(output_path_features)
+    if not anexar and fs.exists(caminho):
+        fs.rm(caminho, recursive=True)
+    df_model.to_parquet(output_path_features, index=False, partition_cols=[TEMPORADA_COL])
+
+
+def process_data(input_path_hist, input_path_new, output_path_features, incremental=False, cache_dir=None, chunksize=None):
     """
     Função completa para carregar, limpar, combinar e "engenheirar" features.
     Lê dados históricos e novos, aplica todas as transformações do notebook
-    e salva um arquivo parquet final pronto para o treinamento.
+    e salva uma tabela parquet (particionada por temporada) pronta para o treinamento.
+
+    A forma dos times vem da feature store (shared/feature_store.py), materializada aqui
+    e salva ao lado da tabela: cada partida recebe a forma de cada time ANTES da sua data,
+    pela mesma consulta as-of que a API e o frontend usam.
+
+    No modo incremental, usa a feature store salva pela execução anterior e calcula
+    features apenas para as partidas novas de `input_path_new`, anexando-as à tabela
+    existente. Se ainda não houver feature store salva, faz o processamento completo.
+
+    `cache_dir` guarda uma cópia em parquet do histórico já limpo (pula o parsing do CSV
+    nas próximas execuções) e `chunksize` lê os CSVs em blocos para reduzir o pico de memória.
     """
     print("--- Iniciando o Job de Processamento de Dados ---")
+    cronometro = CronometroJob("data_processor")
+    cronometro.etapa("carga")
+
+    feature_store = None
+    if incremental:
+        fs, caminho = fsspec.core.url_to_fs(caminho_estado(output_path_features))
+        if fs.exists(caminho):
+            with fsspec.open(caminho_estado(output_path_features), 'rb') as f:
+                feature_store = FeatureStore.de_bytes(f.read())
+            ids_processados = pd.read_parquet(caminho_estado(output_path_features, NOME_ARQUIVO_IDS))['id']
+            print(f"Modo incremental: feature store com {len(feature_store)} times carregada.")
+        else:
+            print("Modo incremental: nenhuma feature store salva encontrada, executando o processamento completo.")
+    incremental = feature_store is not None
 
     # 1. CARGA E COMBINAÇÃO DOS DADOS
-    print(f"Carregando dados históricos de: {input_path_hist}")
-    df_hist = pd.read_csv(input_path_hist)
-    print(f"Carregando novos dados de: {input_path_new}")
-    df_new = pd.read_csv(input_path_new)
-    df = pd.concat([df_hist, df_new], ignore_index=True)
-    print(f"Dados combinados. Total de {len(df)} linhas.")
+    if feature_store is None:
+        print(f"Carregando dados históricos de: {input_path_hist}")
+        df_hist = carregar_partidas(input_path_hist, cache_dir=cache_dir, chunksize=chunksize)
+        print(f"Carregando novos dados de: {input_path_new}")
+        df_new = ler_partidas(input_path_new, chunksize=chunksize)
+        df = concatenar_partidas([df_hist, df_new])
+        # Os novos dados podem repetir partidas que já estão no histórico: mantemos uma linha por ID
+        df = df.drop_duplicates(subset='id', keep='last', ignore_index=True)
+        print(f"Dados combinados. Total de {len(df)} linhas a partir de {ANO_MINIMO}.")
+    else:
+        print(f"Carregando novos dados de: {input_path_new}")
+        df = ler_partidas(input_path_new, chunksize=chunksize)
 
     # 2. LIMPEZA E FILTRO INICIAL (Lógica do Notebook)
+    cronometro.etapa("limpeza")
     print("Aplicando limpeza e filtros iniciais...")
-    df['data'] = pd.to_datetime(df['data'], dayfirst=True)
-    df = df[df['data'].dt.year >= 2014].copy()
-    df.sort_values(by='data', inplace=True)
-    
-    # PADRONIZAÇÃO DE NOMES DAS COLUNAS (Lógica do Notebook)
-    df.columns = df.columns.str.lower()
-    # A coluna 'rodata' parece ser um typo de 'rodada', vamos padronizar
-    if 'rodata' in df.columns:
-        df.rename(columns={'rodata': 'rodada'}, inplace=True)
+    df = limpar_partidas(df)
+
+    if feature_store is not None:
+        df = df[~df['id'].isin(ids_processados)].drop_duplicates(subset='id', keep='last')
+        if df.empty:
+            print("Nenhuma partida nova para processar.")
+            cronometro.salvar(caminho_estado(output_path_features, NOME_ARQUIVO_TEMPOS))
+            print("--- Job de Processamento de Dados Concluído ---")
+            return
+        for lado in ['mandante', 'visitante']:
+            if (df['data'].to_numpy() < feature_store.datas_ultimo_jogo(df[lado])).any():
+                raise ValueError("Há partidas novas anteriores à feature store salva para algum time. Execute o processamento completo.")
+        ids_processados = pd.concat([ids_processados, df['id']], ignore_index=True)
+        print(f"{len(df)} partidas novas para processar.")
+    else:
+        ids_processados = df['id'].reset_index(drop=True)
 
     # 3. CRIAÇÃO DA VARIÁVEL ALVO (target) (Lógica do Notebook)
+    cronometro.etapa("target")
     print("Criando a variável alvo 'target'...")
-    def criar_target(row):
-        if row['vencedor'] == row['mandante']:
-            return 0  # Vitória do Mandante
-        elif row['vencedor'] == '-':
-            return 1  # Empate
-        else:
-            return 2  # Vitória do Visitante
-    df['target'] = df.apply(criar_target, axis=1)
-
-    # 4. ENGENHARIA DE "FORMA" (Lógica do Notebook)
-    print("Iniciando engenharia de features de 'Forma'...")
-    df['pontos_mandante'] = np.where(df['target'] == 0, 3, np.where(df['target'] == 1, 1, 0))
-    df['pontos_visitante'] = np.where(df['target'] == 2, 3, np.where(df['target'] == 1, 1, 0))
-    
-    df_unpivot = df.reset_index()
-    
-    df_team_stats = pd.concat([
-        df_unpivot.rename(columns={'mandante': 'time', 'visitante': 'oponente', 'mandante_placar': 'gols_feitos', 'visitante_placar': 'gols_sofridos', 'pontos_mandante': 'pontos'}),
-        df_unpivot.rename(columns={'visitante': 'time', 'mandante': 'oponente', 'visitante_placar': 'gols_feitos', 'mandante_placar': 'gols_sofridos', 'pontos_visitante': 'pontos'})
-    ]).sort_values(by=['time', 'data'])
-
-    stats_to_roll = ['gols_feitos', 'gols_sofridos', 'pontos']
-    rolling_stats = df_team_stats.groupby('time')[stats_to_roll].rolling(window=5, min_periods=1).mean().shift(1)
-    rolling_stats.rename(columns=lambda x: f'form_{x}', inplace=True)
-
-    df_team_stats.reset_index(drop=True, inplace=True)
-    df_form = pd.concat([df_team_stats[['index', 'time']], rolling_stats.reset_index(drop=True)], axis=1)
-
-    df_final = df_unpivot.merge(df_form, left_on=['index', 'mandante'], right_on=['index', 'time'], suffixes=('', '_mandante'))
-    df_final = df_final.merge(df_form, left_on=['index', 'visitante'], right_on=['index', 'time'], suffixes=('_mandante', '_visitante'))
-    df_final.drop(columns=['time_mandante', 'time_visitante'], inplace=True)
-    print("Engenharia de 'Forma' concluída.")
+    df['target'] = criar_target(df)
+
+    # 4. ENGENHARIA DE "FORMA": feature store + consulta as-of na data de cada partida
+    cronometro.etapa("forma")
+    print("Materializando a feature store e calculando as features de 'Forma'...")
+    if feature_store is None:
+        feature_store = FeatureStore.de_partidas(df)
+    else:
+        # Os jogos anteriores de cada time já estão na feature store; as partidas novas entram depois deles
+        feature_store, _ = feature_store.com_partidas(df)
+
+    df_final = df
+    for lado in ['mandante', 'visitante']:
+        # Média dos últimos jogos do time ANTES da data da partida (o primeiro jogo de cada time fica com NaN)
+        forma = feature_store.forma_em(df[lado], df['data'])
+        for i, stat in enumerate(STATS_FORMA):
+            df_final[f'form_{stat}_{lado}'] = forma[:, i]
+    print(f"Engenharia de 'Forma' concluída. Feature store com {feature_store.n_jogos} jogos de {len(feature_store)} times.")
 
     # 5. ENGENHARIA DE "CONTEXTO" (Lógica do Notebook)
+    cronometro.etapa("contexto")
     print("Iniciando engenharia de features de 'Contexto'...")
     df_final['eh_classico'] = (df_final['mandante_estado'] == df_final['visitante_estado']).astype(int)
 
-    def extrair_partes_formacao(formacao):
-        if pd.isna(formacao) or '-' not in str(formacao):
-            return [4, 4, 2]
-        parts = str(formacao).split('-')
-        try:
-            if len(parts) == 3:
-                return [int(p) for p in parts]
-            if len(parts) == 4:
-                return [int(parts[0]), sum(int(p) for p in parts[1:-1]), int(parts[-1])]
-            return [4, 4, 2]
-        except (ValueError, TypeError):
-            return [4, 4, 2]
-
-    formacoes_mandante = df_final['formacao_mandante'].apply(extrair_partes_formacao)
-    formacoes_visitante = df_final['formacao_visitante'].apply(extrair_partes_formacao)
-
-    df_final[['mandante_def', 'mandante_mid', 'mandante_att']] = pd.DataFrame(formacoes_mandante.tolist(), index=df_final.index)
-    df_final[['visitante_def', 'visitante_mid', 'visitante_att']] = pd.DataFrame(formacoes_visitante.tolist(), index=df_final.index)
+    df_final[['mandante_def', 'mandante_mid', 'mandante_att']] = extrair_formacoes(df_final['formacao_mandante']).to_numpy()
+    df_final[['visitante_def', 'visitante_mid', 'visitante_att']] = extrair_formacoes(df_final['formacao_visitante']).to_numpy()
 
     df_final['diff_def'] = df_final['mandante_def'] - df_final['visitante_def']
     df_final['diff_mid'] = df_final['mandante_mid'] - df_final['visitante_mid']
     df_final['diff_att'] = df_final['mandante_att'] - df_final['visitante_att']
     print("Engenharia de 'Contexto' concluída.")
-    
+
     # 6. PREPARAR DATAFRAME FINAL (Lógica do Notebook)
+    cronometro.etapa("salvamento")
     print("Preparando e salvando o dataframe final...")
-    feature_cols = [
-        'form_gols_feitos_mandante', 'form_gols_sofridos_mandante', 'form_pontos_mandante',
-        'form_gols_feitos_visitante', 'form_gols_sofridos_visitante', 'form_pontos_visitante',
-        'eh_classico',
-        'mandante_def', 'mandante_mid', 'mandante_att',
-        'visitante_def', 'visitante_mid', 'visitante_att',
-        'diff_def', 'diff_mid', 'diff_att'
-    ]
-    target_col = 'target'
-    
-    df_model = df_final[feature_cols + [target_col]].copy()
+    df_final[TEMPORADA_COL] = df_final['data'].dt.year
+    df_model = df_final[FEATURE_COLS + [TARGET_COL, TEMPORADA_COL]].copy()
     df_model.dropna(inplace=True)
 
-    # SALVAR EM FORMATO PARQUET
-    df_model.to_parquet(output_path_features, index=False)
+    # SALVAR EM FORMATO PARQUET (particionado por temporada) E A FEATURE STORE
+    salvar_features(df_model, output_path_features, anexar=incremental)
+    with fsspec.open(caminho_estado(output_path_features), 'wb') as f:
+        feature_store.salvar(f)
+    ids_processados.to_frame().to_parquet(caminho_estado(output_path_features, NOME_ARQUIVO_IDS), index=False)
     print(f"Tabela de features salva com sucesso em: {output_path_features}")
     print(f"Dimensões do output: {df_model.shape}")
+    cronometro.salvar(caminho_estado(output_path_features, NOME_ARQUIVO_TEMPOS))
     print("--- Job de Processamento de Dados Concluído ---")
 
+
 if __name__ == "__main__":
     # Este bloco permite que o script seja executado via linha de comando
-    # Ex: python data_processor.py <caminho_dados_hist> <caminho_dados_novos> <caminho_saida>
-    if len(sys.argv) != 4:
-        print("Uso: python data_processor.py <input_hist> <input_new> <output>")
+    # Ex: python data_processor.py <caminho_dados_hist> <caminho_dados_novos> <caminho_saida> [--incremental]
+    #     [--cache-dir=<diretorio_cache>] [--chunksize=<linhas_por_bloco>]
+    opcoes = dict(a[2:].split('=', 1) if '=' in a else (a[2:], True) for a in sys.argv[1:] if a.startswith('--'))
+    argumentos = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if len(argumentos) != 3:
+        print("Uso: python data_processor.py <input_hist> <input_new> <output> [--incremental] [--cache-dir=<dir>] [--chunksize=<n>]")
         sys.exit(1)
-    
-    input_path_hist = sys.argv[1]
-    input_path_new = sys.argv[2]
-    output_path_features = sys.argv[3]
-    
-    process_data(input_path_hist, input_path_new, output_path_features)
\ No newline at end of file
+
+    input_path_hist = argumentos[0]
+    input_path_new = argumentos[1]
+    output_path_features = argumentos[2]
+
+    process_data(
+        input_path_hist, input_path_new, output_path_features,
+        incremental='incremental' in opcoes,
+        cache_dir=opcoes.get('cache-dir'),
+        chunksize=int(opcoes['chunksize']) if 'chunksize' in opcoes else None,
+    )
@@ -0,0 +1,70 @@
+# ml_jobs/job_timing.py
+import json
+import os
+import platform
+import time
+from datetime import UTC, datetime
+
+import fsspec
+
+
+def pico_memoria_mb():
+    """Pico de RSS do processo (Linux). Retorna None onde o /proc não está disponível."""
+    try:
+        with open('/proc/self/status') as f:
+            for linha in f:
+                if linha.startswith('VmHWM:'):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        return None
+
+
+class CronometroJob:
+    """
+    Mede a duração de cada etapa de um job. `etapa(nome)` encerra a etapa anterior e
+    inicia a próxima; `finalizar()` encerra a última. O relatório em JSON traz a duração
+    de cada etapa, o tempo total e o pico de memória do processo.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self.iniciado_em = datetime.now(UTC).isoformat()
+        self.etapas = []
+        self._inicio = time.perf_counter()
+        self._etapa_atual = None
+
+    def etapa(self, nome):
+        self._encerrar_etapa_atual()
+        self._etapa_atual = (nome, time.perf_counter())
+
+    def _encerrar_etapa_atual(self):
+        if self._etapa_atual is None:
+            return
+        nome, inicio = self._etapa_atual
+        duracao = time.perf_counter() - inicio
+        self.etapas.append({"etapa": nome, "segundos": round(duracao, 4)})
+        print(f"[tempo] {self.job}.{nome}: {duracao:.2f}s")
+        self._etapa_atual = None
+
+    def finalizar(self):
+        self._encerrar_etapa_atual()
+        return self.relatorio()
+
+    def relatorio(self):
+        return {
+            "job": self.job,
+            "iniciado_em": self.iniciado_em,
+            "segundos_total": round(time.perf_counter() - self._inicio, 4),
+            "pico_memoria_mb": pico_memoria_mb(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "etapas": self.etapas,
+        }
+
+    def salvar(self, caminho):
+        """Finaliza o cronômetro e grava o relatório em JSON (caminho local ou s3://)."""
+        relatorio = self.finalizar()
+        with fsspec.open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f"Relatório de tempos salvo em: {caminho}")
+        return relatorio
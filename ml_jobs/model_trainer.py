@@ -1,77 +1,254 @@
 # ml_jobs/model_trainer.py
 import pandas as pd
+import numpy as np
 import joblib
+import json
 import sys
-import boto3
-from urllib.parse import urlparse
-import tempfile 
-import os       
+import time
+import os
+import multiprocessing
+import hashlib
+from datetime import UTC, datetime
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
 from xgboost import XGBClassifier
 from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score
+from sklearn.metrics import accuracy_score, log_loss
+from threadpoolctl import threadpool_limits
+from job_timing import CronometroJob
 
-def train_model(features_path, model_output_path):
+from shared.storage import abrir_armazenamento
+
+CLASSES = [0, 1, 2]
+# Nome de cada classe do target, gravado no manifesto do artefato
+MAPA_CLASSES = {0: 'vitoria_mandante', 1: 'empate', 2: 'vitoria_visitante'}
+# Quantidade de temporadas avaliadas no walk-forward (cada uma é um fold de teste)
+N_FOLDS = 4
+
+# Grade de hiperparâmetros avaliada na seleção de modelo
+GRADE_HIPERPARAMETROS = {
+    'LogisticRegression': {
+        'C': [0.1, 1.0, 10.0],
+    },
+    'XGBClassifier': {
+        'max_depth': [3, 5],
+        'learning_rate': [0.05, 0.1],
+        'n_estimators': [100, 300],
+    },
+}
+
+# Dados compartilhados com os processos do pool (carregados uma vez por processo)
+_dados_worker = {}
+
+
+def gerar_candidatos():
+    """Expande a grade de hiperparâmetros em uma lista de (nome_modelo, params)."""
+    candidatos = []
+    for nome_modelo, grade in GRADE_HIPERPARAMETROS.items():
+        for valores in product(*grade.values()):
+            candidatos.append((nome_modelo, dict(zip(grade.keys(), valores))))
+    return candidatos
+
+
+def criar_modelo(nome_modelo, params, n_threads=1):
+    if nome_modelo == 'LogisticRegression':
+        return LogisticRegression(max_iter=1000, **params)
+    if nome_modelo == 'XGBClassifier':
+        return XGBClassifier(eval_metric='mlogloss', n_jobs=n_threads, **params)
+    raise ValueError(f"Modelo desconhecido: {nome_modelo}")
+
+
+def definir_folds(temporadas, n_folds=N_FOLDS):
+    """
+    Walk-forward por temporada: cada uma das últimas `n_folds` temporadas é usada como teste,
+    treinando apenas com as temporadas anteriores a ela.
+    """
+    unicas = np.sort(np.unique(temporadas))
+    return [int(t) for t in unicas[1:][-n_folds:]]
+
+
+def _inicializar_worker(X, y, temporadas, n_threads):
+    # Limita as threads do OpenMP/BLAS em cada processo para não disputar os núcleos. A variável
+    # OMP_NUM_THREADS não serviria aqui: o worker já importou o NumPy e o XGBoost (ao carregar este
+    # módulo) e os pools já estão dimensionados; o threadpoolctl ajusta os pools já carregados.
+    # O XGBoost também recebe n_jobs=n_threads em criar_modelo.
+    limites = threadpool_limits(limits=n_threads)
+    _dados_worker.update(X=X, y=y, temporadas=temporadas, n_threads=n_threads, limites_threads=limites)
+
+
+def avaliar_candidato(candidato, folds):
+    """Treina e avalia um candidato em todos os folds. Executado dentro do pool de processos."""
+    nome_modelo, params = candidato
+    X, y, temporadas = _dados_worker['X'], _dados_worker['y'], _dados_worker['temporadas']
+    inicio_candidato = time.perf_counter()
+    resultados_folds = []
+    for temporada_teste in folds:
+        treino = temporadas < temporada_teste
+        teste = temporadas == temporada_teste
+        inicio = time.perf_counter()
+        modelo = criar_modelo(nome_modelo, params, _dados_worker['n_threads'])
+        modelo.fit(X[treino], y[treino])
+        probabilidades = modelo.predict_proba(X[teste])
+        resultados_folds.append({
+            'temporada_teste': temporada_teste,
+            'n_treino': int(treino.sum()),
+            'n_teste': int(teste.sum()),
+            'log_loss': float(log_loss(y[teste], probabilidades, labels=CLASSES)),
+            'acuracia': float(accuracy_score(y[teste], probabilidades.argmax(axis=1))),
+            'segundos': time.perf_counter() - inicio,
+        })
+    return {
+        'modelo': nome_modelo,
+        'params': params,
+        'log_loss_medio': float(np.mean([f['log_loss'] for f in resultados_folds])),
+        'acuracia_media': float(np.mean([f['acuracia'] for f in resultados_folds])),
+        'segundos': time.perf_counter() - inicio_candidato,
+        'folds': resultados_folds,
+    }
+
+
+def selecionar_modelo(X, y, temporadas, n_processos=None):
+    """
+    Avalia todos os candidatos da grade com validação walk-forward, distribuindo os
+    candidatos em um pool de processos. Retorna o relatório com o melhor candidato
+    (menor log-loss médio) e as métricas de cada fold.
+    """
+    candidatos = gerar_candidatos()
+    folds = definir_folds(temporadas)
+    n_cpus = os.cpu_count() or 1
+    n_processos = n_processos or min(n_cpus, len(candidatos))
+    # Threads do XGBoost por candidato: os núcleos são divididos entre os processos
+    n_threads = max(1, n_cpus // n_processos)
+    print(f"Avaliando {len(candidatos)} candidatos em {len(folds)} folds (temporadas de teste: {folds}) "
+          f"com {n_processos} processos x {n_threads} thread(s).")
+
+    inicio = time.perf_counter()
+    # 'spawn' evita herdar o estado do OpenMP do processo principal
+    contexto = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=n_processos, mp_context=contexto,
+                             initializer=_inicializar_worker, initargs=(X, y, temporadas, n_threads)) as pool:
+        resultados = list(pool.map(avaliar_candidato, candidatos, [folds] * len(candidatos)))
+    tempo_total = time.perf_counter() - inicio
+
+    for r in sorted(resultados, key=lambda r: r['log_loss_medio']):
+        print(f"  {r['modelo']:<20} {json.dumps(r['params']):<60} log-loss={r['log_loss_medio']:.4f} "
+              f"acurácia={r['acuracia_media']:.4f} ({r['segundos']:.1f}s)")
+    melhor = min(resultados, key=lambda r: r['log_loss_medio'])
+    return {
+        'melhor': {k: melhor[k] for k in ['modelo', 'params', 'log_loss_medio', 'acuracia_media']},
+        'folds': folds,
+        'n_processos': n_processos,
+        'threads_por_candidato': n_threads,
+        'tempo_total_segundos': tempo_total,
+        'candidatos': resultados,
+    }
+
+
+def exportar_artefatos(modelo, colunas, armazenamento, nome_base="modelo_final"):
     """
-    Carrega a tabela de features, treina o modelo de ML e salva o artefato do modelo no S3.
+    Grava o modelo no armazenamento (S3 ou diretório local, ver shared/storage.py) em dois formatos:
+      - joblib com o objeto completo (compatibilidade);
+      - artefato nativo, que a API carrega sem joblib/scikit-learn: Booster do XGBoost em UBJ
+        ou, para a regressão logística, coeficientes e interceptos em JSON;
+    e um manifesto com o formato, a ordem das features, o mapa de classes, a versão e o
+    checksum do artefato nativo. Os arquivos são enviados direto para o destino, sem arquivo
+    temporário, nesta ordem (o manifesto por último, para nunca apontar para um artefato
+    que ainda não existe). Retorna os nomes dos arquivos.
+    """
+    nome_joblib = f"{nome_base}.joblib"
+    with armazenamento.abrir_escrita(nome_joblib) as f:
+        joblib.dump(modelo, f)
+
+    if isinstance(modelo, XGBClassifier):
+        formato, nome_nativo = 'xgboost-ubj', f"{nome_base}.ubj"
+        conteudo_nativo = bytes(modelo.get_booster().save_raw(raw_format='ubj'))
+    elif isinstance(modelo, LogisticRegression):
+        formato, nome_nativo = 'linear-json', f"{nome_base}.linear.json"
+        conteudo_nativo = json.dumps({'coef': modelo.coef_.tolist(), 'intercept': modelo.intercept_.tolist()}).encode('utf-8')
+    else:
+        raise TypeError(f"Modelo sem formato nativo: {type(modelo).__name__}")
+    with armazenamento.abrir_escrita(nome_nativo) as f:
+        f.write(conteudo_nativo)
+
+    manifesto = {
+        'formato': formato,
+        'artefato': nome_nativo,
+        'features': list(colunas),
+        'classes': {str(classe): nome for classe, nome in MAPA_CLASSES.items()},
+        'versao': datetime.now(UTC).strftime('%Y%m%dT%H%M%SZ'),
+        'sha256': hashlib.sha256(conteudo_nativo).hexdigest(),
+    }
+    nome_manifesto = f"{nome_base}.manifest.json"
+    gravar_json(armazenamento, nome_manifesto, manifesto)
+    return [nome_joblib, nome_nativo, nome_manifesto]
+
+
+def gravar_json(armazenamento, chave, dados):
+    with armazenamento.abrir_escrita(chave) as f:
+        f.write(json.dumps(dados, ensure_ascii=False, indent=2).encode('utf-8'))
+
+
+def train_model(features_path, model_output_path, n_processos=None):
+    """
+    Carrega a tabela de features, seleciona o melhor modelo com validação walk-forward
+    por temporada, treina o modelo final com todos os dados e salva no S3 (ou em um
+    diretório local) o artefato do modelo e o relatório da seleção (JSON ao lado do modelo).
     """
     print("--- Iniciando o Job de Treinamento do Modelo ---")
+    cronometro = CronometroJob("model_trainer")
+    cronometro.etapa("carga")
 
-    # ... (a lógica de carregar e treinar continua exatamente a mesma)
     print(f"Carregando features de: {features_path}")
     df_model = pd.read_parquet(features_path)
     print(f"Features carregadas. Dimensões: {df_model.shape}")
+    if 'temporada' not in df_model.columns:
+        raise ValueError("A tabela de features não tem a coluna 'temporada'. Execute novamente o data_processor.py.")
+
+    # 'temporada' é a coluna de partição da tabela de features, não é uma feature do modelo
+    X = df_model.drop(columns=['target', 'temporada'])
+    y = df_model['target'].to_numpy()
+    temporadas = df_model['temporada'].astype(int).to_numpy()
+
+    cronometro.etapa("selecao_modelo")
+    print("\n--- Seleção de Modelo (walk-forward por temporada) ---")
+    relatorio = selecionar_modelo(X, y, temporadas, n_processos)
+    melhor = relatorio['melhor']
+    print(f"Melhor modelo: {melhor['modelo']} {melhor['params']} (log-loss médio {melhor['log_loss_medio']:.4f})")
+    print(f"Tempo total da seleção: {relatorio['tempo_total_segundos']:.1f}s")
+
+    cronometro.etapa("treino_final")
+    print("\n--- Treinando o modelo final com todos os dados ---")
+    modelo_final = criar_modelo(melhor['modelo'], melhor['params'], n_threads=os.cpu_count() or 1)
+    modelo_final.fit(X, y)
 
-    X = df_model.drop('target', axis=1)
-    y = df_model['target']
-
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    print(f"Dados divididos. Treino: {X_train.shape[0]} amostras, Teste: {X_test.shape[0]} amostras.")
-
-    print("\\n--- Treinando Modelo Baseline (Regressão Logística) ---")
-    log_reg = LogisticRegression(max_iter=1000)
-    log_reg.fit(X_train, y_train)
-    predictions_log_reg = log_reg.predict(X_test)
-    accuracy_log_reg = accuracy_score(y_test, predictions_log_reg)
-    print(f"Acurácia da Regressão Logística: {accuracy_log_reg:.4f}")
-
-    print("\\n--- Treinando Modelo Avançado (XGBoost) ---")
-    xgb_model = XGBClassifier(use_label_encoder=False, eval_metric='mlogloss')
-    xgb_model.fit(X_train, y_train)
-    predictions_xgb = xgb_model.predict(X_test)
-    accuracy_xgb = accuracy_score(y_test, predictions_xgb)
-    print(f"Acurácia do XGBoost: {accuracy_xgb:.4f}")
-
-    # --- LÓGICA DE SALVAMENTO CORRIGIDA E UNIVERSAL ---
-    print(f"\\nIniciando o processo de salvamento do modelo em: {model_output_path}")
-
-    # 3. Criar um caminho de arquivo temporário que funciona em qualquer sistema operacional
-    temp_dir = tempfile.gettempdir()
-    local_temp_path = os.path.join(temp_dir, "modelo_final.joblib")
-    
-    print(f"Salvando modelo temporariamente em: {local_temp_path}")
-    joblib.dump(xgb_model, local_temp_path)
-
-        # 4. Fazer upload do arquivo salvo para o S3
-    print("Iniciando upload para o S3...")
-    s3_client = boto3.client('s3')
-
-    parsed_s3_path = urlparse(model_output_path, allow_fragments=False)
-    bucket_name = parsed_s3_path.netloc
-    object_key = parsed_s3_path.path.lstrip('/')
-    
-    s3_client.upload_file(local_temp_path, bucket_name, object_key)
-    
-    print("Upload para o S3 concluído com sucesso!")
+    # --- SALVAMENTO: artefatos enviados direto para o S3 (upload em partes) ou para o diretório local ---
+    cronometro.etapa("salvamento")
+    print(f"\nIniciando o processo de salvamento do modelo em: {model_output_path}")
+    nome_base = os.path.splitext(os.path.basename(model_output_path))[0]
+    destino_base = model_output_path.rsplit('/', 1)[0] if '/' in model_output_path else '.'
+    armazenamento = abrir_armazenamento(destino_base)
+
+    arquivos = exportar_artefatos(modelo_final, X.columns, armazenamento, nome_base)
+    nome_relatorio = f"{nome_base}.selecao.json"
+    gravar_json(armazenamento, nome_relatorio, relatorio)
+    # O relatório de tempos é o último arquivo e inclui o envio dos demais
+    nome_tempos = f"{nome_base}.tempos.json"
+    gravar_json(armazenamento, nome_tempos, cronometro.finalizar())
+    arquivos += [nome_relatorio, nome_tempos]
+
+    print(f"Salvamento concluído com sucesso! Arquivos enviados para {destino_base}: {', '.join(arquivos)}")
     print("--- Job de Treinamento do Modelo Concluído ---")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Uso: python model_trainer.py <features_input_path> <model_output_path>")
+    # Ex: python model_trainer.py <features_input_path> <model_output_path> [--processos=<n>]
+    opcoes = dict(a[2:].split('=', 1) for a in sys.argv[1:] if a.startswith('--') and '=' in a)
+    argumentos = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if len(argumentos) != 2:
+        print("Uso: python model_trainer.py <features_input_path> <model_output_path> [--processos=<n>]")
         sys.exit(1)
-        
-    features_path = sys.argv[1]
-    model_output_path = sys.argv[2]
-    
-    train_model(features_path, model_output_path)
\ No newline at end of file
+
+    features_path = argumentos[0]
+    model_output_path = argumentos[1]
+
+    train_model(features_path, model_output_path, n_processos=int(opcoes['processos']) if 'processos' in opcoes else None)
@@ -0,0 +1,239 @@
+# ml_jobs/season_simulator.py
+"""
+Simulação de Monte Carlo do restante da temporada a partir das probabilidades do modelo.
+
+O núcleo da simulação usa apenas NumPy e é compartilhado com a API (endpoint /simulate/season).
+As dependências do job (pandas, joblib e os módulos do ml_jobs) são importadas só na linha de comando.
+"""
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+PONTOS_POR_RESULTADO = np.array([3, 1, 0])  # do ponto de vista do mandante: vitória, empate, derrota
+N_REBAIXADOS = 4
+N_G4 = 4
+# Simulações por bloco: limita a memória da matriz (simulações x partidas) e é a unidade do pool
+TAMANHO_BLOCO = 2000
+
+
+def tabela_atual(times, partidas_jogadas):
+    """
+    Calcula pontos, vitórias e saldo de gols de cada time (na ordem de `times`)
+    a partir das partidas já disputadas na temporada: tuplas (mandante, visitante, gols_m, gols_v).
+    """
+    posicao = {nome_time: i for i, nome_time in enumerate(times)}
+    pontos = np.zeros(len(times), dtype=np.int64)
+    vitorias = np.zeros(len(times), dtype=np.int64)
+    saldo = np.zeros(len(times), dtype=np.int64)
+    for mandante, visitante, gols_m, gols_v in partidas_jogadas:
+        m, v = posicao[mandante], posicao[visitante]
+        saldo[m] += gols_m - gols_v
+        saldo[v] += gols_v - gols_m
+        if gols_m > gols_v:
+            pontos[m] += 3
+            vitorias[m] += 1
+        elif gols_m < gols_v:
+            pontos[v] += 3
+            vitorias[v] += 1
+        else:
+            pontos[m] += 1
+            pontos[v] += 1
+    return pontos, vitorias, saldo
+
+
+def confrontos_restantes(times, partidas_jogadas):
+    """Confrontos do turno e returno (cada time recebe cada adversário uma vez) que ainda não foram disputados."""
+    jogados = {(mandante, visitante) for mandante, visitante, _, _ in partidas_jogadas}
+    return [(m, v) for m in times for v in times if m != v and (m, v) not in jogados]
+
+
+def _simular_bloco(probabilidades, mandantes, visitantes, pontos, vitorias, desempate, n_simulacoes, semente):
+    """
+    Simula `n_simulacoes` temporadas de uma vez. Retorna a contagem de cada posição final
+    por time (times x posições) e a soma dos pontos finais de cada time.
+    """
+    rng = np.random.default_rng(semente)
+    n_times = len(pontos)
+
+    # Matriz (simulações x partidas) de resultados: 0 = mandante, 1 = empate, 2 = visitante
+    acumulada = np.cumsum(probabilidades, axis=1)
+    sorteio = rng.random((n_simulacoes, len(mandantes)))
+    resultados = (sorteio >= acumulada[:, 0]).astype(np.int8) + (sorteio >= acumulada[:, 1])
+
+    # Pontos e vitórias somados por time com multiplicação pelas matrizes de incidência (partidas x times)
+    incidencia_mandante = np.zeros((len(mandantes), n_times))
+    incidencia_mandante[np.arange(len(mandantes)), mandantes] = 1
+    incidencia_visitante = np.zeros((len(visitantes), n_times))
+    incidencia_visitante[np.arange(len(visitantes)), visitantes] = 1
+
+    pontos_mandante = PONTOS_POR_RESULTADO[resultados]
+    pontos_visitante = PONTOS_POR_RESULTADO[2 - resultados]
+    pontos_finais = pontos + pontos_mandante @ incidencia_mandante + pontos_visitante @ incidencia_visitante
+    vitorias_finais = vitorias + (resultados == 0) @ incidencia_mandante + (resultados == 2) @ incidencia_visitante
+
+    # Critérios: pontos, vitórias, saldo atual e, por fim, sorteio
+    chave = pontos_finais * 1e6 + vitorias_finais * 1e4 + desempate * 10 + rng.random((n_simulacoes, n_times))
+    ordem = np.argsort(-chave, axis=1)  # ordem[s, k] = time na posição k da simulação s
+
+    indices = ordem * n_times + np.arange(n_times)
+    contagem_posicoes = np.bincount(indices.ravel(), minlength=n_times * n_times).reshape(n_times, n_times)
+    return contagem_posicoes, pontos_finais.sum(axis=0)
+
+
+def simular_temporadas(probabilidades, mandantes, visitantes, pontos, vitorias, saldo,
+                       n_simulacoes=10000, seed=None, n_processos=1):
+    """
+    Simula o restante da temporada `n_simulacoes` vezes.
+
+    `probabilidades` é a matriz (partidas x 3) do modelo para os confrontos restantes e
+    `mandantes`/`visitantes` os índices dos times de cada confronto. As simulações são
+    divididas em blocos independentes (cada um com sua semente), executados em um pool
+    de processos quando `n_processos` > 1. Retorna (contagem_posicoes, pontos_medios).
+    """
+    probabilidades = np.asarray(probabilidades, dtype=np.float64)
+    probabilidades = probabilidades / probabilidades.sum(axis=1, keepdims=True)
+    mandantes = np.asarray(mandantes, dtype=np.int64)
+    visitantes = np.asarray(visitantes, dtype=np.int64)
+    # Saldo atual vira um posto (0 = pior saldo) para entrar na chave de ordenação
+    desempate = np.argsort(np.argsort(saldo, kind='stable'), kind='stable')
+
+    tamanhos = [TAMANHO_BLOCO] * (n_simulacoes // TAMANHO_BLOCO)
+    if n_simulacoes % TAMANHO_BLOCO:
+        tamanhos.append(n_simulacoes % TAMANHO_BLOCO)
+    sementes = np.random.SeedSequence(seed).spawn(len(tamanhos))
+    argumentos = [
+        (probabilidades, mandantes, visitantes, pontos, vitorias, desempate, tamanho, semente)
+        for tamanho, semente in zip(tamanhos, sementes)
+    ]
+
+    if n_processos > 1 and len(argumentos) > 1:
+        contexto = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=n_processos, mp_context=contexto) as pool:
+            blocos = list(pool.map(_simular_bloco, *zip(*argumentos)))
+    else:
+        blocos = [_simular_bloco(*args) for args in argumentos]
+
+    contagem_posicoes = sum(contagem for contagem, _ in blocos)
+    pontos_medios = sum(soma for _, soma in blocos) / n_simulacoes
+    return contagem_posicoes, pontos_medios
+
+
+def resumir_simulacao(times, pontos_atuais, contagem_posicoes, pontos_medios,
+                      n_rebaixados=N_REBAIXADOS, n_g4=N_G4):
+    """Probabilidades de título, G4 e rebaixamento de cada time, ordenadas pelos pontos esperados."""
+    n_simulacoes = contagem_posicoes[0].sum()
+    distribuicao = contagem_posicoes / n_simulacoes
+    resumo = []
+    for i, nome_time in enumerate(times):
+        resumo.append({
+            "time": nome_time,
+            "pontos_atuais": int(pontos_atuais[i]),
+            "pontos_esperados": round(float(pontos_medios[i]), 2),
+            "prob_titulo": float(distribuicao[i, 0]),
+            "prob_g4": float(distribuicao[i, :n_g4].sum()),
+            "prob_rebaixamento": float(distribuicao[i, len(times) - n_rebaixados:].sum()),
+            "distribuicao_posicoes": [float(p) for p in distribuicao[i]],
+        })
+    return sorted(resumo, key=lambda r: -r["pontos_esperados"])
+
+
+def features_dos_confrontos(df, confrontos):
+    """
+    Gera as features (mesma ordem do treinamento) de cada confronto a partir da forma
+    atual dos times na feature store: média dos últimos jogos, última formação e estado de cada time.
+    """
+    import pandas as pd
+
+    from shared.feature_store import FEATURE_COLS, FeatureStore
+
+    mandantes = [mandante for mandante, _ in confrontos]
+    visitantes = [visitante for _, visitante in confrontos]
+    matriz = FeatureStore.de_partidas(df).matriz_features(mandantes, visitantes)
+    return pd.DataFrame(matriz, columns=FEATURE_COLS)
+
+
+def simular_a_partir_do_historico(input_path_hist, model_path, output_path, n_simulacoes=10000,
+                                  seed=None, n_processos=1, input_path_confrontos=None):
+    """
+    Job completo: lê o histórico, monta a tabela da temporada atual (a do jogo mais recente),
+    calcula as probabilidades dos confrontos restantes em uma única chamada ao modelo,
+    simula o restante da temporada e salva o resumo em JSON.
+    """
+    import json
+
+    import fsspec
+    import joblib
+    import pandas as pd
+    from data_ingestion import ler_partidas
+
+    print("--- Iniciando o Job de Simulação da Temporada ---")
+    print(f"Carregando histórico de: {input_path_hist}")
+    df = ler_partidas(input_path_hist)
+    temporada = int(df['data'].dt.year.max())
+    df_temporada = df[df['data'].dt.year == temporada]
+    partidas_jogadas = list(zip(
+        df_temporada['mandante'].astype(str), df_temporada['visitante'].astype(str),
+        df_temporada['mandante_placar'].astype(int), df_temporada['visitante_placar'].astype(int),
+    ))
+    times = sorted(set(df_temporada['mandante'].astype(str)) | set(df_temporada['visitante'].astype(str)))
+
+    if input_path_confrontos:
+        df_confrontos = pd.read_csv(input_path_confrontos)
+        df_confrontos.columns = df_confrontos.columns.str.lower()
+        confrontos = list(zip(df_confrontos['mandante'], df_confrontos['visitante']))
+    else:
+        confrontos = confrontos_restantes(times, partidas_jogadas)
+    desconhecidos = {t for confronto in confrontos for t in confronto} - set(times)
+    if desconhecidos:
+        raise ValueError(f"Times fora da temporada {temporada}: {sorted(desconhecidos)}")
+    print(f"Temporada {temporada}: {len(partidas_jogadas)} partidas disputadas e {len(confrontos)} restantes.")
+
+    print(f"Carregando o modelo de: {model_path}")
+    with fsspec.open(model_path, 'rb') as f:
+        modelo = joblib.load(f)
+
+    # Uma única chamada ao modelo para todos os confrontos restantes
+    features = features_dos_confrontos(df, confrontos)
+    probabilidades = modelo.predict_proba(features) if confrontos else np.empty((0, 3))
+
+    posicao = {t: i for i, t in enumerate(times)}
+    pontos, vitorias, saldo = tabela_atual(times, partidas_jogadas)
+    inicio = time.perf_counter()
+    contagem_posicoes, pontos_medios = simular_temporadas(
+        probabilidades, [posicao[m] for m, _ in confrontos], [posicao[v] for _, v in confrontos],
+        pontos, vitorias, saldo, n_simulacoes=n_simulacoes, seed=seed, n_processos=n_processos,
+    )
+    print(f"{n_simulacoes} simulações concluídas em {time.perf_counter() - inicio:.2f}s.")
+
+    resumo = resumir_simulacao(times, pontos, contagem_posicoes, pontos_medios)
+    for r in resumo:
+        print(f"  {r['time']:<20} pontos={r['pontos_atuais']:>3} esperados={r['pontos_esperados']:>6.1f} "
+              f"título={r['prob_titulo']:>6.1%} G4={r['prob_g4']:>6.1%} rebaixamento={r['prob_rebaixamento']:>6.1%}")
+
+    with fsspec.open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({"temporada": temporada, "n_simulacoes": n_simulacoes, "partidas_restantes": len(confrontos),
+                   "times": resumo}, f, ensure_ascii=False, indent=2)
+    print(f"Resumo da simulação salvo em: {output_path}")
+    print("--- Job de Simulação da Temporada Concluído ---")
+
+
+if __name__ == "__main__":
+    # Ex: python season_simulator.py <caminho_dados_hist> <caminho_modelo> <caminho_saida_json>
+    #     [--simulacoes=<n>] [--seed=<n>] [--processos=<n>] [--confrontos=<csv com mandante,visitante>]
+    opcoes = dict(a[2:].split('=', 1) for a in sys.argv[1:] if a.startswith('--') and '=' in a)
+    argumentos = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if len(argumentos) != 3:
+        print("Uso: python season_simulator.py <input_hist> <model_path> <output_json> "
+              "[--simulacoes=<n>] [--seed=<n>] [--processos=<n>] [--confrontos=<csv>]")
+        sys.exit(1)
+
+    simular_a_partir_do_historico(
+        argumentos[0], argumentos[1], argumentos[2],
+        n_simulacoes=int(opcoes.get('simulacoes', 10000)),
+        seed=int(opcoes['seed']) if 'seed' in opcoes else None,
+        n_processos=int(opcoes.get('processos', 1)),
+        input_path_confrontos=opcoes.get('confrontos'),
+    )
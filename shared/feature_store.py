@@ -0,0 +1,536 @@
+# shared/feature_store.py
+# Feature store dos times: uma única implementação das features de "forma" e de contexto,
+# usada pelo data_processor.py (treino), pela API e pelo frontend.
+import json
+from typing import ClassVar
+
+import numpy as np
+
+# Quantidade de jogos usados no cálculo da forma recente de cada time
+JANELA_FORMA = 5
+STATS_FORMA = ['gols_feitos', 'gols_sofridos', 'pontos']
+# Formação usada quando a formação está ausente ou em um formato não reconhecido
+FORMACAO_PADRAO = (4, 4, 2)
+# Partidas anteriores a este ano ficam fora do histórico: no treino (data_ingestion.py), na API e no frontend
+ANO_MINIMO = 2014
+
+# Ordem fixa das features do modelo
+FEATURE_COLS = [
+    'form_gols_feitos_mandante', 'form_gols_sofridos_mandante', 'form_pontos_mandante',
+    'form_gols_feitos_visitante', 'form_gols_sofridos_visitante', 'form_pontos_visitante',
+    'eh_classico',
+    'mandante_def', 'mandante_mid', 'mandante_att',
+    'visitante_def', 'visitante_mid', 'visitante_att',
+    'diff_def', 'diff_mid', 'diff_att'
+]
+
+# Chave de busca (time, data) em um único int64: código do time nos bits altos e
+# segundos desde 1970 (deslocados para nunca serem negativos) nos 36 bits baixos
+_BITS_DATA = 36
+_DESLOCAMENTO_DATA = 1 << (_BITS_DATA - 1)
+# Chave dos metadados do arquivo Arrow com os nomes dos times e estados
+_CHAVE_METADADOS = b'feature_store'
+
+
+def extrair_formacoes(formacoes):
+    """
+    Versão vetorizada da extração de (defesa, meio, ataque) a partir de uma formação
+    como '4-2-3-1'. Formações com 4 partes têm as duas do meio somadas; formações
+    ausentes, com outro número de partes ou com partes não numéricas viram 4-4-2.
+    Retorna um DataFrame com as colunas 0, 1 e 2 (int64).
+    """
+    import pandas as pd
+
+    # Existem poucas formações distintas: o parsing é feito só nos valores únicos
+    # e o resultado é espalhado para todas as linhas pelos códigos do factorize.
+    codigos, unicos = pd.factorize(formacoes)
+    texto = pd.Series(np.asarray(unicos, dtype=object), dtype=object).astype(str)
+    partes = texto.str.split('-', expand=True).reindex(columns=range(4)).fillna('').astype(str)
+    n_partes = texto.str.count('-') + 1
+
+    # Cada parte precisa ser um inteiro válido (mesma regra do int() do Python)
+    eh_inteiro = partes.apply(lambda parte: parte.str.fullmatch(r'\s*[+-]?\d+\s*').astype(bool))
+    numeros = partes.where(eh_inteiro, '0').apply(lambda parte: pd.to_numeric(parte.str.strip())).astype(np.int64)
+
+    tres_partes = (n_partes == 3) & eh_inteiro[[0, 1, 2]].all(axis=1)
+    quatro_partes = (n_partes == 4) & eh_inteiro[[0, 1, 2, 3]].all(axis=1)
+    condicoes = [tres_partes, quatro_partes]
+
+    # Última linha extra = formação padrão, usada pelos valores ausentes (código -1)
+    tabela = np.empty((len(texto) + 1, 3), dtype=np.int64)
+    tabela[:-1, 0] = np.select(condicoes, [numeros[0], numeros[0]], default=FORMACAO_PADRAO[0])
+    tabela[:-1, 1] = np.select(condicoes, [numeros[1], numeros[1] + numeros[2]], default=FORMACAO_PADRAO[1])
+    tabela[:-1, 2] = np.select(condicoes, [numeros[2], numeros[3]], default=FORMACAO_PADRAO[2])
+    tabela[-1] = FORMACAO_PADRAO
+    return pd.DataFrame(tabela[codigos], index=formacoes.index)
+
+
+def ler_partidas_csv(caminho_csv, ano_minimo=ANO_MINIMO):
+    """
+    Lê um CSV de partidas (caminho ou fluxo binário, mesmo formato do dataset bruto) com as colunas
+    em minúsculas, a partir de `ano_minimo` (o mesmo filtro do treino).
+    """
+    import pandas as pd
+
+    df = pd.read_csv(caminho_csv)
+    df.columns = df.columns.str.lower()
+    if 'rodata' in df.columns:
+        df.rename(columns={'rodata': 'rodada'}, inplace=True)
+    df['data'] = pd.to_datetime(df['data'], dayfirst=True)
+    if ano_minimo is not None:
+        df = df[df['data'].dt.year >= ano_minimo].reset_index(drop=True)
+    return df
+
+
+def partidas_de_registros(registros):
+    """
+    DataFrame de partidas a partir de registros (dicts com as colunas do CSV em minúsculas, como os
+    recebidos pela API), no formato aceito por `FeatureStore.de_partidas` e `com_partidas`.
+    """
+    import pandas as pd
+
+    return pd.DataFrame.from_records(registros)
+
+
+def _codificar(*series):
+    """
+    Códigos inteiros de várias colunas sobre um vocabulário comum, ordenado, de nomes (str);
+    ausentes ficam com -1. Colunas categóricas usam os próprios códigos (só as categorias são
+    traduzidas); as demais passam por um único factorize. Retorna (códigos de cada coluna, nomes).
+    """
+    import pandas as pd
+
+    locais = []
+    for serie in series:
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            locais.append((serie.cat.codes.to_numpy(), serie.cat.categories))
+        else:
+            locais.append(pd.factorize(serie.to_numpy()))
+    nomes = np.array(sorted({str(nome) for _, unicos in locais for nome in unicos}), dtype=object)
+    codigos = []
+    for codigos_locais, unicos in locais:
+        # Última posição extra = -1, usada pelos ausentes (código local -1)
+        mapa = np.full(len(unicos) + 1, -1, dtype=np.int32)
+        mapa[:-1] = np.searchsorted(nomes, np.array([str(nome) for nome in unicos], dtype=object))
+        codigos.append(mapa[codigos_locais])
+    return codigos, nomes
+
+
+def _compactar(codigos, nomes):
+    """Remove do vocabulário os nomes que não aparecem em nenhuma das colunas, mantendo a ordem."""
+    usados = np.zeros(len(nomes) + 1, dtype=bool)
+    for c in codigos:
+        usados[c] = True
+    usados = usados[:-1]
+    mapa = np.full(len(nomes) + 1, -1, dtype=np.int32)
+    mapa[:-1] = np.cumsum(usados) - 1
+    return [mapa[c] for c in codigos], [str(nome) for nome in nomes[usados]]
+
+
+def _unir(nomes_a, nomes_b):
+    """Vocabulário com os nomes das duas listas e a tradução dos códigos de cada uma para ele."""
+    nomes = sorted(set(nomes_a) | set(nomes_b))
+    indice = {nome: i for i, nome in enumerate(nomes)}
+    mapas = [np.array([indice[nome] for nome in lista] + [-1], dtype=np.int32) for lista in (nomes_a, nomes_b)]
+    return nomes, mapas[0], mapas[1]
+
+
+def _expandir_partidas(partidas):
+    """
+    Transforma cada partida (DataFrame com as colunas do CSV em minúsculas) em dois jogos,
+    um do ponto de vista de cada time. Times, adversários e estados viram códigos inteiros
+    (sem arrays object de uma linha por jogo). Retorna (jogos, nomes dos times, nomes dos estados).
+    """
+    import pandas as pd
+
+    n = len(partidas)
+    if 'id' in partidas.columns:
+        ids = partidas['id'].fillna(-1).to_numpy(dtype=np.int64)
+    else:
+        ids = np.full(n, -1, dtype=np.int64)
+    datas = pd.to_datetime(partidas['data'], dayfirst=True).to_numpy().astype('datetime64[s]')
+    (mandantes, visitantes, vencedor), nomes = _codificar(partidas['mandante'], partidas['visitante'], partidas['vencedor'])
+    gols_m = partidas['mandante_placar'].to_numpy(dtype=np.int16)
+    gols_v = partidas['visitante_placar'].to_numpy(dtype=np.int16)
+
+    # Mesma regra do target: vitória do mandante, empate ('-') ou vitória do visitante
+    posicao_empate = np.searchsorted(nomes, '-')
+    codigo_empate = posicao_empate if posicao_empate < len(nomes) and nomes[posicao_empate] == '-' else -2
+    target = np.select([vencedor == mandantes, vencedor == codigo_empate], [0, 1], default=2)
+    pontos_m = np.where(target == 0, 3, np.where(target == 1, 1, 0)).astype(np.int16)
+    pontos_v = np.where(target == 2, 3, np.where(target == 1, 1, 0)).astype(np.int16)
+
+    formacoes = []
+    for lado in ['mandante', 'visitante']:
+        coluna = f'formacao_{lado}'
+        valores = partidas[coluna] if coluna in partidas.columns else pd.Series([None] * n, index=partidas.index)
+        formacoes.append(extrair_formacoes(valores).to_numpy(dtype=np.int8))
+    (mandantes, visitantes), times = _compactar([mandantes, visitantes], nomes)
+    estados, nomes_estados = _compactar(*_codificar(partidas['mandante_estado'], partidas['visitante_estado']))
+
+    return {
+        'time': np.concatenate([mandantes, visitantes]),
+        'adversario': np.concatenate([visitantes, mandantes]),
+        'mandante': np.concatenate([np.ones(n, np.int8), np.zeros(n, np.int8)]),
+        'id': np.concatenate([ids, ids]),
+        'data': np.concatenate([datas, datas]),
+        'gols_feitos': np.concatenate([gols_m, gols_v]),
+        'gols_sofridos': np.concatenate([gols_v, gols_m]),
+        'pontos': np.concatenate([pontos_m, pontos_v]),
+        'def': np.concatenate([formacoes[0][:, 0], formacoes[1][:, 0]]),
+        'mid': np.concatenate([formacoes[0][:, 1], formacoes[1][:, 1]]),
+        'att': np.concatenate([formacoes[0][:, 2], formacoes[1][:, 2]]),
+        'estado': np.concatenate(estados),
+    }, times, nomes_estados
+
+
+def _medias_moveis(codigos_ordenados, colunas, janela):
+    """
+    Média dos últimos `janela` valores de cada time ATÉ cada linha (inclusive), em uma única
+    passada com somas acumuladas. As linhas precisam estar ordenadas por time e data.
+    Retorna um array float64 por coluna de `colunas`; as colunas são processadas uma a uma
+    para que o pico de memória seja o de uma coluna, e não o da tabela inteira.
+    """
+    n = len(codigos_ordenados)
+    inicio_grupo = np.flatnonzero(np.r_[True, codigos_ordenados[1:] != codigos_ordenados[:-1]]) if n else np.empty(0, np.int64)
+
+    # Primeira linha da janela de cada linha: `janela` linhas antes, sem passar do início do time
+    limite_inferior = np.arange(1 - janela, n + 1 - janela)
+    np.maximum(limite_inferior, np.repeat(inicio_grupo, np.diff(np.r_[inicio_grupo, n])), out=limite_inferior)
+    contagem = np.arange(1, n + 1) - limite_inferior
+
+    # acumulado[i] = soma de todas as linhas anteriores a i
+    acumulado = np.zeros(n + 1)
+    medias = []
+    for valores in colunas:
+        np.cumsum(valores, out=acumulado[1:])
+        media = acumulado[1:] - acumulado[limite_inferior]
+        media /= contagem
+        medias.append(media)
+    return medias
+
+
+class FeatureStore:
+    """
+    Tabela colunar com um jogo por linha e por time, ordenada por (time, data, id), com a
+    forma do time DEPOIS de cada jogo (média dos últimos JANELA_FORMA jogos, inclusive ele),
+    a formação e o estado (UF) do time naquele jogo.
+
+    As consultas são "as-of": as features de um time em uma data vêm do último jogo dele
+    ANTES dessa data (busca binária, sem vazar o resultado da própria partida). Sem data,
+    vale o último jogo registrado (a forma atual). O treino (data_processor.py), a API e o
+    frontend leem os mesmos valores.
+
+    É salva como um arquivo Arrow IPC e aberta com memory-map: as colunas numéricas são
+    arrays NumPy apontando direto para o arquivo, sem cópia nem parsing. A instância nunca
+    é alterada; `com_partidas` devolve uma nova feature store.
+    """
+
+    COLUNAS: ClassVar[dict] = {
+        'time': np.int32, 'adversario': np.int32, 'mandante': np.int8, 'id': np.int64, 'data': 'datetime64[s]',
+        'gols_feitos': np.int16, 'gols_sofridos': np.int16, 'pontos': np.int16,
+        'forma_gols_feitos': np.float64, 'forma_gols_sofridos': np.float64, 'forma_pontos': np.float64,
+        'def': np.int8, 'mid': np.int8, 'att': np.int8, 'estado': np.int16,
+    }
+
+    def __init__(self, colunas, times, estados, janela=JANELA_FORMA):
+        self.colunas = colunas
+        self.times = list(times)
+        self.estados = list(estados)
+        self.janela = janela
+        self._codigo_time = {nome: i for i, nome in enumerate(self.times)}
+        # Linhas de cada time: [inicios[c], inicios[c + 1])
+        self._inicios = np.searchsorted(colunas['time'], np.arange(len(self.times) + 1))
+        self._chaves = None
+
+    # --- Construção ---
+
+    @classmethod
+    def vazia(cls, janela=JANELA_FORMA):
+        return cls({nome: np.empty(0, dtype=tipo) for nome, tipo in cls.COLUNAS.items()}, [], [], janela)
+
+    @classmethod
+    def de_partidas(cls, partidas, janela=JANELA_FORMA):
+        """Materializa a feature store a partir de um DataFrame de partidas (colunas do CSV em minúsculas)."""
+        return cls._de_jogos(*_expandir_partidas(partidas), janela)
+
+    @classmethod
+    def _de_jogos(cls, jogos, times, estados, janela=JANELA_FORMA):
+        """Feature store a partir dos jogos já codificados (times e estados em ordem alfabética)."""
+        ordem = np.lexsort((jogos['id'], jogos['data'], jogos['time']))
+        # As colunas saem de `jogos` à medida que são reordenadas: só uma coluna fica em dobro por vez
+        colunas = {nome: jogos.pop(nome)[ordem] for nome in list(jogos)}
+        medias = _medias_moveis(colunas['time'], [colunas[stat] for stat in STATS_FORMA], janela)
+        for stat, media in zip(STATS_FORMA, medias):
+            colunas[f'forma_{stat}'] = media
+        colunas = {nome: colunas[nome].astype(tipo, copy=False) for nome, tipo in cls.COLUNAS.items()}
+        return cls(colunas, times, estados, janela)
+
+    def com_partidas(self, partidas):
+        """
+        Nova feature store com as partidas adicionadas (partidas com ID já registrado são
+        ignoradas). Retorna (feature_store, quantidade de partidas adicionadas).
+
+        Caso comum (rodadas novas: times e estados já conhecidos e cada jogo novo depois do último
+        jogo registrado do seu time): os jogos entram no fim do bloco de cada time e só as médias
+        deles são calculadas. Continua O(N) em cópia de memória, porque as colunas são imutáveis
+        (e podem ser um memory-map), mas sem reordenar nem recodificar a tabela inteira. Nos demais
+        casos (time ou estado novo, jogo anterior ao último do time) a feature store é refeita,
+        O(N log N).
+        """
+        import pandas as pd
+
+        novos, times, estados = _expandir_partidas(partidas)
+        ids = novos['id'][:len(novos['id']) // 2]
+        # Partidas sem ID (-1) sempre entram; entre as novas, vale a última linha de cada ID
+        ja_registradas = (ids >= 0) & np.isin(ids, self.colunas['id'])
+        repetidas = (ids >= 0) & pd.Series(ids).duplicated(keep='last').to_numpy()
+        novas = ~ja_registradas & ~repetidas
+        if not novas.any():
+            return self, 0
+        manter = np.concatenate([novas, novas])
+        novos = {nome: valores[manter] for nome, valores in novos.items()}
+
+        atualizada = self._com_jogos_no_final(novos, times, estados)
+        if atualizada is None:
+            # Reconstrução: os códigos das duas partes são traduzidos para os vocabulários unidos
+            times, mapa_times, mapa_times_novos = _unir(self.times, times)
+            estados, mapa_estados, mapa_estados_novos = _unir(self.estados, estados)
+            jogos = {nome: np.concatenate([self.colunas[nome], novos[nome]]) for nome in novos}
+            for nome, mapa, mapa_novos in [('time', mapa_times, mapa_times_novos),
+                                           ('adversario', mapa_times, mapa_times_novos),
+                                           ('estado', mapa_estados, mapa_estados_novos)]:
+                jogos[nome] = np.concatenate([mapa[self.colunas[nome]], mapa_novos[novos[nome]]])
+            (jogos['time'], jogos['adversario']), times = _compactar([jogos['time'], jogos['adversario']], np.array(times, dtype=object))
+            (jogos['estado'],), estados = _compactar([jogos['estado']], np.array(estados, dtype=object))
+            atualizada = self._de_jogos(jogos, times, estados, self.janela)
+        return atualizada, int(novas.sum())
+
+    def _com_jogos_no_final(self, novos, times, estados):
+        """
+        Insere os jogos novos no fim do bloco de cada time, com a forma calculada a partir dos
+        últimos jogos anteriores do time. Retorna None se algum jogo não puder entrar no final
+        (time ou estado desconhecido, data anterior ao último jogo do time).
+        """
+        mapa_times = np.array([self._codigo_time.get(nome, -1) for nome in times] + [-1], dtype=np.int64)
+        codigo_estado = {nome: i for i, nome in enumerate(self.estados)}
+        mapa_estados = np.array([codigo_estado.get(nome, -2) for nome in estados] + [-1], dtype=np.int64)
+        estados = mapa_estados[novos['estado']]
+        codigos = mapa_times[novos['time']]
+        adversarios = mapa_times[novos['adversario']]
+        if (codigos < 0).any() or (adversarios < 0).any() or (estados == -2).any():
+            return None
+
+        # Mesma ordem da construção completa: (time, data, id), e depois de todos os jogos anteriores do time
+        fim_bloco = self._inicios[codigos + 1]
+        ultima_data = self.colunas['data'][fim_bloco - 1]
+        ultimo_id = self.colunas['id'][fim_bloco - 1]
+        if ((novos['data'] < ultima_data) | ((novos['data'] == ultima_data) & (novos['id'] < ultimo_id))).any():
+            return None
+        ordem = np.lexsort((novos['id'], novos['data'], codigos))
+        novos = dict(novos, time=codigos, adversario=adversarios, estado=estados)
+        novos = {nome: valores[ordem] for nome, valores in novos.items()}
+
+        # Médias móveis dos jogos novos: os últimos (janela - 1) jogos registrados de cada time afetado + os novos
+        afetados = np.unique(novos['time'])
+        fim = self._inicios[afetados + 1]
+        inicio = np.maximum(self._inicios[afetados], fim - (self.janela - 1))
+        contagem = fim - inicio
+        anteriores = np.repeat(inicio - np.cumsum(np.r_[0, contagem[:-1]]), contagem) + np.arange(contagem.sum())
+        codigos_janela = np.concatenate([self.colunas['time'][anteriores], novos['time']])
+        ordem_janela = np.argsort(codigos_janela, kind='stable')
+        valores = [np.concatenate([self.colunas[stat][anteriores], novos[stat]])[ordem_janela] for stat in STATS_FORMA]
+        for stat, media_ordenada in zip(STATS_FORMA, _medias_moveis(codigos_janela[ordem_janela], valores, self.janela)):
+            media = np.empty_like(media_ordenada)
+            media[ordem_janela] = media_ordenada
+            novos[f'forma_{stat}'] = media[len(anteriores):]
+
+        posicoes = self._inicios[novos['time'] + 1]
+        colunas = {nome: np.insert(self.colunas[nome], posicoes, novos[nome].astype(tipo, copy=False))
+                   for nome, tipo in self.COLUNAS.items()}
+        return type(self)(colunas, self.times, self.estados, self.janela)
+
+    # --- Arquivo Arrow (memory-map) ---
+
+    def salvar(self, destino):
+        """Grava a feature store como Arrow IPC (caminho local ou arquivo binário aberto para escrita)."""
+        import pyarrow as pa
+
+        metadados = json.dumps({'times': self.times, 'estados': self.estados, 'janela': self.janela}, ensure_ascii=False)
+        tabela = pa.table({nome: pa.array(valores) for nome, valores in self.colunas.items()},
+                          metadata={_CHAVE_METADADOS: metadados.encode('utf-8')})
+        with pa.ipc.new_file(destino, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+
+    @classmethod
+    def abrir(cls, caminho):
+        """Abre um arquivo local com memory-map: as colunas apontam direto para as páginas do arquivo."""
+        import pyarrow as pa
+
+        return cls._de_tabela(pa.ipc.open_file(pa.memory_map(str(caminho), 'r')).read_all())
+
+    @classmethod
+    def de_bytes(cls, conteudo):
+        import pyarrow as pa
+
+        return cls._de_tabela(pa.ipc.open_file(pa.py_buffer(conteudo)).read_all())
+
+    @classmethod
+    def _de_tabela(cls, tabela):
+        metadados = json.loads(tabela.schema.metadata[_CHAVE_METADADOS])
+        colunas = {}
+        for nome, tipo in cls.COLUNAS.items():
+            coluna = tabela.column(nome)
+            if coluna.num_chunks == 1:
+                colunas[nome] = coluna.chunk(0).to_numpy(zero_copy_only=True)
+            else:
+                colunas[nome] = np.asarray(coluna.to_numpy(), dtype=tipo)
+        return cls(colunas, metadados['times'], metadados['estados'], metadados['janela'])
+
+    # --- Consultas ---
+
+    def __len__(self):
+        return len(self.times)
+
+    @property
+    def n_jogos(self):
+        return len(self.colunas['time'])
+
+    def _codigos(self, times):
+        if len(times) <= 64:
+            return np.array([self._codigo_time.get(t, -1) for t in times], dtype=np.int64)
+        # Muitas linhas (ex: a tabela de treino): traduz só os nomes distintos
+        import pandas as pd
+
+        if isinstance(getattr(times, 'dtype', None), pd.CategoricalDtype):
+            # Coluna categórica (ex: a tabela de treino): usa os códigos das categorias
+            times = pd.Series(times)
+            codigos_categorias = [self._codigo_time.get(str(t), -1) for t in times.cat.categories]
+            return np.array(codigos_categorias + [-1], dtype=np.int64)[times.cat.codes.to_numpy()]
+        inversos, unicos = pd.factorize(np.asarray(times, dtype=object))
+        codigos_unicos = np.array([self._codigo_time.get(t, -1) for t in unicos] + [-1], dtype=np.int64)
+        return codigos_unicos[inversos]
+
+    def _chaves_busca(self):
+        if self._chaves is None:
+            datas = self.colunas['data'].view(np.int64) + _DESLOCAMENTO_DATA
+            self._chaves = (self.colunas['time'].astype(np.int64) << _BITS_DATA) | datas
+        return self._chaves
+
+    def _linhas(self, codigos, datas=None):
+        """Linha do último jogo de cada time antes de cada data (ou o último de todos); -1 quando não há."""
+        linhas = np.full(len(codigos), -1, dtype=np.int64)
+        validos = codigos >= 0
+        c = codigos[validos]
+        if datas is None:
+            encontradas = self._inicios[c + 1] - 1
+            existe = encontradas >= self._inicios[c]
+        else:
+            datas = np.asarray(datas, dtype='datetime64[s]').reshape(-1)[validos].view(np.int64)
+            chaves = (c << _BITS_DATA) | (datas + _DESLOCAMENTO_DATA)
+            if len(chaves) > 4096:
+                # Muitas consultas (ex: a tabela de treino): a busca com as chaves ordenadas percorre a
+                # feature store em sequência, em vez de saltar pela memória a cada consulta
+                ordem = np.argsort(chaves, kind='stable')
+                encontradas = np.empty(len(chaves), dtype=np.int64)
+                encontradas[ordem] = np.searchsorted(self._chaves_busca(), chaves[ordem], side='left') - 1
+            else:
+                encontradas = np.searchsorted(self._chaves_busca(), chaves, side='left') - 1
+            existe = (encontradas >= 0) & (self.colunas['time'][encontradas] == c)
+        linhas[validos] = np.where(existe, encontradas, -1)
+        return linhas
+
+    def forma_em(self, times, datas=None):
+        """
+        Forma (gols feitos, gols sofridos, pontos) de cada time considerando apenas os jogos
+        antes de cada data. Retorna um array (n x 3); NaN para times sem jogos anteriores.
+        """
+        linhas = self._linhas(self._codigos(times), datas)
+        forma = np.full((len(linhas), len(STATS_FORMA)), np.nan)
+        existe = linhas >= 0
+        for i, stat in enumerate(STATS_FORMA):
+            forma[existe, i] = self.colunas[f'forma_{stat}'][linhas[existe]]
+        return forma
+
+    def datas_ultimo_jogo(self, times):
+        linhas = self._linhas(self._codigos(times))
+        datas = np.full(len(linhas), np.datetime64('NaT'), dtype='datetime64[s]')
+        datas[linhas >= 0] = self.colunas['data'][linhas[linhas >= 0]]
+        return datas
+
+    def matriz_features(self, mandantes, visitantes, datas=None):
+        """
+        Features (ordem de FEATURE_COLS) de vários confrontos em uma chamada vetorizada.
+        A forma, a formação e o estado de cada time vêm do último jogo antes da data de cada
+        confronto (sem datas, do último jogo registrado). Linhas sem histórico ficam com NaN.
+        """
+        linhas_m = self._linhas(self._codigos(mandantes), datas)
+        linhas_v = self._linhas(self._codigos(visitantes), datas)
+        matriz = np.full((len(linhas_m), len(FEATURE_COLS)), np.nan)
+        validas = (linhas_m >= 0) & (linhas_v >= 0)
+        lm, lv = linhas_m[validas], linhas_v[validas]
+        c = self.colunas
+        for i, stat in enumerate(STATS_FORMA):
+            matriz[validas, i] = c[f'forma_{stat}'][lm]
+            matriz[validas, 3 + i] = c[f'forma_{stat}'][lv]
+        estado_m, estado_v = c['estado'][lm], c['estado'][lv]
+        matriz[validas, 6] = (estado_m == estado_v) & (estado_m >= 0)
+        for i, parte in enumerate(['def', 'mid', 'att']):
+            matriz[validas, 7 + i] = c[parte][lm]
+            matriz[validas, 10 + i] = c[parte][lv]
+            matriz[validas, 13 + i] = c[parte][lm].astype(np.int64) - c[parte][lv]
+        return matriz
+
+    def _linha(self, nome_time, data=None):
+        """Versão escalar do `_linhas` para um time (caminho das requisições individuais)."""
+        codigo = self._codigo_time.get(nome_time)
+        if codigo is None:
+            raise KeyError(f"Time desconhecido: {nome_time}")
+        inicio, fim = int(self._inicios[codigo]), int(self._inicios[codigo + 1])
+        if data is not None:
+            fim = inicio + int(np.searchsorted(self.colunas['data'][inicio:fim], np.datetime64(data, 's'), side='left'))
+        if fim == inicio:
+            raise KeyError(f"Sem jogos de {nome_time} antes de {data}")
+        return fim - 1
+
+    def features_confronto(self, time_mandante, time_visitante, data=None):
+        """Gera o payload de features (mesmo formato do /predict) para um confronto."""
+        lm, lv = self._linha(time_mandante, data), self._linha(time_visitante, data)
+        c = self.colunas
+        m_def, m_mid, m_att = int(c['def'][lm]), int(c['mid'][lm]), int(c['att'][lm])
+        v_def, v_mid, v_att = int(c['def'][lv]), int(c['mid'][lv]), int(c['att'][lv])
+        estado_m, estado_v = int(c['estado'][lm]), int(c['estado'][lv])
+        return {
+            "form_gols_feitos_mandante": float(c['forma_gols_feitos'][lm]),
+            "form_gols_sofridos_mandante": float(c['forma_gols_sofridos'][lm]),
+            "form_pontos_mandante": float(c['forma_pontos'][lm]),
+            "form_gols_feitos_visitante": float(c['forma_gols_feitos'][lv]),
+            "form_gols_sofridos_visitante": float(c['forma_gols_sofridos'][lv]),
+            "form_pontos_visitante": float(c['forma_pontos'][lv]),
+            "eh_classico": 1 if estado_m == estado_v and estado_m >= 0 else 0,
+            "mandante_def": m_def, "mandante_mid": m_mid, "mandante_att": m_att,
+            "visitante_def": v_def, "visitante_mid": v_mid, "visitante_att": v_att,
+            "diff_def": m_def - v_def, "diff_mid": m_mid - v_mid, "diff_att": m_att - v_att
+        }
+
+    def partidas_da_temporada(self, temporada=None):
+        """
+        Partidas já disputadas de uma temporada (por padrão, a mais recente) como tuplas
+        (mandante, visitante, gols_m, gols_v). Retorna (temporada, partidas).
+        """
+        c = self.colunas
+        mandante = c['mandante'] == 1
+        if not mandante.any():
+            return None, []
+        anos = c['data'].astype('datetime64[Y]').astype(np.int64) + 1970
+        if temporada is None:
+            temporada = int(anos[mandante].max())
+        linhas = np.flatnonzero(mandante & (anos == temporada))
+        linhas = linhas[np.argsort(c['data'][linhas], kind='stable')]
+        # Um placar por confronto (o mais recente, se houver repetição)
+        confrontos = {}
+        for i in linhas:
+            confrontos[(self.times[c['time'][i]], self.times[c['adversario'][i]])] = (
+                int(c['gols_feitos'][i]), int(c['gols_sofridos'][i])
+            )
+        return temporada, [(m, v, gols_m, gols_v) for (m, v), (gols_m, gols_v) in confrontos.items()]
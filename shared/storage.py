@@ -0,0 +1,247 @@
+# shared/storage.py
+# Armazenamento dos dados e artefatos do projeto: S3 (ou compatível, como o MinIO) ou um
+# diretório local com a mesma estrutura do bucket, para rodar o pipeline inteiro sem AWS.
+# Usado pela API, pelo frontend e pelos jobs de ML.
+import hashlib
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from io import RawIOBase
+
+# Tamanho de cada parte do upload multipart (o mínimo do S3 é 5 MiB, exceto na última parte)
+TAMANHO_PARTE = 8 * 1024 * 1024
+
+
+class _EscritaMultipartS3(RawIOBase):
+    """
+    Arquivo somente de escrita que envia o conteúdo ao S3 em partes, à medida que é escrito,
+    sem arquivo temporário. Conteúdos menores que uma parte vão em um único PUT.
+    """
+
+    def __init__(self, client, bucket, key):
+        self._client = client
+        self._bucket = bucket
+        self._key = key
+        self._buffer = bytearray()
+        self._upload_id = None
+        self._partes = []
+
+    def writable(self):
+        return True
+
+    def write(self, dados):
+        self._buffer += dados
+        while len(self._buffer) >= TAMANHO_PARTE:
+            self._enviar_parte(bytes(self._buffer[:TAMANHO_PARTE]))
+            del self._buffer[:TAMANHO_PARTE]
+        return len(dados)
+
+    def _enviar_parte(self, dados):
+        if self._upload_id is None:
+            self._upload_id = self._client.create_multipart_upload(Bucket=self._bucket, Key=self._key)['UploadId']
+        numero = len(self._partes) + 1
+        resposta = self._client.upload_part(
+            Bucket=self._bucket, Key=self._key, UploadId=self._upload_id, PartNumber=numero, Body=dados,
+        )
+        self._partes.append({'ETag': resposta['ETag'], 'PartNumber': numero})
+
+    def close(self):
+        if self.closed:
+            return
+        if self._upload_id is None:
+            self._client.put_object(Bucket=self._bucket, Key=self._key, Body=bytes(self._buffer))
+        else:
+            if self._buffer:
+                self._enviar_parte(bytes(self._buffer))
+            self._client.complete_multipart_upload(
+                Bucket=self._bucket, Key=self._key, UploadId=self._upload_id, MultipartUpload={'Parts': self._partes},
+            )
+        self._buffer.clear()
+        super().close()
+
+    def abortar(self):
+        if self._upload_id is not None:
+            self._client.abort_multipart_upload(Bucket=self._bucket, Key=self._key, UploadId=self._upload_id)
+        self._buffer.clear()
+        super().close()
+
+
+class ArmazenamentoS3:
+    """Objetos em um bucket S3, opcionalmente abaixo de um prefixo. As chaves são relativas ao prefixo."""
+
+    def __init__(self, bucket, prefixo="", endpoint_url=None):
+        self.bucket = bucket
+        self.prefixo = prefixo.strip('/')
+        self.endpoint_url = endpoint_url
+        self._cliente = None
+        self._pid_cliente = None
+        self._lock_cliente = threading.Lock()
+
+    @property
+    def _client(self):
+        # Criado no primeiro acesso: o boto3 (importado aqui, e não no módulo) só é carregado
+        # quando o bucket é usado de fato, e quem usa só o armazenamento local não precisa dele.
+        # O cliente é de um único processo: um cliente criado no mestre do gunicorn (preload_app)
+        # não é reaproveitado pelos workers após o fork, cada processo cria o seu.
+        if self._pid_cliente != os.getpid():
+            with self._lock_cliente:
+                if self._pid_cliente != os.getpid():
+                    import boto3
+
+                    self._cliente = boto3.client('s3', endpoint_url=self.endpoint_url)
+                    self._pid_cliente = os.getpid()
+        return self._cliente
+
+    def _key(self, chave):
+        return f"{self.prefixo}/{chave}" if self.prefixo else chave
+
+    def descricao(self, chave):
+        return f"s3://{self.bucket}/{self._key(chave)}"
+
+    def versao(self, chave):
+        # O ETag muda a cada novo upload do objeto, então serve como versão
+        return self._client.head_object(Bucket=self.bucket, Key=self._key(chave))['ETag'].strip('"')
+
+    def existe(self, chave):
+        from botocore.exceptions import ClientError
+
+        try:
+            self._client.head_object(Bucket=self.bucket, Key=self._key(chave))
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+
+    @contextmanager
+    def abrir_leitura(self, chave):
+        """Fluxo binário sequencial do objeto (pode ser passado direto para o pd.read_csv)."""
+        corpo = self._client.get_object(Bucket=self.bucket, Key=self._key(chave))['Body']
+        try:
+            yield corpo
+        finally:
+            corpo.close()
+
+    @contextmanager
+    def abrir_se_modificado(self, chave, etag=None):
+        """
+        GET condicional: retorna (fluxo, etag) ou (None, etag) quando o objeto
+        ainda tem o ETag informado, sem transferir o conteúdo.
+        """
+        from botocore.exceptions import ClientError
+
+        parametros = {'Bucket': self.bucket, 'Key': self._key(chave)}
+        if etag:
+            parametros['IfNoneMatch'] = f'"{etag}"'
+        try:
+            resposta = self._client.get_object(**parametros)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('304', 'NotModified'):
+                yield None, etag
+                return
+            raise
+        try:
+            yield resposta['Body'], resposta['ETag'].strip('"')
+        finally:
+            resposta['Body'].close()
+
+    def ler(self, chave):
+        with self.abrir_leitura(chave) as fluxo:
+            return fluxo.read()
+
+    def baixar(self, chave, destino):
+        self._client.download_file(self.bucket, self._key(chave), destino)
+
+    @contextmanager
+    def abrir_escrita(self, chave):
+        """
+        Arquivo binário de escrita enviado em partes (multipart); abortado se houver exceção, inclusive
+        no envio da última parte ou na conclusão do upload (senão as partes ficariam cobradas no bucket).
+        """
+        escrita = _EscritaMultipartS3(self._client, self.bucket, self._key(chave))
+        try:
+            yield escrita
+            escrita.close()
+        except BaseException:
+            escrita.abortar()
+            raise
+
+
+class ArmazenamentoLocal:
+    """Arquivos em um diretório local com a mesma estrutura do bucket (execução offline e testes)."""
+
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, chave)
+
+    def descricao(self, chave):
+        return self._caminho(chave)
+
+    def versao(self, chave):
+        # Tamanho e data de modificação, como o ETag de servidores de arquivos estáticos
+        info = os.stat(self._caminho(chave))
+        return hashlib.md5(f"{info.st_size}-{info.st_mtime_ns}".encode()).hexdigest()
+
+    def existe(self, chave):
+        return os.path.exists(self._caminho(chave))
+
+    @contextmanager
+    def abrir_leitura(self, chave):
+        with open(self._caminho(chave), 'rb') as f:
+            yield f
+
+    @contextmanager
+    def abrir_se_modificado(self, chave, etag=None):
+        versao = self.versao(chave)
+        if etag and etag == versao:
+            yield None, versao
+            return
+        with open(self._caminho(chave), 'rb') as f:
+            yield f, versao
+
+    def ler(self, chave):
+        with self.abrir_leitura(chave) as fluxo:
+            return fluxo.read()
+
+    def baixar(self, chave, destino):
+        shutil.copyfile(self._caminho(chave), destino)
+
+    @contextmanager
+    def abrir_escrita(self, chave):
+        """Escreve em um arquivo temporário ao lado do destino e o renomeia no final (troca atômica)."""
+        destino = self._caminho(chave)
+        os.makedirs(os.path.dirname(destino) or '.', exist_ok=True)
+        temporario = f"{destino}.{os.getpid()}.tmp"
+        try:
+            with open(temporario, 'wb') as f:
+                yield f
+            os.replace(temporario, destino)
+        except BaseException:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+
+
+def abrir_armazenamento(url, endpoint_url=None):
+    """s3://bucket/prefixo vira um ArmazenamentoS3; qualquer outro caminho, um diretório local."""
+    if url.startswith('s3://'):
+        bucket, _, prefixo = url[len('s3://'):].partition('/')
+        return ArmazenamentoS3(bucket, prefixo, endpoint_url or os.getenv("S3_ENDPOINT_URL"))
+    return ArmazenamentoLocal(url)
+
+
+def armazenamento_do_ambiente():
+    """
+    Armazenamento configurado pelas variáveis de ambiente: STORAGE_LOCAL_DIR (diretório local)
+    ou S3_BUCKET_NAME (com S3_ENDPOINT_URL opcional). Retorna None se nenhum estiver configurado.
+    """
+    diretorio_local = os.getenv("STORAGE_LOCAL_DIR")
+    if diretorio_local:
+        return ArmazenamentoLocal(diretorio_local)
+    bucket = os.getenv("S3_BUCKET_NAME")
+    if bucket:
+        return ArmazenamentoS3(bucket, endpoint_url=os.getenv("S3_ENDPOINT_URL"))
+    return None
@@ -0,0 +1,27 @@
+# tests/conftest.py
+# Os testes importam os módulos como a API (pacotes a partir da raiz) e como os jobs (scripts de ml_jobs/).
+# É o equivalente ao PYTHONPATH das imagens Docker: os módulos não alteram o sys.path por conta própria.
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, os.path.abspath(RAIZ))
+sys.path.insert(1, os.path.abspath(os.path.join(RAIZ, "ml_jobs")))
+
+from shared.storage import ArmazenamentoS3
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    """Bucket S3 simulado com o moto: (ArmazenamentoS3 com prefixo "dados", cliente boto3)."""
+    moto = pytest.importorskip("moto")
+    boto3 = pytest.importorskip("boto3")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "teste")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "teste")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with moto.mock_aws():
+        cliente = boto3.client("s3")
+        cliente.create_bucket(Bucket="bucket-teste")
+        yield ArmazenamentoS3("bucket-teste", prefixo="dados"), cliente
@@ -0,0 +1,133 @@
+# tests/test_api_client.py
+"""
+Cache de previsões do ClienteAPI (frontend/api_client.py), com um transporte HTTP falso montado
+na sessão do requests: o cache é descartado quando a versão do modelo muda e as entradas
+expiram pelo TTL.
+"""
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from frontend import api_client
+from frontend.api_client import ClienteAPI
+
+
+class TransporteFalso(BaseAdapter):
+    """Responde como a API: GET /model com a versão atual e POST /predict com uma previsão fixa."""
+
+    def __init__(self):
+        super().__init__()
+        self.versao = "v1"
+        self.chamadas = []
+
+    def send(self, request, **kwargs):
+        caminho = request.path_url.split('?')[0]
+        self.chamadas.append((request.method, caminho))
+        if caminho == "/model":
+            corpo = {"version": self.versao}
+        elif caminho == "/predict":
+            corpo = {"prediction_numeric": 0, "prediction_text": "Vitória do Mandante", "versao": self.versao}
+        elif caminho == "/predict/batch":
+            payloads = json.loads(request.body)
+            corpo = {"total": len(payloads), "previsoes": [{"versao": self.versao} for _ in payloads]}
+        else:
+            corpo = {"detail": "Not Found"}
+        resposta = requests.Response()
+        resposta.status_code = 404 if "detail" in corpo else 200
+        resposta._content = json.dumps(corpo).encode('utf-8')
+        resposta.headers["Content-Type"] = "application/json"
+        resposta.url = request.url
+        resposta.request = request
+        return resposta
+
+    def close(self):
+        pass
+
+    def previsoes(self):
+        return [c for c in self.chamadas if c[1].startswith("/predict")]
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 1000.0
+
+    def monotonic(self):
+        return self.agora
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = Relogio()
+    monkeypatch.setattr(api_client, "time", SimpleNamespace(monotonic=relogio.monotonic, perf_counter=time.perf_counter))
+    return relogio
+
+
+@pytest.fixture
+def cliente():
+    cliente = ClienteAPI("http://api.teste", ttl_cache=600, intervalo_versao=30)
+    transporte = TransporteFalso()
+    cliente.sessao.mount("http://", transporte)
+    return cliente, transporte
+
+
+PAYLOAD = {"form_gols_mandante": 1.5, "form_gols_visitante": 0.8}
+
+
+def test_cache_evita_nova_chamada_com_a_mesma_versao(cliente, relogio):
+    cliente, transporte = cliente
+    assert cliente.prever(PAYLOAD)["versao"] == "v1"
+    assert cliente.prever(dict(reversed(PAYLOAD.items())))["versao"] == "v1"  # mesma chave, outra ordem
+
+    assert transporte.previsoes() == [("POST", "/predict")]
+    metricas = cliente.metricas()
+    assert (metricas["acertos"], metricas["falhas"], metricas["entradas_em_cache"]) == (1, 1, 1)
+    assert metricas["versao_modelo"] == "v1"
+
+
+def test_nova_versao_do_modelo_invalida_o_cache(cliente, relogio):
+    cliente, transporte = cliente
+    cliente.prever(PAYLOAD)
+    cliente.prever_lote([PAYLOAD])
+
+    transporte.versao = "v2"
+    # Dentro do intervalo de verificação a versão em memória ainda vale
+    relogio.agora += 10
+    assert cliente.prever(PAYLOAD)["versao"] == "v1"
+    assert len(transporte.previsoes()) == 2
+
+    relogio.agora += 30
+    assert cliente.prever(PAYLOAD)["versao"] == "v2"
+    assert cliente.prever_lote([PAYLOAD])["previsoes"][0]["versao"] == "v2"
+    assert len(transporte.previsoes()) == 4
+    metricas = cliente.metricas()
+    assert metricas["invalidacoes"] == 1
+    assert metricas["versao_modelo"] == "v2"
+    assert metricas["entradas_em_cache"] == 2
+
+
+def test_entradas_expiram_pelo_ttl(cliente, relogio):
+    cliente, transporte = cliente
+    cliente.prever(PAYLOAD)
+    cliente.intervalo_versao = 10_000  # a partir daqui a versão não é mais consultada: isola o TTL
+
+    relogio.agora += 599
+    cliente.prever(PAYLOAD)
+    assert len(transporte.previsoes()) == 1
+
+    relogio.agora += 2
+    cliente.prever(PAYLOAD)
+    assert len(transporte.previsoes()) == 2
+    assert cliente.metricas()["invalidacoes"] == 0
+
+
+def test_sem_versao_do_modelo_nao_usa_o_cache(cliente, relogio):
+    cliente, transporte = cliente
+    transporte.versao = None
+    cliente.prever(PAYLOAD)
+    cliente.prever(PAYLOAD)
+    assert len(transporte.previsoes()) == 2
+    assert cliente.metricas()["entradas_em_cache"] == 0
@@ -0,0 +1,161 @@
+# tests/test_data_processor.py
+"""
+Equivalência das versões vetorizadas de `criar_target` e `extrair_formacoes` com as
+implementações originais, linha a linha, no dataset real e em casos de borda; e do modo
+incremental do `process_data` com o processamento completo.
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from data_processor import (
+    NOME_ARQUIVO_FEATURE_STORE,
+    NOME_ARQUIVO_IDS,
+    NOME_ARQUIVO_TEMPOS,
+    criar_target,
+    extrair_formacoes,
+    process_data,
+)
+
+from shared.feature_store import FeatureStore
+from shared.storage import ArmazenamentoLocal
+
+DIRETORIO_DADOS = Path(__file__).resolve().parent.parent / "data"
+CAMINHO_DADOS_REAIS = DIRETORIO_DADOS / "raw" / "campeonato-brasileiro-full.csv"
+CAMINHO_HISTORICO = DIRETORIO_DADOS / "dados_producao_inicial.csv"
+CAMINHO_NOVAS_RODADAS = DIRETORIO_DADOS / "novas_rodadas_simuladas.csv"
+
+
+# --- Implementações originais (referência) ---
+def criar_target_original(df):
+    def criar_target(row):
+        if row['vencedor'] == row['mandante']:
+            return 0  # Vitória do Mandante
+        elif row['vencedor'] == '-':
+            return 1  # Empate
+        else:
+            return 2  # Vitória do Visitante
+    return df.apply(criar_target, axis=1)
+
+
+def extrair_partes_formacao(formacao):
+    if pd.isna(formacao) or '-' not in str(formacao):
+        return [4, 4, 2]
+    parts = str(formacao).split('-')
+    try:
+        if len(parts) == 3:
+            return [int(p) for p in parts]
+        if len(parts) == 4:
+            return [int(parts[0]), sum(int(p) for p in parts[1:-1]), int(parts[-1])]
+        return [4, 4, 2]
+    except (ValueError, TypeError):
+        return [4, 4, 2]
+
+
+def extrair_formacoes_original(formacoes):
+    return pd.DataFrame(formacoes.apply(extrair_partes_formacao).tolist(), index=formacoes.index)
+
+
+@pytest.fixture(scope="module")
+def partidas_reais():
+    df = pd.read_csv(CAMINHO_DADOS_REAIS)
+    df.columns = df.columns.str.lower()
+    return df
+
+
+def test_criar_target_igual_ao_original(partidas_reais):
+    pd.testing.assert_series_equal(criar_target(partidas_reais), criar_target_original(partidas_reais))
+
+
+def test_criar_target_casos_de_borda():
+    df = pd.DataFrame({
+        'mandante': ['Santos', 'Santos', 'Santos', 'Santos'],
+        'visitante': ['Vasco', 'Vasco', 'Vasco', 'Vasco'],
+        # Vitória do mandante, empate, vitória do visitante e vencedor ausente (conta como visitante)
+        'vencedor': ['Santos', '-', 'Vasco', None],
+    }, index=[10, 3, 7, 1])
+    pd.testing.assert_series_equal(criar_target(df), criar_target_original(df))
+    assert criar_target(df).tolist() == [0, 1, 2, 2]
+
+
+@pytest.mark.parametrize("coluna", ["formacao_mandante", "formacao_visitante"])
+def test_extrair_formacoes_igual_ao_original(partidas_reais, coluna):
+    pd.testing.assert_frame_equal(extrair_formacoes(partidas_reais[coluna]), extrair_formacoes_original(partidas_reais[coluna]))
+
+
+def test_extrair_formacoes_casos_de_borda():
+    casos_borda = pd.Series(['4-4-2', '4-2-3-1', '4-1-2-1-2', '442', '', None, float('nan'),
+                             '4-x-2', ' 4-4-2 ', '4--2', '3-4-3-', '-4-4', '+4-4-2', '4-4-2-1-1-1'])
+    pd.testing.assert_frame_equal(extrair_formacoes(casos_borda), extrair_formacoes_original(casos_borda))
+
+
+def test_extrair_formacoes_categorico_e_indice_preservado():
+    formacoes = pd.Series(['4-3-3', None, '4-2-3-1', '4-3-3'], index=[5, 2, 9, 0], dtype='category')
+    resultado = extrair_formacoes(formacoes)
+    pd.testing.assert_frame_equal(resultado, extrair_formacoes_original(formacoes.astype(object)))
+    assert resultado.index.tolist() == [5, 2, 9, 0]
+
+
+# --- Modo incremental x processamento completo ---
+
+def ler_tabela_ordenada(caminho):
+    df = pd.read_parquet(caminho)
+    df['temporada'] = df['temporada'].astype(int)
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+
+def ler_ids(armazenamento, diretorio):
+    with armazenamento.abrir_leitura(f"{diretorio}/{NOME_ARQUIVO_IDS}") as f:
+        return pd.read_parquet(f)['id']
+
+
+def test_incremental_igual_ao_processamento_completo(tmp_path):
+    armazenamento = ArmazenamentoLocal(str(tmp_path))
+    vazio = tmp_path / "vazio.csv"
+    pd.read_csv(CAMINHO_NOVAS_RODADAS).head(0).to_csv(vazio, index=False)
+
+    # Execução completa só com o histórico e, depois, incremental com as novas rodadas
+    process_data(str(CAMINHO_HISTORICO), str(vazio), str(tmp_path / "incremental"))
+    ids_antes = ler_ids(armazenamento, "incremental")
+    process_data(str(CAMINHO_HISTORICO), str(CAMINHO_NOVAS_RODADAS), str(tmp_path / "incremental"), incremental=True)
+    process_data(str(CAMINHO_HISTORICO), str(CAMINHO_NOVAS_RODADAS), str(tmp_path / "completa"))
+
+    pd.testing.assert_frame_equal(ler_tabela_ordenada(tmp_path / "incremental"),
+                                  ler_tabela_ordenada(tmp_path / "completa"), check_exact=True)
+
+    incremental = FeatureStore.de_bytes(armazenamento.ler(f"incremental/{NOME_ARQUIVO_FEATURE_STORE}"))
+    completa = FeatureStore.de_bytes(armazenamento.ler(f"completa/{NOME_ARQUIVO_FEATURE_STORE}"))
+    assert incremental.times == completa.times and incremental.estados == completa.estados
+    for nome in FeatureStore.COLUNAS:
+        np.testing.assert_array_equal(incremental.colunas[nome], completa.colunas[nome], err_msg=nome)
+
+    # IDs processados: os do histórico seguidos dos novos, os mesmos da execução completa
+    ids_incremental = ler_ids(armazenamento, "incremental")
+    ids_completa = ler_ids(armazenamento, "completa")
+    assert ids_incremental.iloc[:len(ids_antes)].tolist() == ids_antes.tolist()
+    assert len(ids_incremental) > len(ids_antes)
+    assert sorted(ids_incremental) == sorted(ids_completa)
+
+    tempos = json.loads(armazenamento.ler(f"incremental/{NOME_ARQUIVO_TEMPOS}"))
+    assert tempos['job'] == "data_processor"
+    assert [e['etapa'] for e in tempos['etapas']][-1] == "salvamento"
+
+
+def test_incremental_sem_partidas_novas_nao_altera_a_tabela(tmp_path):
+    armazenamento = ArmazenamentoLocal(str(tmp_path))
+    saida = str(tmp_path / "saida")
+    process_data(str(CAMINHO_HISTORICO), str(CAMINHO_NOVAS_RODADAS), saida)
+    tabela = ler_tabela_ordenada(saida)
+    store = armazenamento.ler(f"saida/{NOME_ARQUIVO_FEATURE_STORE}")
+    ids = armazenamento.ler(f"saida/{NOME_ARQUIVO_IDS}")
+
+    # As mesmas novas rodadas outra vez: todos os IDs já foram processados
+    process_data(str(CAMINHO_HISTORICO), str(CAMINHO_NOVAS_RODADAS), saida, incremental=True)
+
+    pd.testing.assert_frame_equal(ler_tabela_ordenada(saida), tabela, check_exact=True)
+    assert armazenamento.ler(f"saida/{NOME_ARQUIVO_FEATURE_STORE}") == store
+    assert armazenamento.ler(f"saida/{NOME_ARQUIVO_IDS}") == ids
+    tempos = json.loads(armazenamento.ler(f"saida/{NOME_ARQUIVO_TEMPOS}"))
+    assert [e['etapa'] for e in tempos['etapas']] == ["carga", "limpeza"]
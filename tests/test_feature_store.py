@@ -0,0 +1,63 @@
+# tests/test_feature_store.py
+"""
+`FeatureStore.com_partidas` precisa gerar a mesma feature store que materializar o histórico
+inteiro de novo, tanto na atualização só do fim de cada time quanto na reconstrução completa.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from shared.feature_store import ANO_MINIMO, FeatureStore, ler_partidas_csv
+
+CAMINHO_DADOS_REAIS = Path(__file__).resolve().parent.parent / "data" / "raw" / "campeonato-brasileiro-full.csv"
+
+
+@pytest.fixture(scope="module")
+def partidas_reais():
+    return ler_partidas_csv(CAMINHO_DADOS_REAIS).sort_values('data', kind='stable', ignore_index=True)
+
+
+def assert_feature_stores_iguais(obtida, esperada):
+    assert obtida.times == esperada.times
+    assert obtida.estados == esperada.estados
+    assert obtida.colunas.keys() == esperada.colunas.keys()
+    for nome, valores in esperada.colunas.items():
+        assert obtida.colunas[nome].dtype == valores.dtype, nome
+        np.testing.assert_array_equal(obtida.colunas[nome], valores, err_msg=nome)
+
+
+def test_com_partidas_rodadas_novas_igual_a_reconstrucao(partidas_reais):
+    # As últimas rodadas chegam em dois lotes, depois de todo o histórico
+    n = len(partidas_reais)
+    base = FeatureStore.de_partidas(partidas_reais.iloc[:n - 30])
+    atualizada, adicionadas = base.com_partidas(partidas_reais.iloc[n - 30:n - 10])
+    atualizada, adicionadas_2 = atualizada.com_partidas(partidas_reais.iloc[n - 10:])
+
+    assert (adicionadas, adicionadas_2) == (20, 10)
+    assert_feature_stores_iguais(atualizada, FeatureStore.de_partidas(partidas_reais))
+
+
+def test_com_partidas_fora_de_ordem_e_time_novo_igual_a_reconstrucao(partidas_reais):
+    # Partidas antigas (antes do último jogo dos times) e um time que não estava na feature store
+    ultima = partidas_reais.iloc[[-1]].assign(id=-1, mandante='Time Novo')
+    novas = pd.concat([partidas_reais.iloc[100:110], ultima], ignore_index=True)
+    base = FeatureStore.de_partidas(partidas_reais.drop(index=range(100, 110)))
+    atualizada, adicionadas = base.com_partidas(novas)
+
+    assert adicionadas == 11
+    assert_feature_stores_iguais(atualizada, FeatureStore.de_partidas(pd.concat([partidas_reais, ultima])))
+
+
+def test_com_partidas_ignora_ids_ja_registrados(partidas_reais):
+    base = FeatureStore.de_partidas(partidas_reais)
+    mesma, adicionadas = base.com_partidas(partidas_reais.iloc[-5:])
+    assert mesma is base
+    assert adicionadas == 0
+
+
+def test_ler_partidas_csv_aplica_o_ano_minimo_do_treino():
+    partidas = ler_partidas_csv(CAMINHO_DADOS_REAIS)
+    assert partidas['data'].dt.year.min() == ANO_MINIMO
+    assert ler_partidas_csv(CAMINHO_DADOS_REAIS, ano_minimo=None)['data'].dt.year.min() < ANO_MINIMO
@@ -0,0 +1,101 @@
+# tests/test_metrics.py
+"""
+Formato de exposição do Prometheus gerado pelo api/metrics.py (Histograma.exportar e /metrics):
+buckets cumulativos que nunca diminuem com o `le`, bucket +Inf igual ao _count e _sum correto.
+"""
+import math
+import re
+from collections import defaultdict
+from itertools import pairwise
+
+import pytest
+
+from api.metrics import Histograma
+
+AMOSTRA = re.compile(r'^(?P<nome>[a-zA-Z_:][a-zA-Z0-9_:]*)\{(?P<rotulos>[^}]*)\} (?P<valor>\S+)$')
+
+
+def ler_histogramas(texto):
+    """
+    Lê o texto do Prometheus e agrupa as amostras por (histograma, série):
+    {(nome, rótulo): {'buckets': [(le, contagem), ...], 'sum': ..., 'count': ...}}.
+    """
+    tipos = {}
+    series = defaultdict(lambda: {'buckets': []})
+    for linha in texto.splitlines():
+        if linha.startswith("# TYPE "):
+            _, _, nome, tipo = linha.split()
+            tipos[nome] = tipo
+            continue
+        if not linha or linha.startswith("#"):
+            continue
+        amostra = AMOSTRA.match(linha)
+        assert amostra, f"linha fora do formato do Prometheus: {linha!r}"
+        rotulos = dict(re.findall(r'(\w+)="([^"]*)"', amostra['rotulos']))
+        nome, valor = amostra['nome'], float(amostra['valor'])
+        for sufixo in ('_bucket', '_sum', '_count'):
+            if nome.endswith(sufixo):
+                base = nome[:-len(sufixo)]
+                break
+        else:
+            pytest.fail(f"amostra sem sufixo de histograma: {linha!r}")
+        assert tipos.get(base) == "histogram", f"{base} sem '# TYPE {base} histogram'"
+        le = rotulos.pop('le', None)
+        serie = series[(base, tuple(sorted(rotulos.items())))]
+        if sufixo == '_bucket':
+            serie['buckets'].append((float(le), valor))
+        else:
+            serie[sufixo[1:]] = valor
+    return dict(series)
+
+
+def verificar_serie(serie):
+    limites = [le for le, _ in serie['buckets']]
+    contagens = [c for _, c in serie['buckets']]
+    assert limites == sorted(limites) and limites[-1] == math.inf
+    assert all(a <= b for a, b in pairwise(contagens)), "bucket cumulativo diminuiu"
+    assert contagens[-1] == serie['count']
+
+
+def test_exportar_buckets_cumulativos_inf_igual_ao_count_e_soma():
+    histograma = Histograma("teste_segundos", "Histograma de teste.", "estagio", buckets=(0.1, 1, 10))
+    # Valores iguais ao limite ficam no próprio bucket (le = "menor ou igual")
+    valores_a = [0.05, 0.1, 0.5, 1, 3, 20, 50]
+    valores_b = [2.0]
+    for valor in valores_a:
+        histograma.observar("a", valor)
+    for valor in valores_b:
+        histograma.observar("b", valor)
+
+    series = ler_histogramas(histograma.exportar())
+
+    a = series[("teste_segundos", (("estagio", "a"),))]
+    verificar_serie(a)
+    assert a['buckets'] == [(0.1, 2), (1.0, 4), (10.0, 5), (math.inf, 7)]
+    assert a['count'] == len(valores_a)
+    assert a['sum'] == pytest.approx(sum(valores_a))
+
+    b = series[("teste_segundos", (("estagio", "b"),))]
+    verificar_serie(b)
+    assert b['buckets'] == [(0.1, 0), (1.0, 0), (10.0, 1), (math.inf, 1)]
+    assert b['sum'] == pytest.approx(2.0)
+
+
+def test_endpoint_metrics_no_formato_do_prometheus():
+    pytest.importorskip("httpx")
+    main = pytest.importorskip("api.main")
+    from fastapi.testclient import TestClient
+
+    cliente = TestClient(main.app)
+    for _ in range(3):
+        assert cliente.get("/").status_code == 200
+    resposta = cliente.get("/metrics")
+
+    assert resposta.status_code == 200
+    assert resposta.headers["content-type"].startswith("text/plain")
+    series = ler_histogramas(resposta.text)
+    for serie in series.values():
+        verificar_serie(serie)
+    raiz = series[("predictor_requisicao_segundos", (("endpoint", "/"),))]
+    assert raiz['count'] >= 3
+    assert raiz['sum'] > 0
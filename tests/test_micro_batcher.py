@@ -0,0 +1,116 @@
+# tests/test_micro_batcher.py
+"""
+MicroBatcher do api/micro_batcher.py: previsões que chegam juntas viram uma única chamada ao
+modelo, cada requisição recebe a sua linha e uma falha do modelo chega a todas as requisições
+do lote. Com janela 0 a API não cria o micro-batcher e prevê direto no executor.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from api.micro_batcher import MicroBatcher
+
+
+class ModeloFalso:
+    """Registra as matrizes recebidas e devolve a própria primeira feature em cada linha."""
+
+    def __init__(self, erro=None):
+        self.erro = erro
+        self.chamadas = []
+        self._lock = threading.Lock()
+
+    def prever_probabilidades(self, matriz):
+        with self._lock:
+            self.chamadas.append(matriz.copy())
+        if self.erro is not None:
+            raise self.erro
+        return np.repeat(matriz[:, :1], 3, axis=1)
+
+
+def rodar_lote(modelo, vetores, janela=0.05, tamanho_maximo=64):
+    """Envia todas as previsões ao mesmo tempo e retorna o resultado (ou exceção) de cada uma."""
+    async def principal():
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            batcher = MicroBatcher(modelo.prever_probabilidades, executor, janela=janela,
+                                   tamanho_maximo=tamanho_maximo)
+            batcher.iniciar()
+            try:
+                return await asyncio.gather(*(batcher.prever(v) for v in vetores), return_exceptions=True)
+            finally:
+                await batcher.parar()
+
+    return asyncio.run(principal())
+
+
+def vetores_distintos(n):
+    return [np.array([float(i), 0.0], dtype=np.float32) for i in range(n)]
+
+
+def test_previsoes_simultaneas_viram_uma_unica_chamada():
+    modelo = ModeloFalso()
+    resultados = rodar_lote(modelo, vetores_distintos(10))
+
+    assert len(modelo.chamadas) == 1
+    assert modelo.chamadas[0].shape == (10, 2)
+    assert all(not isinstance(r, Exception) for r in resultados)
+
+
+def test_cada_requisicao_recebe_a_sua_linha():
+    modelo = ModeloFalso()
+    # Lotes de no máximo 4: a ordem precisa ser mantida também entre lotes
+    resultados = rodar_lote(modelo, vetores_distintos(10), tamanho_maximo=4)
+
+    assert sorted(len(m) for m in modelo.chamadas) == [2, 4, 4]
+    for i, probabilidades in enumerate(resultados):
+        np.testing.assert_array_equal(probabilidades, [i, i, i])
+
+
+def test_falha_do_modelo_chega_a_todas_as_requisicoes_do_lote():
+    erro = RuntimeError("modelo indisponível")
+    resultados = rodar_lote(ModeloFalso(erro=erro), vetores_distintos(5))
+
+    assert len(resultados) == 5
+    assert all(r is erro for r in resultados)
+
+
+@pytest.fixture
+def api_main(monkeypatch):
+    main = pytest.importorskip("api.main")
+    # Sem carga de modelo nem de feature store no lifespan
+    monkeypatch.setattr(main, "model_manager", None)
+    monkeypatch.setattr(main, "HISTORICO_CONFIGURADO", False)
+    monkeypatch.setattr(main, "micro_batcher", None)
+    return main
+
+
+def test_janela_zero_preve_direto_no_executor_sem_micro_batcher(api_main, monkeypatch):
+    monkeypatch.setattr(api_main, "MICRO_BATCH_WINDOW_MS", 0.0)
+    modelo = ModeloFalso()
+    features = SimpleNamespace(**{coluna: float(i) for i, coluna in enumerate(api_main.FEATURE_ORDER)})
+
+    async def principal():
+        async with api_main.lifespan(api_main.app):
+            assert api_main.micro_batcher is None
+            return await api_main.prever_partida(modelo, features)
+
+    probabilidades = asyncio.run(principal())
+
+    assert len(modelo.chamadas) == 1
+    assert modelo.chamadas[0].shape == (1, len(api_main.FEATURE_ORDER))
+    np.testing.assert_array_equal(probabilidades, [0.0, 0.0, 0.0])
+
+
+def test_janela_positiva_cria_o_micro_batcher(api_main, monkeypatch):
+    monkeypatch.setattr(api_main, "MICRO_BATCH_WINDOW_MS", 2.0)
+
+    async def principal():
+        async with api_main.lifespan(api_main.app):
+            return api_main.micro_batcher
+
+    batcher = asyncio.run(principal())
+    assert isinstance(batcher, MicroBatcher)
+    assert batcher.janela == pytest.approx(0.002)
@@ -0,0 +1,137 @@
+# tests/test_model_manager.py
+"""
+ModelManager: só baixa o artefato quando a versão muda, mantém o modelo em serviço quando a
+carga de uma nova versão falha e limpa o cache local sem nunca apagar a versão ativa.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pytest
+
+from api.model_manager import FORMATO_LINEAR, ModelManager
+from shared.storage import ArmazenamentoLocal
+
+FEATURES = ['f1', 'f2']
+CHAVE_MODELO = "models/modelo_final.joblib"
+CHAVE_MANIFESTO = "models/modelo_final.manifest.json"
+CHAVE_ARTEFATO = "models/modelo_final.linear.json"
+
+
+def publicar(armazenamento, intercepto, conteudo=None, sha256=None):
+    """Publica um modelo linear (artefato + manifesto), como o model_trainer.py. Retorna a versão do manifesto."""
+    if conteudo is None:
+        conteudo = json.dumps({'coef': [[0.0, 0.0]] * 3, 'intercept': [intercepto, 0.0, 0.0]}).encode('utf-8')
+    versao = sha256 or hashlib.sha256(conteudo).hexdigest()
+    with armazenamento.abrir_escrita(CHAVE_ARTEFATO) as f:
+        f.write(conteudo)
+    manifesto = {'formato': FORMATO_LINEAR, 'artefato': 'modelo_final.linear.json', 'features': FEATURES, 'sha256': versao}
+    with armazenamento.abrir_escrita(CHAVE_MANIFESTO) as f:
+        f.write(json.dumps(manifesto).encode('utf-8'))
+    return versao
+
+
+def contar_downloads(manager, monkeypatch):
+    chamadas = []
+    baixar = manager.fonte.baixar
+
+    def baixar_contando(chave, destino):
+        chamadas.append(chave)
+        return baixar(chave, destino)
+
+    monkeypatch.setattr(manager.fonte, "baixar", baixar_contando)
+    return chamadas
+
+
+@pytest.fixture
+def local(tmp_path):
+    return ArmazenamentoLocal(str(tmp_path / "bucket"))
+
+
+def criar_manager(fonte, tmp_path, **kwargs):
+    return ModelManager(fonte, CHAVE_MODELO, str(tmp_path / "cache"), chave_manifesto=CHAVE_MANIFESTO,
+                        features_esperadas=FEATURES, **kwargs)
+
+
+def test_nao_baixa_quando_a_versao_do_manifesto_nao_mudou(local, tmp_path, monkeypatch):
+    versao = publicar(local, 1.0)
+    manager = criar_manager(local, tmp_path)
+    downloads = contar_downloads(manager, monkeypatch)
+
+    assert manager.atualizar()
+    assert manager.atual.versao == versao
+    assert not manager.atualizar()
+    assert downloads == [CHAVE_ARTEFATO]
+
+    nova_versao = publicar(local, 2.0)
+    assert manager.atualizar()
+    assert manager.atual.versao == nova_versao
+    assert downloads == [CHAVE_ARTEFATO, CHAVE_ARTEFATO]
+
+
+def test_s3_joblib_nao_baixa_quando_o_etag_nao_mudou(s3, tmp_path, monkeypatch):
+    joblib = pytest.importorskip("joblib")
+    armazenamento, _ = s3
+    from api.model_manager import ModeloLinear
+
+    with armazenamento.abrir_escrita(CHAVE_MODELO) as f:
+        joblib.dump(ModeloLinear([[0.0, 0.0]] * 3, [1.0, 0.0, 0.0]), f)
+    manager = criar_manager(armazenamento, tmp_path)
+    downloads = contar_downloads(manager, monkeypatch)
+
+    assert manager.atualizar()
+    assert manager.atual.formato == "joblib"
+    assert manager.atual.versao == armazenamento.versao(CHAVE_MODELO)
+    assert not manager.atualizar()
+    assert downloads == [CHAVE_MODELO]
+
+
+def test_falha_na_carga_mantem_o_modelo_anterior(local, tmp_path):
+    versao = publicar(local, 1.0)
+    manager = criar_manager(local, tmp_path)
+    assert manager.atualizar()
+    anterior = manager.atual
+
+    # Checksum confere, mas o conteúdo não é um modelo válido
+    publicar(local, None, conteudo=b"{nao e json")
+    assert not manager.atualizar()
+    assert manager.atual is anterior
+    assert manager.atual.versao == versao
+    assert manager.ultimo_erro is not None
+    probabilidades = manager.atual.prever_probabilidades(np.zeros((1, 2)))
+    np.testing.assert_allclose(probabilidades.sum(axis=1), 1.0)
+
+
+def test_checksum_divergente_mantem_o_modelo_anterior_e_descarta_o_download(local, tmp_path):
+    versao = publicar(local, 1.0)
+    manager = criar_manager(local, tmp_path)
+    assert manager.atualizar()
+
+    versao_falsa = publicar(local, 2.0, sha256="0" * 64)
+    assert not manager.atualizar()
+    assert manager.atual.versao == versao
+    assert "Checksum" in manager.ultimo_erro
+    assert not os.path.exists(manager._caminho_cache(versao_falsa, ".json"))
+
+
+def test_limpar_cache_mantem_as_versoes_recentes_e_a_ativa(local, tmp_path):
+    manager = criar_manager(local, tmp_path, versoes_em_cache=2)
+    caminhos = []
+    for i in range(3):
+        versao = publicar(local, float(i))
+        assert manager.atualizar()
+        caminhos.append(manager._caminho_cache(versao, ".json"))
+        # mtime crescente por versão, independente da resolução do relógio do sistema de arquivos
+        os.utime(caminhos[-1], (1000 + i, 1000 + i))
+
+    manager._limpar_cache(manter=caminhos[-1])
+    assert sorted(os.listdir(manager.cache_dir)) == sorted(os.path.basename(c) for c in caminhos[1:])
+
+    # A versão ativa nunca é apagada, mesmo sendo a mais antiga do cache: fica a mais recente e a ativa
+    os.utime(caminhos[-1], (1, 1))
+    manager.versoes_em_cache = 1
+    manager._limpar_cache(manter=caminhos[-1])
+    assert sorted(os.listdir(manager.cache_dir)) == sorted(os.path.basename(c) for c in caminhos[1:])
+    manager._limpar_cache(manter=caminhos[1])
+    assert os.listdir(manager.cache_dir) == [os.path.basename(caminhos[1])]
@@ -0,0 +1,91 @@
+# tests/test_season_simulator.py
+"""
+Simulação de Monte Carlo do season_simulator.py: cada posição final tem probabilidade total 1,
+uma temporada já encerrada reproduz a tabela atual com 100% e o desempate (mesmos pontos e
+vitórias) segue o saldo de gols.
+"""
+import numpy as np
+import pytest
+from season_simulator import (
+    TAMANHO_BLOCO,
+    confrontos_restantes,
+    simular_temporadas,
+    tabela_atual,
+)
+
+TIMES = ["Atlético", "Botafogo", "Coritiba", "Duque de Caxias"]
+
+# Turno e returno completos. Atlético e Botafogo terminam com 10 pontos e 2 vitórias cada,
+# separados só pelo saldo (+6 x +2); Duque de Caxias tem 6 pontos e Coritiba 2.
+TEMPORADA_COMPLETA = [
+    ("Atlético", "Botafogo", 0, 0), ("Botafogo", "Atlético", 0, 0),
+    ("Atlético", "Coritiba", 5, 0), ("Coritiba", "Atlético", 0, 1),
+    ("Atlético", "Duque de Caxias", 1, 1), ("Duque de Caxias", "Atlético", 2, 2),
+    ("Botafogo", "Coritiba", 1, 0), ("Coritiba", "Botafogo", 0, 1),
+    ("Botafogo", "Duque de Caxias", 0, 0), ("Duque de Caxias", "Botafogo", 1, 1),
+    ("Coritiba", "Duque de Caxias", 0, 0), ("Duque de Caxias", "Coritiba", 0, 0),
+]
+
+
+def simular(times, partidas_jogadas, probabilidades=None, **kwargs):
+    confrontos = confrontos_restantes(times, partidas_jogadas)
+    posicao = {t: i for i, t in enumerate(times)}
+    if probabilidades is None:
+        probabilidades = np.full((len(confrontos), 3), 1 / 3)
+    pontos, vitorias, saldo = tabela_atual(times, partidas_jogadas)
+    return simular_temporadas(
+        probabilidades[:len(confrontos)], [posicao[m] for m, _ in confrontos], [posicao[v] for _, v in confrontos],
+        pontos, vitorias, saldo, **kwargs,
+    )
+
+
+def test_tabela_atual():
+    pontos, vitorias, saldo = tabela_atual(TIMES, TEMPORADA_COMPLETA)
+    assert pontos.tolist() == [10, 10, 2, 6]
+    assert vitorias.tolist() == [2, 2, 0, 0]
+    assert saldo.tolist() == [6, 2, -8, 0]
+
+
+def test_probabilidades_de_cada_posicao_somam_1():
+    n_simulacoes = TAMANHO_BLOCO + 500  # dois blocos, o último incompleto
+    rng = np.random.default_rng(7)
+    probabilidades = rng.dirichlet(np.ones(3), size=len(TIMES) * (len(TIMES) - 1))
+    contagem, pontos_medios = simular(TIMES, TEMPORADA_COMPLETA[:5], probabilidades,
+                                      n_simulacoes=n_simulacoes, seed=42)
+
+    distribuicao = contagem / n_simulacoes
+    np.testing.assert_allclose(distribuicao.sum(axis=0), 1.0)  # cada posição tem exatamente um time
+    np.testing.assert_allclose(distribuicao.sum(axis=1), 1.0)  # cada time termina em alguma posição
+    # 12 jogos por temporada entre 4 times: de 2 (todos empatados) a 3 pontos por jogo
+    assert 24 <= pontos_medios.sum() <= 36
+
+    # Mesma semente, mesmo resultado
+    repeticao, _ = simular(TIMES, TEMPORADA_COMPLETA[:5], probabilidades, n_simulacoes=n_simulacoes, seed=42)
+    np.testing.assert_array_equal(contagem, repeticao)
+
+
+def test_temporada_encerrada_reproduz_a_tabela_atual():
+    assert confrontos_restantes(TIMES, TEMPORADA_COMPLETA) == []
+    contagem, pontos_medios = simular(TIMES, TEMPORADA_COMPLETA, n_simulacoes=500, seed=1)
+
+    # Atlético 1º (desempate pelo saldo com o Botafogo), Botafogo 2º, Duque de Caxias 3º, Coritiba 4º
+    esperado = np.zeros((4, 4))
+    esperado[[0, 1, 3, 2], [0, 1, 2, 3]] = 1.0
+    np.testing.assert_array_equal(contagem / 500, esperado)
+    np.testing.assert_array_equal(pontos_medios, [10, 10, 2, 6])
+
+
+@pytest.mark.parametrize("melhor_saldo", [0, 1])
+def test_desempate_pelo_saldo_de_gols(melhor_saldo):
+    # A e B venceram o único jogo disputado, com saldos diferentes; todos os jogos restantes empatam
+    times = ["A", "B", "C", "D"]
+    gols = (3, 0) if melhor_saldo == 0 else (1, 0)
+    outros = (1, 0) if melhor_saldo == 0 else (3, 0)
+    jogadas = [("A", "C", *gols), ("B", "D", *outros)]
+    confrontos = confrontos_restantes(times, jogadas)
+    probabilidades = np.tile([0.0, 1.0, 0.0], (len(confrontos), 1))
+    contagem, _ = simular(times, jogadas, probabilidades, n_simulacoes=300, seed=3)
+
+    # A e B terminam com os mesmos pontos e vitórias: vale o saldo
+    assert contagem[melhor_saldo, 0] == 300
+    assert contagem[1 - melhor_saldo, 1] == 300
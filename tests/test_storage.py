@@ -0,0 +1,147 @@
+# tests/test_storage.py
+"""
+Backends de armazenamento do shared/storage.py: escrita atômica e GET condicional no diretório
+local; upload multipart, abort e GET condicional (304) no S3, simulado com o moto.
+"""
+import os
+
+import pytest
+
+from shared.storage import TAMANHO_PARTE, ArmazenamentoLocal
+
+
+class ErroProposital(Exception):
+    pass
+
+
+# --- ArmazenamentoLocal ---
+
+@pytest.fixture
+def local(tmp_path):
+    return ArmazenamentoLocal(str(tmp_path))
+
+
+def test_local_escrita_atomica_substitui_o_arquivo(local, tmp_path):
+    with local.abrir_escrita("models/modelo.bin") as f:
+        f.write(b"versao 1")
+
+    with local.abrir_escrita("models/modelo.bin") as f:
+        f.write(b"versao 2")
+        # Durante a escrita, quem lê ainda vê o conteúdo anterior inteiro
+        assert local.ler("models/modelo.bin") == b"versao 1"
+
+    assert local.ler("models/modelo.bin") == b"versao 2"
+    assert os.listdir(tmp_path / "models") == ["modelo.bin"]
+
+
+def test_local_escrita_com_excecao_mantem_o_anterior_e_remove_o_temporario(local, tmp_path):
+    with local.abrir_escrita("dados.csv") as f:
+        f.write(b"original")
+
+    with pytest.raises(ErroProposital), local.abrir_escrita("dados.csv") as f:
+        f.write(b"parcial")
+        raise ErroProposital
+
+    assert local.ler("dados.csv") == b"original"
+    assert os.listdir(tmp_path) == ["dados.csv"]
+
+
+def test_local_abrir_se_modificado(local):
+    with local.abrir_escrita("raw/historico.csv") as f:
+        f.write(b"a,b\n1,2\n")
+
+    with local.abrir_se_modificado("raw/historico.csv") as (fluxo, versao):
+        assert fluxo.read() == b"a,b\n1,2\n"
+    with local.abrir_se_modificado("raw/historico.csv", versao) as (fluxo, mesma_versao):
+        assert fluxo is None
+        assert mesma_versao == versao
+
+    with local.abrir_escrita("raw/historico.csv") as f:
+        f.write(b"a,b\n1,2\n3,4\n")
+    with local.abrir_se_modificado("raw/historico.csv", versao) as (fluxo, nova_versao):
+        assert fluxo.read() == b"a,b\n1,2\n3,4\n"
+        assert nova_versao != versao
+
+
+# --- ArmazenamentoS3 (moto, fixture `s3` do conftest.py) ---
+
+
+def test_s3_escrita_pequena_em_um_unico_put(s3):
+    armazenamento, cliente = s3
+    with armazenamento.abrir_escrita("models/manifesto.json") as f:
+        f.write(b'{"formato": "xgboost-ubj"}')
+
+    objeto = cliente.get_object(Bucket="bucket-teste", Key="dados/models/manifesto.json")
+    assert objeto["Body"].read() == b'{"formato": "xgboost-ubj"}'
+    assert "-" not in objeto["ETag"]
+
+
+def test_s3_escrita_multipart_acima_de_uma_parte(s3):
+    armazenamento, cliente = s3
+    conteudo = os.urandom(2 * TAMANHO_PARTE + 1234)
+    with armazenamento.abrir_escrita("processed/grande.bin") as f:
+        # Escritas menores que uma parte, como as do joblib e do pyarrow
+        for inicio in range(0, len(conteudo), 1024 * 1024):
+            f.write(conteudo[inicio:inicio + 1024 * 1024])
+
+    objeto = cliente.get_object(Bucket="bucket-teste", Key="dados/processed/grande.bin")
+    assert objeto["Body"].read() == conteudo
+    # ETag de upload multipart: "<hash>-<número de partes>"
+    assert objeto["ETag"].strip('"').endswith("-3")
+    assert not cliente.list_multipart_uploads(Bucket="bucket-teste").get("Uploads")
+
+
+def test_s3_escrita_com_excecao_aborta_o_multipart(s3):
+    armazenamento, cliente = s3
+    with pytest.raises(ErroProposital), armazenamento.abrir_escrita("processed/grande.bin") as f:
+        f.write(os.urandom(TAMANHO_PARTE + 10))
+        raise ErroProposital
+
+    assert not armazenamento.existe("processed/grande.bin")
+    assert not cliente.list_multipart_uploads(Bucket="bucket-teste").get("Uploads")
+
+
+def test_s3_get_condicional_retorna_none_quando_nao_mudou(s3):
+    armazenamento, _ = s3
+    with armazenamento.abrir_escrita("raw/historico.csv") as f:
+        f.write(b"a,b\n1,2\n")
+
+    with armazenamento.abrir_se_modificado("raw/historico.csv") as (fluxo, etag):
+        assert fluxo.read() == b"a,b\n1,2\n"
+    assert etag == armazenamento.versao("raw/historico.csv")
+
+    # ETag igual: o S3 responde 304 e nada é transferido
+    with armazenamento.abrir_se_modificado("raw/historico.csv", etag) as (fluxo, mesmo_etag):
+        assert fluxo is None
+        assert mesmo_etag == etag
+
+    with armazenamento.abrir_escrita("raw/historico.csv") as f:
+        f.write(b"a,b\n1,2\n3,4\n")
+    with armazenamento.abrir_se_modificado("raw/historico.csv", etag) as (fluxo, novo_etag):
+        assert fluxo.read() == b"a,b\n1,2\n3,4\n"
+        assert novo_etag != etag
+
+
+def test_s3_cliente_recriado_em_outro_processo(s3, monkeypatch):
+    armazenamento, _ = s3
+    cliente_mestre = armazenamento._client
+    assert armazenamento._client is cliente_mestre
+
+    # Após o fork (ex: workers do gunicorn com preload_app) o processo filho não herda o cliente do mestre
+    monkeypatch.setattr(os, "getpid", lambda: -1)
+    assert armazenamento._client is not cliente_mestre
+    assert not armazenamento.existe("models/inexistente.bin")
+
+
+def test_s3_falha_ao_concluir_aborta_o_multipart(s3, monkeypatch):
+    armazenamento, cliente = s3
+
+    def falhar(**kwargs):
+        raise ErroProposital
+
+    monkeypatch.setattr(armazenamento._client, "complete_multipart_upload", falhar)
+    with pytest.raises(ErroProposital), armazenamento.abrir_escrita("processed/grande.bin") as f:
+        f.write(os.urandom(TAMANHO_PARTE + 10))
+
+    assert not armazenamento.existe("processed/grande.bin")
+    assert not cliente.list_multipart_uploads(Bucket="bucket-teste").get("Uploads")